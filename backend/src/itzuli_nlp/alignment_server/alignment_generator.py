@@ -1,11 +1,11 @@
 """Service for generating alignment data from scaffold using Claude API."""
 
 import logging
-from typing import List
+from typing import AsyncIterator, List, Tuple
 
 from ..core.types import AnalysisRow
-from .claude_client import ClaudeClient
-from .types import AlignmentData, SentencePair
+from .claude_client import AsyncClaudeClient, ClaudeClient
+from .types import Alignment, AlignmentData, SentencePair
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +68,72 @@ def generate_alignments_for_scaffold(scaffold_data: AlignmentData, claude_api_ke
         return scaffold_data
 
 
+async def generate_alignments_for_scaffold_async(
+    scaffold_data: AlignmentData, claude_client: AsyncClaudeClient
+) -> AlignmentData:
+    """
+    Awaitable generate_alignments_for_scaffold() using a shared async client.
+
+    Args:
+        scaffold_data: AlignmentData with empty alignment layers
+        claude_client: Long-lived client whose connection pool the call borrows
+
+    Returns:
+        AlignmentData with populated alignment layers, or the scaffold on failure
+    """
+    try:
+        enriched_sentences = []
+        for sentence_pair in scaffold_data.sentences:
+            logger.info(f"Processing sentence pair: {sentence_pair.id}")
+            alignment_layers = await claude_client.generate_alignments(
+                source_tokens=[token.model_dump() for token in sentence_pair.source.tokens],
+                target_tokens=[token.model_dump() for token in sentence_pair.target.tokens],
+                source_lang=sentence_pair.source.lang,
+                target_lang=sentence_pair.target.lang,
+                source_text=sentence_pair.source.text,
+                target_text=sentence_pair.target.text,
+            )
+            enriched_sentences.append(sentence_pair.model_copy(update={"layers": alignment_layers}))
+
+        return AlignmentData(sentences=enriched_sentences)
+
+    except Exception as e:
+        logger.error(f"Alignment generation failed: {e}")
+        return scaffold_data
+
+
+def has_alignments(alignment_data: AlignmentData) -> bool:
+    """Whether every sentence got at least one alignment, i.e. Claude did not fail for it."""
+    return bool(alignment_data.sentences) and all(
+        sentence.layers.lexical or sentence.layers.grammatical_relations or sentence.layers.features
+        for sentence in alignment_data.sentences
+    )
+
+
+async def stream_alignments_for_pair_async(
+    sentence_pair: SentencePair, claude_client: AsyncClaudeClient
+) -> AsyncIterator[Tuple[str, List[Alignment]]]:
+    """
+    Stream alignment layers for one scaffold sentence pair.
+
+    Args:
+        sentence_pair: SentencePair with empty alignment layers
+        claude_client: Long-lived client whose connection pool the call borrows
+
+    Yields:
+        (layer_name, alignments) for each layer as Claude completes it
+    """
+    async for layer in claude_client.stream_alignments(
+        source_tokens=[token.model_dump() for token in sentence_pair.source.tokens],
+        target_tokens=[token.model_dump() for token in sentence_pair.target.tokens],
+        source_lang=sentence_pair.source.lang,
+        target_lang=sentence_pair.target.lang,
+        source_text=sentence_pair.source.text,
+        target_text=sentence_pair.target.text,
+    ):
+        yield layer
+
+
 def create_enriched_alignment_data(
     source_analysis: List[AnalysisRow],
     target_analysis: List[AnalysisRow],
@@ -109,4 +175,44 @@ def create_enriched_alignment_data(
     )
     
     # Then enrich with Claude-generated alignments
-    return generate_alignments_for_scaffold(scaffold_data, claude_api_key)
\ No newline at end of file
+    return generate_alignments_for_scaffold(scaffold_data, claude_api_key)
+
+
+async def create_enriched_alignment_data_async(
+    source_analysis: List[AnalysisRow],
+    target_analysis: List[AnalysisRow],
+    source_lang: str,
+    target_lang: str,
+    source_text: str,
+    target_text: str,
+    sentence_id: str,
+    claude_client: AsyncClaudeClient,
+) -> AlignmentData:
+    """
+    Awaitable create_enriched_alignment_data() using a shared async client.
+
+    Args:
+        source_analysis: Analysis of source text
+        target_analysis: Analysis of target text
+        source_lang: Source language code
+        target_lang: Target language code
+        source_text: Original source text
+        target_text: Translated text
+        sentence_id: Unique ID for sentence pair
+        claude_client: Long-lived client whose connection pool the call borrows
+
+    Returns:
+        AlignmentData with populated alignment layers
+    """
+    from .scaffold import create_scaffold_from_dual_analysis
+
+    scaffold_data = create_scaffold_from_dual_analysis(
+        source_analysis=source_analysis,
+        target_analysis=target_analysis,
+        source_lang=source_lang,
+        target_lang=target_lang,
+        source_text=source_text,
+        target_text=target_text,
+        sentence_id=sentence_id,
+    )
+    return await generate_alignments_for_scaffold_async(scaffold_data, claude_client)
@@ -1,70 +1,760 @@
-"""File-based JSON cache for alignment data."""
+"""SQLite-backed cache for alignment data."""
 
+import gzip
 import hashlib
 import json
 import logging
 import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type, Union
 
+from ..core.normalize import (
+    FOLD_TRAILING_PUNCTUATION,
+    normalization_tag,
+    normalize_text,
+)
+from . import codec
+from .fingerprint import alignment_fingerprint
 from .types import AlignmentData
 
 logger = logging.getLogger(__name__)
 
+# Keys per bulk statement, well under SQLite's bound-parameter limit
+_BULK_CHUNK = 500
+
+# Size and age bounds, enforced by evict(); 0 disables a bound
+CACHE_MAX_BYTES = int(os.getenv("ALIGNMENT_CACHE_MAX_BYTES", "0"))
+CACHE_MAX_ENTRIES = int(os.getenv("ALIGNMENT_CACHE_MAX_ENTRIES", "0"))
+CACHE_TTL_SECONDS = int(os.getenv("ALIGNMENT_CACHE_TTL_SECONDS", "0"))
+# "lru" evicts the least recently read entries first, "lfu" the least often read
+CACHE_EVICTION_POLICY = os.getenv("ALIGNMENT_CACHE_EVICTION", "lru")
+
+_EVICTION_ORDER = {
+    "lru": "accessed_at",
+    "lfu": "hits, accessed_at",
+}
+
+# Validated entries kept in process memory in front of the database; 0 disables the tier
+CACHE_MEMORY_ENTRIES = int(os.getenv("ALIGNMENT_CACHE_MEMORY_ENTRIES", "256"))
+# Store ready-to-send response bodies gzip-compressed
+CACHE_GZIP_RESPONSES = os.getenv("ALIGNMENT_CACHE_GZIP", "1") == "1"
+# Encoding for stored AlignmentData, one of codec.CODECS; entries in other encodings still read
+CACHE_CODEC = os.getenv("ALIGNMENT_CACHE_CODEC", "zlib")
+# With stale-while-revalidate, get_response() also returns entries older than the soft
+# TTL or from another fingerprint, flagged stale for the caller to refresh; entries past
+# the hard TTL (ALIGNMENT_CACHE_TTL_SECONDS) are still misses. get_many() has no caller
+# to revalidate in the background, so for it entries past the soft TTL are misses.
+# 0 disables the soft TTL
+CACHE_STALE_WHILE_REVALIDATE = os.getenv("ALIGNMENT_CACHE_STALE_WHILE_REVALIDATE", "0") == "1"
+CACHE_SOFT_TTL_SECONDS = int(os.getenv("ALIGNMENT_CACHE_SOFT_TTL_SECONDS", "0"))
+# How long a failed or degraded result is remembered by NegativeCache; 0 disables it
+NEGATIVE_CACHE_TTL_SECONDS = int(os.getenv("ALIGNMENT_NEGATIVE_CACHE_TTL_SECONDS", "30"))
+NEGATIVE_CACHE_MAX_ENTRIES = int(os.getenv("ALIGNMENT_NEGATIVE_CACHE_MAX_ENTRIES", "1024"))
+# Key on normalized text (see core.normalize) rather than the text exactly as sent
+CACHE_NORMALIZE_KEYS = os.getenv("ALIGNMENT_CACHE_NORMALIZE_KEYS", "1") == "1"
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def default_db_path() -> Path:
+    """
+    The cache database to use when none is given.
+
+    ALIGNMENT_CACHE_DB if set; otherwise alignments.db next to the legacy
+    ALIGNMENT_CACHE_DIR, so a deployment that only configured the old
+    directory keeps its cache on the same volume.
+    """
+    if os.environ.get("ALIGNMENT_CACHE_DB"):
+        return Path(os.environ["ALIGNMENT_CACHE_DB"])
+    if os.environ.get("ALIGNMENT_CACHE_DIR"):
+        return Path(os.environ["ALIGNMENT_CACHE_DIR"]).parent / "alignments.db"
+    return Path(".cache/alignments.db")
+
+
+class CachedResponse(NamedTuple):
+    """A cached SentencePair response body, serialized once when it was stored."""
+
+    body: bytes
+    etag: str
+    # Served under stale-while-revalidate and due to be regenerated
+    stale: bool = False
+
+    @property
+    def gzipped(self) -> bool:
+        return self.body[:2] == _GZIP_MAGIC
+
+    def json_bytes(self) -> bytes:
+        """The body as plain JSON, decompressing it if needed."""
+        return gzip.decompress(self.body) if self.gzipped else self.body
+
+
+def _build_response(alignment_data: AlignmentData, compress: bool) -> Optional[CachedResponse]:
+    if not alignment_data.sentences:
+        return None
+    body = alignment_data.sentences[0].model_dump_json().encode()
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    return CachedResponse(gzip.compress(body, mtime=0) if compress else body, etag)
+
+
+@dataclass
+class _MemoryEntry:
+    created_at: float
+    data: Optional[AlignmentData] = None
+    response: Optional[CachedResponse] = None
+
+
+class _MemoryTier:
+    """Bounded LRU of validated AlignmentData and response bodies, with hit/miss counters."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _MemoryEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, not_before: float, field: str) -> Any:
+        """Return `field` ("data" or "response") of a fresh entry, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            value = getattr(entry, field) if entry is not None and entry.created_at >= not_before else None
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(
+        self,
+        key: str,
+        created_at: float,
+        data: Optional[AlignmentData] = None,
+        response: Optional[CachedResponse] = None,
+    ) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.created_at != created_at:
+                entry = self._entries[key] = _MemoryEntry(created_at)
+            entry.data = data or entry.data
+            entry.response = response or entry.response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, keys: List[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+class _Failure(NamedTuple):
+    """An exception remembered by NegativeCache, without its traceback or context."""
+
+    kind: Type[BaseException]
+    message: str
+
+    def exception(self) -> BaseException:
+        try:
+            return self.kind(self.message)
+        except Exception:
+            # Exception types whose constructors need more than a message
+            return RuntimeError(self.message)
+
+
+class NegativeCache:
+    """
+    Short-lived in-memory record of requests whose generation failed upstream.
+
+    Holds either the exception that stopped a request or the degraded result
+    it produced (e.g. a scaffold without alignments after a Claude error), so
+    retries within `ttl_seconds` answer immediately instead of hitting the
+    failing service again, and a bad moment is forgotten soon after.
+
+    Exceptions are kept as their type and message, and every hit gets a new
+    instance: raising one shared instance from concurrent requests would pile
+    each raise's traceback onto it.
+    """
+
+    def __init__(self, ttl_seconds: int = NEGATIVE_CACHE_TTL_SECONDS, max_entries: int = NEGATIVE_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Union[AlignmentData, _Failure]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stored = 0
+
+    def get(self, key: str) -> Optional[Union[AlignmentData, BaseException]]:
+        """The failure recorded for `key`, or None if there is none or it has expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self.hits += 1
+        return value.exception() if isinstance(value, _Failure) else value
+
+    def put(self, key: str, value: Union[AlignmentData, BaseException]) -> None:
+        """Remember a failure or degraded result for `key` for `ttl_seconds`."""
+        if not self.ttl_seconds or not self.max_entries:
+            return
+        if isinstance(value, BaseException):
+            value = _Failure(type(value), str(value))
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            self.stored += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "ttl_seconds": self.ttl_seconds,
+                "entries": len(self._entries),
+                "stored": self.stored,
+                "hits": self.hits,
+            }
+
 
 class AlignmentCache:
-    """Simple file-based cache for alignment data."""
-    
-    def __init__(self, cache_dir: Optional[str] = None):
-        """Initialize cache with directory path."""
-        self.cache_dir = Path(cache_dir or os.environ.get("ALIGNMENT_CACHE_DIR", ".cache/alignments"))
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
-    
+    """
+    Alignment data cache in a single SQLite database.
+
+    Entries are keyed by a hash of the request and record when they were
+    created and last read. The database runs in WAL mode so readers never
+    block on a writer. Each thread gets its own connection, and connections
+    are reopened after fork.
+
+    A directory left by the earlier one-file-per-entry cache is imported on
+    first start and renamed to `<dir>.migrated`.
+
+    Size and age bounds are not enforced on the request path; call evict()
+    periodically. Entries older than the TTL are treated as misses even
+    before they are removed.
+
+    Entries record the fingerprint of the prompt, models and scaffold format
+    that produced them (see fingerprint.py). Entries from another fingerprint
+    are misses and are replaced as they are requested again, rather than all
+    being dropped at once; evict() removes them first. In stale-while-revalidate
+    mode get_response() serves them (and entries past the soft TTL) flagged as
+    stale until they are replaced.
+
+    The most recently used entries are also kept validated in memory, so
+    repeated hits skip SQLite and JSON parsing. Reads go through this tier
+    and writes update both. Returned objects are shared between callers and
+    must not be modified. The memory tier is per process: clear() in one
+    worker does not clear another's.
+
+    Each entry also keeps its first SentencePair serialized as the final
+    response body (gzip-compressed by default), so get_response() can serve
+    a hit without building any models.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        legacy_dir: Optional[str] = None,
+        max_bytes: int = CACHE_MAX_BYTES,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl_seconds: int = CACHE_TTL_SECONDS,
+        policy: str = CACHE_EVICTION_POLICY,
+        memory_entries: int = CACHE_MEMORY_ENTRIES,
+        gzip_responses: bool = CACHE_GZIP_RESPONSES,
+        codec_name: str = CACHE_CODEC,
+        normalize_keys: bool = CACHE_NORMALIZE_KEYS,
+        fold_punctuation: bool = FOLD_TRAILING_PUNCTUATION,
+        fingerprint: Optional[str] = None,
+        stale_while_revalidate: bool = CACHE_STALE_WHILE_REVALIDATE,
+        soft_ttl_seconds: int = CACHE_SOFT_TTL_SECONDS,
+        migrate_legacy: bool = True,
+    ):
+        """Initialize cache with database path, migrating the legacy JSON directory if present unless told not to."""
+        if policy not in _EVICTION_ORDER:
+            raise ValueError(f"Unknown cache eviction policy: {policy}")
+        codec.check_codec(codec_name)
+        self.db_path = Path(db_path) if db_path else default_db_path()
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.policy = policy
+        self.gzip_responses = gzip_responses
+        self.codec_name = codec_name
+        self.normalize_keys = normalize_keys
+        self.fold_punctuation = fold_punctuation
+        self.fingerprint = fingerprint or alignment_fingerprint()
+        self.stale_while_revalidate = stale_while_revalidate
+        self.soft_ttl_seconds = soft_ttl_seconds
+        self._stale_hits = 0
+        self._eviction_totals = {"runs": 0, "expired": 0, "evicted": 0, "bytes_reclaimed": 0}
+        self._memory = _MemoryTier(memory_entries)
+        # Reads served from memory, written back to accessed_at/hits on the next database access
+        self._touches: Dict[str, Tuple[float, int]] = {}
+        self._touches_lock = threading.Lock()
+        self._disk_hits = 0
+        self._disk_misses = 0
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        os.register_at_fork(after_in_child=self._reset_connections)
+
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as db, db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS alignments ("
+                "key TEXT PRIMARY KEY, data TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0, "
+                "body BLOB, etag TEXT, fingerprint TEXT)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS alignments_accessed_at ON alignments (accessed_at)")
+            columns = {row[1] for row in db.execute("PRAGMA table_info(alignments)")}
+            for column, kind in (("body", "BLOB"), ("etag", "TEXT"), ("fingerprint", "TEXT")):
+                if column not in columns:
+                    db.execute(f"ALTER TABLE alignments ADD COLUMN {column} {kind}")
+            # Entries from before fingerprints were recorded are adopted by the running version
+            db.execute("UPDATE alignments SET fingerprint=? WHERE fingerprint IS NULL", (self.fingerprint,))
+
+        legacy_path = Path(legacy_dir or os.environ.get("ALIGNMENT_CACHE_DIR", ".cache/alignments"))
+        if migrate_legacy and legacy_path.is_dir():
+            self.migrate_directory(legacy_path)
+
+    def _reset_connections(self) -> None:
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.db_path, timeout=30)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
     def _get_cache_key(self, text: str, source_lang: str, target_lang: str) -> str:
-        """Generate cache key from request parameters."""
-        key_string = f"{text}:{source_lang}:{target_lang}"
+        """Generate cache key from request parameters, tagged with the normalization rules applied."""
+        if self.normalize_keys:
+            text = normalize_text(text, self.fold_punctuation)
+            key_string = f"{normalization_tag(self.fold_punctuation)}:{text}:{source_lang}:{target_lang}"
+        else:
+            key_string = f"{text}:{source_lang}:{target_lang}"
         return hashlib.sha256(key_string.encode()).hexdigest()
-    
-    def _get_cache_path(self, cache_key: str) -> Path:
-        """Get file path for cache key."""
-        return self.cache_dir / f"{cache_key}.json"
-    
+
+    def key_for_entry(self, data: Any) -> Optional[str]:
+        """Key an entry would be stored under now, from the request recorded in it; None if it has no sentences."""
+        sentences = json.loads(codec.decode(data)).get("sentences") or []
+        if not sentences:
+            return None
+        source, target = sentences[0]["source"], sentences[0]["target"]
+        return self._get_cache_key(source["text"], source["lang"], target["lang"])
+
+    def key_for(self, text: str, source_lang: str, target_lang: str) -> str:
+        """Public cache key for a request, for callers that coordinate on it."""
+        return self._get_cache_key(text, source_lang, target_lang)
+
     def get(self, text: str, source_lang: str, target_lang: str) -> Optional[AlignmentData]:
         """Retrieve cached alignment data."""
+        return self.get_many([(text, source_lang, target_lang)])[0]
+
+    def set(self, text: str, source_lang: str, target_lang: str, alignment_data: AlignmentData) -> None:
+        """Store alignment data in cache."""
+        self.set_many([(text, source_lang, target_lang, alignment_data)])
+
+    def get_many(self, requests: List[Tuple[str, str, str]]) -> List[Optional[AlignmentData]]:
+        """
+        Retrieve cached alignment data for several (text, source_lang, target_lang) requests.
+
+        Only fresh entries are returned: with stale-while-revalidate, entries
+        past the soft TTL are misses here, so batch, stream and job callers
+        regenerate them instead of serving them as fresh.
+        """
+        keys = [self._get_cache_key(*request) for request in requests]
+        not_before = self._expiry_cutoff()
+        if self.stale_while_revalidate:
+            not_before = max(not_before, self._soft_expiry_cutoff())
+        found: Dict[str, AlignmentData] = {}
+        now = time.time()
+        for key in dict.fromkeys(keys):
+            data = self._memory.get(key, not_before, "data")
+            if data is not None:
+                found[key] = data
+                self._touch(key, now)
+
+        misses = [key for key in dict.fromkeys(keys) if key not in found]
+        if misses:
+            found.update(self._read_disk(misses, not_before))
+        return [found.get(key) for key in keys]
+
+    def _read_disk(self, keys: List[str], not_before: float) -> Dict[str, AlignmentData]:
+        rows: Dict[str, Tuple[str, float]] = {}
         try:
-            cache_key = self._get_cache_key(text, source_lang, target_lang)
-            cache_path = self._get_cache_path(cache_key)
-            
-            if not cache_path.exists():
-                return None
-            
-            json_content = cache_path.read_text(encoding="utf-8")
-            data = json.loads(json_content)
-            return AlignmentData.model_validate(data)
-            
+            db = self._connection()
+            for start in range(0, len(keys), _BULK_CHUNK):
+                chunk = keys[start : start + _BULK_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                for key, data, created_at in db.execute(
+                    f"SELECT key, data, created_at FROM alignments WHERE key IN ({placeholders}) "
+                    "AND created_at >= ? AND fingerprint = ?",
+                    (*chunk, not_before, self.fingerprint),
+                ):
+                    rows[key] = (data, created_at)
+
+            now = time.time()
+            with db:
+                db.executemany(
+                    "UPDATE alignments SET accessed_at=?, hits=hits+1 WHERE key=?", [(now, key) for key in rows]
+                )
+                self._flush_touches(db)
+        except Exception as e:
+            logger.warning(f"Cache retrieval failed: {e}")
+            return {}
+
+        found = {}
+        for key, (data, created_at) in rows.items():
+            try:
+                found[key] = AlignmentData.model_validate_json(codec.decode(data))
+            except Exception as e:
+                logger.warning(f"Cache entry {key} is unreadable: {e}")
+                continue
+            self._memory.put(key, created_at, data=found[key])
+
+        with self._touches_lock:
+            self._disk_hits += len(found)
+            self._disk_misses += len(keys) - len(found)
+        return found
+
+    def get_response(self, text: str, source_lang: str, target_lang: str) -> Optional[CachedResponse]:
+        """
+        Retrieve the cached response body for a request without validating any models.
+
+        Entries stored before bodies were cached get theirs built and saved on first read.
+        With stale-while-revalidate, entries past the soft TTL or from another
+        fingerprint are returned with `stale` set instead of being misses.
+        """
+        key = self._get_cache_key(text, source_lang, target_lang)
+        not_before = self._expiry_cutoff()
+        fresh_after = self._soft_expiry_cutoff() if self.stale_while_revalidate else not_before
+        response = self._memory.get(key, max(not_before, fresh_after), "response")
+        if response is not None:
+            self._touch(key, time.time())
+            return response
+
+        try:
+            db = self._connection()
+            if self.stale_while_revalidate:
+                query = "SELECT data, body, etag, created_at, fingerprint FROM alignments WHERE key=? AND created_at >= ?"
+                params: tuple = (key, not_before)
+            else:
+                query = (
+                    "SELECT data, body, etag, created_at, fingerprint FROM alignments "
+                    "WHERE key=? AND created_at >= ? AND fingerprint = ?"
+                )
+                params = (key, not_before, self.fingerprint)
+            row = db.execute(query, params).fetchone()
+            if row is not None:
+                data, body, etag, created_at, fingerprint = row
+                if body is None:
+                    alignment_data = AlignmentData.model_validate_json(codec.decode(data))
+                    response = _build_response(alignment_data, self.gzip_responses)
+                    if response is not None:
+                        body, etag = response.body, response.etag
+                        size = len(data) + len(body)
+                        db.execute("UPDATE alignments SET body=?, etag=?, size=? WHERE key=?", (body, etag, size, key))
+                with db:
+                    db.execute("UPDATE alignments SET accessed_at=?, hits=hits+1 WHERE key=?", (time.time(), key))
+                    self._flush_touches(db)
         except Exception as e:
             logger.warning(f"Cache retrieval failed: {e}")
             return None
-    
-    def set(self, text: str, source_lang: str, target_lang: str, alignment_data: AlignmentData) -> None:
-        """Store alignment data in cache."""
+
+        with self._touches_lock:
+            if row is None or body is None:
+                self._disk_misses += 1
+                return None
+            self._disk_hits += 1
+            if fingerprint != self.fingerprint or created_at < fresh_after:
+                self._stale_hits += 1
+                return CachedResponse(body, etag, stale=True)
+        response = CachedResponse(body, etag)
+        self._memory.put(key, created_at, response=response)
+        return response
+
+    def _touch(self, key: str, now: float) -> None:
+        with self._touches_lock:
+            _, hits = self._touches.get(key, (now, 0))
+            self._touches[key] = (now, hits + 1)
+
+    def _flush_touches(self, db: sqlite3.Connection) -> None:
+        """Record reads served from memory, so disk eviction sees them as recent."""
+        with self._touches_lock:
+            touches, self._touches = self._touches, {}
+        if touches:
+            db.executemany(
+                "UPDATE alignments SET accessed_at=MAX(accessed_at, ?), hits=hits+? WHERE key=?",
+                [(accessed_at, hits, key) for key, (accessed_at, hits) in touches.items()],
+            )
+
+    def set_many(self, entries: List[Tuple[str, str, str, AlignmentData]]) -> None:
+        """Store alignment data for several (text, source_lang, target_lang, data) entries."""
+        now = time.time()
+        rows = []
+        for text, source_lang, target_lang, alignment_data in entries:
+            key = self._get_cache_key(text, source_lang, target_lang)
+            data = codec.encode(alignment_data.model_dump_json().encode(), self.codec_name)
+            response = _build_response(alignment_data, self.gzip_responses)
+            body, etag = (response.body, response.etag) if response else (None, None)
+            rows.append((key, data, len(data) + len(body or b""), now, now, body, etag))
+            self._memory.put(key, now, data=alignment_data, response=response)
+
         try:
-            cache_key = self._get_cache_key(text, source_lang, target_lang)
-            cache_path = self._get_cache_path(cache_key)
-            
-            json_content = alignment_data.model_dump_json(indent=2)
-            cache_path.write_text(json_content, encoding="utf-8")
-            
-            logger.info(f"Cached alignment data for key: {cache_key}")
-            
+            self._upsert(rows)
+            for key, *_ in rows:
+                logger.info(f"Cached alignment data for key: {key}")
         except Exception as e:
             logger.warning(f"Cache storage failed: {e}")
-    
+
+    def _expiry_cutoff(self) -> float:
+        return time.time() - self.ttl_seconds if self.ttl_seconds else 0.0
+
+    def _soft_expiry_cutoff(self) -> float:
+        return time.time() - self.soft_ttl_seconds if self.soft_ttl_seconds else 0.0
+
+    def _upsert(self, rows: List[tuple], replace: bool = True) -> int:
+        """Insert (key, data, size, created_at, accessed_at, body, etag) rows under the current fingerprint."""
+        db = self._connection()
+        conflict = (
+            "DO UPDATE SET data=excluded.data, size=excluded.size, created_at=excluded.created_at, "
+            "accessed_at=excluded.accessed_at, body=excluded.body, etag=excluded.etag, fingerprint=excluded.fingerprint"
+            if replace
+            else "DO NOTHING"
+        )
+        with db:
+            before = db.total_changes
+            db.executemany(
+                "INSERT INTO alignments (key, data, size, created_at, accessed_at, body, etag, fingerprint) "
+                f"VALUES (?,?,?,?,?,?,?,?) ON CONFLICT(key) {conflict}",
+                [(*row, self.fingerprint) for row in rows],
+            )
+            return db.total_changes - before
+
+    def migrate_directory(self, directory: Path) -> int:
+        """
+        Import a one-file-per-entry JSON cache directory, then rename it to `<dir>.migrated`.
+
+        Existing database entries win over files with the same key, so running
+        this again is harmless. Unreadable files are skipped.
+
+        Returns:
+            Number of entries imported
+        """
+        found = imported = 0
+        rows = []
+        for cache_file in directory.glob("*.json"):
+            try:
+                alignment_data = AlignmentData.model_validate_json(cache_file.read_text(encoding="utf-8"))
+                data = codec.encode(alignment_data.model_dump_json().encode(), self.codec_name)
+                modified = cache_file.stat().st_mtime
+            except Exception as e:
+                logger.warning(f"Skipping unreadable cache file {cache_file.name}: {e}")
+                continue
+            key = self.key_for_entry(data) or cache_file.stem
+            rows.append((key, data, len(data), modified, modified, None, None))
+            found += 1
+            if len(rows) >= _BULK_CHUNK:
+                imported += self._upsert(rows, replace=False)
+                rows = []
+        if rows:
+            imported += self._upsert(rows, replace=False)
+        logger.info(f"Migrated {imported} of {found} cached alignments from {directory} to {self.db_path}")
+
+        try:
+            directory.rename(directory.with_name(f"{directory.name}.migrated"))
+        except OSError as e:
+            logger.warning(f"Could not rename migrated cache directory {directory}: {e}")
+        return imported
+
     def clear(self) -> None:
         """Clear all cached data."""
+        self._memory.clear()
+        with self._touches_lock:
+            self._touches.clear()
         try:
-            for cache_file in self.cache_dir.glob("*.json"):
-                cache_file.unlink()
+            with self._connection() as db:
+                db.execute("DELETE FROM alignments")
             logger.info("Cache cleared")
         except Exception as e:
-            logger.warning(f"Cache clear failed: {e}")
\ No newline at end of file
+            logger.warning(f"Cache clear failed: {e}")
+
+    def evict(self) -> Dict[str, int]:
+        """
+        Remove expired entries, then evict by policy until the size and entry caps are met.
+
+        Freed pages are reused by later writes rather than returned to the
+        filesystem, so the database file stops growing but does not shrink.
+
+        Returns:
+            Counts of expired and evicted entries and the bytes of data reclaimed
+        """
+        result = {"expired": 0, "evicted": 0, "bytes_reclaimed": 0}
+        db = self._connection()
+        with db:
+            self._flush_touches(db)
+            if self.ttl_seconds:
+                expired = db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM alignments WHERE created_at < ?",
+                    (self._expiry_cutoff(),),
+                ).fetchone()
+                db.execute("DELETE FROM alignments WHERE created_at < ?", (self._expiry_cutoff(),))
+                result["expired"], result["bytes_reclaimed"] = expired
+
+            entries, total_bytes = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM alignments").fetchone()
+            victims = []
+            if (self.max_entries and entries > self.max_entries) or (self.max_bytes and total_bytes > self.max_bytes):
+                # Entries from other fingerprints can no longer be served, so they go first
+                order = _EVICTION_ORDER[self.policy]
+                for key, size in db.execute(
+                    f"SELECT key, size FROM alignments ORDER BY fingerprint = ?, {order}", (self.fingerprint,)
+                ):
+                    over_entries = self.max_entries and entries > self.max_entries
+                    over_bytes = self.max_bytes and total_bytes > self.max_bytes
+                    if not over_entries and not over_bytes:
+                        break
+                    victims.append(key)
+                    entries -= 1
+                    total_bytes -= size
+                    result["bytes_reclaimed"] += size
+
+            db.executemany("DELETE FROM alignments WHERE key=?", [(key,) for key in victims])
+            result["evicted"] = len(victims)
+
+        self._memory.discard(victims)
+
+        self._eviction_totals["runs"] += 1
+        for name, value in result.items():
+            self._eviction_totals[name] += value
+        if result["expired"] or result["evicted"]:
+            logger.info(
+                f"Cache eviction removed {result['expired']} expired and {result['evicted']} {self.policy} entries, "
+                f"reclaiming {result['bytes_reclaimed']} bytes"
+            )
+        return result
+
+    def rekey(self, apply: bool = False) -> Dict[str, int]:
+        """
+        Move entries to the keys the current normalization rules give them.
+
+        Entries stored under an older key scheme (e.g. before normalization)
+        are re-keyed from the request text recorded in them. Entries whose
+        texts now normalize to the same key collapse into the most recently
+        created one, keeping their combined hit count. Entries without
+        sentences cannot be re-keyed and are left alone.
+
+        Args:
+            apply: Rewrite the database; otherwise only report what would change
+
+        Returns:
+            Counts of entries examined, entries whose key changes, entries that
+            would be dropped by collapsing, groups of collapsing entries, and
+            entries that cannot be re-keyed
+        """
+        groups: Dict[str, List[Tuple[float, str, int]]] = {}
+        result = {"entries": 0, "rekeyed": 0, "collapsed": 0, "groups": 0, "unkeyable": 0}
+        db = self._connection()
+        with db:
+            self._flush_touches(db)
+        for key, data, created_at, hits in db.execute("SELECT key, data, created_at, hits FROM alignments"):
+            result["entries"] += 1
+            try:
+                new_key = self.key_for_entry(data)
+            except Exception as e:
+                logger.warning(f"Cache entry {key} is unreadable: {e}")
+                new_key = None
+            if new_key is None:
+                result["unkeyable"] += 1
+                continue
+            groups.setdefault(new_key, []).append((created_at, key, hits))
+
+        moves = []
+        losers = []
+        for new_key, entries in groups.items():
+            entries.sort(reverse=True)
+            if len(entries) > 1:
+                result["groups"] += 1
+                result["collapsed"] += len(entries) - 1
+            result["rekeyed"] += sum(1 for _, key, _ in entries if key != new_key)
+            winner = entries[0][1]
+            losers.extend(key for _, key, _ in entries[1:])
+            if winner != new_key or len(entries) > 1:
+                moves.append((new_key, sum(hits for _, _, hits in entries), winner))
+
+        if apply and moves:
+            with db:
+                # Losers go first: a loser may already hold its group's new key
+                db.executemany("DELETE FROM alignments WHERE key=?", [(key,) for key in losers])
+                db.executemany("UPDATE alignments SET key=?, hits=? WHERE key=?", moves)
+            self._memory.clear()
+            logger.info(
+                f"Re-keyed {result['rekeyed']} cache entries, collapsing {result['collapsed']} duplicates "
+                f"into {result['groups']} entries"
+            )
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count and size against the configured bounds, hits and misses per tier, and totals from evict()."""
+        entries, total_bytes, stale = (
+            self._connection()
+            .execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(fingerprint IS NOT ?), 0) FROM alignments",
+                (self.fingerprint,),
+            )
+            .fetchone()
+        )
+        return {
+            "entries": entries,
+            "bytes": total_bytes,
+            "stale_entries": stale,
+            "fingerprint": self.fingerprint,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "soft_ttl_seconds": self.soft_ttl_seconds,
+            "stale_while_revalidate": self.stale_while_revalidate,
+            "stale_hits": self._stale_hits,
+            "policy": self.policy,
+            "codec": self.codec_name,
+            "key_normalization": normalization_tag(self.fold_punctuation) if self.normalize_keys else None,
+            "eviction": dict(self._eviction_totals),
+            "tiers": {
+                "memory": self._memory.stats(),
+                "disk": {"hits": self._disk_hits, "misses": self._disk_misses},
+            },
+        }
@@ -1,27 +1,113 @@
 """Claude API client for generating alignment data."""
 
+import asyncio
 import json
 import logging
 import os
-from typing import Any, Dict
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from anthropic import Anthropic
+import httpx
+from anthropic import Anthropic, AsyncAnthropic, DefaultAsyncHttpxClient, Timeout
 
 from .types import Alignment, AlignmentLayers
 
 logger = logging.getLogger(__name__)
 
+LAYER_NAMES = ("lexical", "grammatical_relations", "features")
+
+CLAUDE_MODEL = "claude-opus-4-6"
+
+# Connections the async client keeps to the API, in total and idle
+CLAUDE_MAX_CONNECTIONS = int(os.getenv("CLAUDE_MAX_CONNECTIONS", "200"))
+CLAUDE_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("CLAUDE_MAX_KEEPALIVE_CONNECTIONS", "40"))
+# Alignment responses take tens of seconds; the connect timeout catches an unreachable API early
+CLAUDE_TIMEOUT_SECONDS = float(os.getenv("CLAUDE_TIMEOUT_SECONDS", "120"))
+CLAUDE_CONNECT_TIMEOUT_SECONDS = float(os.getenv("CLAUDE_CONNECT_TIMEOUT_SECONDS", "10"))
+# Retries of connection errors, 408, 409, 429 and 5xx, with the SDK's exponential backoff
+CLAUDE_MAX_RETRIES = int(os.getenv("CLAUDE_MAX_RETRIES", "2"))
+# Mark the static system prompt cacheable, so repeat calls read it from the prompt cache
+CLAUDE_PROMPT_CACHING = os.getenv("CLAUDE_PROMPT_CACHING", "1") == "1"
+
+_USAGE_FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+
+class ClaudeUsage:
+    """
+    Token usage across Claude calls in this process, from each response's `usage`.
+
+    Input tokens are split as the API reports them: `input_tokens` were
+    processed in full, `cache_creation_input_tokens` were written to the
+    prompt cache and `cache_read_input_tokens` were read from it. Streamed
+    calls also record their time to first token.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.tokens = dict.fromkeys(_USAGE_FIELDS, 0)
+        self.streams = 0
+        self.first_token_seconds = 0.0
+
+    def record(self, usage: Any) -> None:
+        """Add one response's usage; missing or null fields count as zero."""
+        with self._lock:
+            self.calls += 1
+            for field in _USAGE_FIELDS:
+                value = getattr(usage, field, None)
+                if isinstance(value, int):
+                    self.tokens[field] += value
+
+    def record_first_token(self, seconds: float) -> None:
+        with self._lock:
+            self.streams += 1
+            self.first_token_seconds += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """Token totals, the share of prompt tokens read from cache, and mean time to first token."""
+        with self._lock:
+            prompt_tokens = (
+                self.tokens["input_tokens"]
+                + self.tokens["cache_creation_input_tokens"]
+                + self.tokens["cache_read_input_tokens"]
+            )
+            return {
+                "prompt_caching": CLAUDE_PROMPT_CACHING,
+                "calls": self.calls,
+                **self.tokens,
+                "cache_read_ratio": round(self.tokens["cache_read_input_tokens"] / prompt_tokens, 3)
+                if prompt_tokens
+                else 0.0,
+                "avg_ttft_ms": round(self.first_token_seconds / self.streams * 1000, 1) if self.streams else 0.0,
+            }
+
+
+claude_usage = ClaudeUsage()
+
+
+def _client_options() -> Dict[str, Any]:
+    """Timeout and retry settings shared by the blocking and async clients."""
+    return {
+        "timeout": Timeout(CLAUDE_TIMEOUT_SECONDS, connect=CLAUDE_CONNECT_TIMEOUT_SECONDS),
+        "max_retries": CLAUDE_MAX_RETRIES,
+    }
+
+
+def _resolve_api_key(api_key: Optional[str]) -> str:
+    api_key = api_key or os.environ.get("CLAUDE_API_KEY")
+    if not api_key:
+        raise ValueError("CLAUDE_API_KEY environment variable or api_key parameter required")
+    return api_key
+
 
 class ClaudeClient:
     """Client for interacting with Claude API to generate alignment data."""
 
     def __init__(self, api_key: str | None = None):
         """Initialize Claude client with API key."""
-        self.api_key = api_key or os.environ.get("CLAUDE_API_KEY")
-        if not self.api_key:
-            raise ValueError("CLAUDE_API_KEY environment variable or api_key parameter required")
-
-        self.client = Anthropic(api_key=self.api_key)
+        self.api_key = _resolve_api_key(api_key)
+        self.client = Anthropic(api_key=self.api_key, **_client_options())
 
     def generate_alignments(
         self,
@@ -34,42 +120,80 @@ class ClaudeClient:
     ) -> AlignmentLayers:
         """Generate all three alignment layers using Claude."""
 
-        system_message = self._build_system_message()
-        user_message = self._build_user_message(
-            source_tokens, target_tokens, source_lang, target_lang, source_text, target_text
-        )
-
         try:
             logger.info("Calling Claude API for alignment generation")
             response = self.client.messages.create(
-                model="claude-opus-4-6",
-                max_tokens=4000,
-                temperature=0.1,
-                system=system_message,
-                messages=[{"role": "user", "content": user_message}],
-            )
-
-            content = response.content[0].text if response.content else ""
-            logger.info(f"Claude response received, length: {len(content)}")
-
-            alignments_data = self._parse_alignment_response(content)
-            logger.info(
-                f"Parsed alignments - Lexical: {len(alignments_data.get('lexical', []))}, "
-                f"Grammatical: {len(alignments_data.get('grammatical_relations', []))}, "
-                f"Features: {len(alignments_data.get('features', []))}"
-            )
-
-            return AlignmentLayers(
-                lexical=alignments_data.get("lexical", []),
-                grammatical_relations=alignments_data.get("grammatical_relations", []),
-                features=alignments_data.get("features", []),
+                **self._request_params(source_tokens, target_tokens, source_lang, target_lang, source_text, target_text)
             )
+            claude_usage.record(response.usage)
+            return self._layers_from_response(response)
 
         except Exception as e:
             logger.error(f"Claude API error: {e}")
             return AlignmentLayers()
 
-    def _build_system_message(self) -> str:
+    @classmethod
+    def _layers_from_response(cls, response: Any) -> AlignmentLayers:
+        """Parse a Messages API response into alignment layers."""
+        content = response.content[0].text if response.content else ""
+        logger.info(f"Claude response received, length: {len(content)}")
+
+        alignments_data = cls._parse_alignment_response(content)
+        logger.info(
+            f"Parsed alignments - Lexical: {len(alignments_data.get('lexical', []))}, "
+            f"Grammatical: {len(alignments_data.get('grammatical_relations', []))}, "
+            f"Features: {len(alignments_data.get('features', []))}"
+        )
+
+        return AlignmentLayers(
+            lexical=alignments_data.get("lexical", []),
+            grammatical_relations=alignments_data.get("grammatical_relations", []),
+            features=alignments_data.get("features", []),
+        )
+
+    @classmethod
+    def _request_params(
+        cls,
+        source_tokens: list[Dict[str, Any]],
+        target_tokens: list[Dict[str, Any]],
+        source_lang: str,
+        target_lang: str,
+        source_text: str,
+        target_text: str,
+    ) -> Dict[str, Any]:
+        """Build Messages API parameters shared by the blocking and streaming calls."""
+        return {
+            "model": CLAUDE_MODEL,
+            "max_tokens": 4000,
+            "temperature": 0.1,
+            "system": cls._system_blocks(),
+            "messages": [
+                {
+                    "role": "user",
+                    "content": cls._build_user_message(
+                        source_tokens, target_tokens, source_lang, target_lang, source_text, target_text
+                    ),
+                }
+            ],
+        }
+
+    @classmethod
+    def _system_blocks(cls) -> List[Dict[str, Any]]:
+        """
+        The system prompt as a text block, marked as a prompt cache breakpoint.
+
+        The prompt is identical on every call, so with caching only the first
+        call in each cache lifetime processes it in full. Prompts shorter than
+        the model's minimum cacheable length are processed as usual, which the
+        cache counters in `claude_usage` make visible.
+        """
+        block: Dict[str, Any] = {"type": "text", "text": cls._build_system_message()}
+        if CLAUDE_PROMPT_CACHING:
+            block["cache_control"] = {"type": "ephemeral"}
+        return [block]
+
+    @staticmethod
+    def _build_system_message() -> str:
         """Build static system message for alignment generation."""
         return """You are a linguist generating translation alignments for an interactive visualization tool.
 
@@ -174,8 +298,8 @@ Return ONLY a JSON object with this structure, no other text:
 
 Use only token IDs from the provided lists. Do not include any text outside the JSON object."""
 
+    @staticmethod
     def _build_user_message(
-        self,
         source_tokens: list[Dict[str, Any]],
         target_tokens: list[Dict[str, Any]],
         source_lang: str,
@@ -197,7 +321,8 @@ Target ({target_lang}): "{target_text}"
 ## Target tokens
 {json.dumps(target_tokens, indent=2)}"""
 
-    def _parse_alignment_response(self, content: str) -> Dict[str, list[Alignment]]:
+    @staticmethod
+    def _parse_alignment_response(content: str) -> Dict[str, list[Alignment]]:
         """Parse Claude's JSON response into alignment objects."""
         try:
             # Extract JSON from response (Claude might include explanation text)
@@ -213,14 +338,213 @@ Target ({target_lang}): "{target_text}"
 
             # Convert to Alignment objects
             result = {}
-            for layer_name in ["lexical", "grammatical_relations", "features"]:
-                alignments = []
-                for item in data.get(layer_name, []):
-                    alignments.append(Alignment(source=item["source"], target=item["target"], label=item["label"]))
-                result[layer_name] = alignments
+            for layer_name in LAYER_NAMES:
+                result[layer_name] = _to_alignments(data.get(layer_name, []))
 
             return result
 
         except (json.JSONDecodeError, KeyError, TypeError) as e:
             logger.error(f"Failed to parse Claude response: {e}")
             return {"lexical": [], "grammatical_relations": [], "features": []}
+
+
+class AsyncClaudeClient:
+    """
+    Awaitable Claude client, meant to be created once and shared by all requests.
+
+    Wraps one AsyncAnthropic client and its connection pool, bounded by
+    CLAUDE_MAX_CONNECTIONS, so concurrent alignment requests wait on
+    sockets rather than each holding a worker thread. Requests, parsing
+    and failure handling are the same as ClaudeClient's. Call aclose()
+    when done with it, or aclose_when_idle() to let calls already using it
+    finish first.
+    """
+
+    def __init__(self, api_key: str | None = None):
+        self.api_key = _resolve_api_key(api_key)
+        self.client = AsyncAnthropic(
+            api_key=self.api_key,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=CLAUDE_MAX_CONNECTIONS,
+                    max_keepalive_connections=CLAUDE_MAX_KEEPALIVE_CONNECTIONS,
+                )
+            ),
+            **_client_options(),
+        )
+        self._active = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def _begin_call(self) -> None:
+        self._active += 1
+        self._idle.clear()
+
+    def _end_call(self) -> None:
+        self._active -= 1
+        if not self._active:
+            self._idle.set()
+
+    async def generate_alignments(
+        self,
+        source_tokens: list[Dict[str, Any]],
+        target_tokens: list[Dict[str, Any]],
+        source_lang: str,
+        target_lang: str,
+        source_text: str,
+        target_text: str,
+    ) -> AlignmentLayers:
+        """Generate all three alignment layers using Claude; see ClaudeClient.generate_alignments."""
+        self._begin_call()
+        try:
+            logger.info("Calling Claude API for alignment generation")
+            response = await self.client.messages.create(
+                **ClaudeClient._request_params(
+                    source_tokens, target_tokens, source_lang, target_lang, source_text, target_text
+                )
+            )
+            claude_usage.record(response.usage)
+            return ClaudeClient._layers_from_response(response)
+
+        except Exception as e:
+            logger.error(f"Claude API error: {e}")
+            return AlignmentLayers()
+        finally:
+            self._end_call()
+
+    async def stream_alignments(
+        self,
+        source_tokens: list[Dict[str, Any]],
+        target_tokens: list[Dict[str, Any]],
+        source_lang: str,
+        target_lang: str,
+        source_text: str,
+        target_text: str,
+    ) -> AsyncIterator[Tuple[str, List[Alignment]]]:
+        """
+        Generate alignment layers from a streamed Claude response.
+
+        Yields (layer_name, alignments) as soon as each layer's JSON array is
+        complete, in the order Claude writes them. A stream that fails or ends
+        before the response's JSON object is complete raises after the layers
+        it did complete, so callers can tell a partial result from a finished
+        one.
+        """
+        parser = LayerStreamParser()
+        self._begin_call()
+        try:
+            logger.info("Streaming Claude API response for alignment generation")
+            started = time.perf_counter()
+            first_token = True
+            async with self.client.messages.stream(
+                **ClaudeClient._request_params(
+                    source_tokens, target_tokens, source_lang, target_lang, source_text, target_text
+                )
+            ) as stream:
+                async for text in stream.text_stream:
+                    if first_token:
+                        claude_usage.record_first_token(time.perf_counter() - started)
+                        first_token = False
+                    for layer in parser.feed(text):
+                        yield layer
+                claude_usage.record((await stream.get_final_message()).usage)
+
+        except Exception as e:
+            logger.error(f"Claude API error: {e}")
+            raise
+        finally:
+            self._end_call()
+
+        if not parser.finished:
+            raise ValueError("Claude response ended before its alignment JSON was complete")
+
+    async def aclose(self) -> None:
+        """Close the connection pool."""
+        await self.client.close()
+
+    async def aclose_when_idle(self) -> None:
+        """Close the connection pool once no call is using it."""
+        await self._idle.wait()
+        await self.aclose()
+
+
+def _to_alignments(items: list[Dict[str, Any]]) -> list[Alignment]:
+    """Convert raw JSON alignment items to Alignment objects."""
+    return [Alignment(source=item["source"], target=item["target"], label=item["label"]) for item in items]
+
+
+class LayerStreamParser:
+    """
+    Incrementally extract completed alignment layers from streamed JSON text.
+
+    Claude answers with one JSON object whose values are arrays. The parser
+    tracks nesting and string state across chunks and parses each top-level
+    array as soon as its closing bracket arrives, so a layer is available
+    before the rest of the object has been generated. Text before the opening
+    brace is ignored, matching _parse_alignment_response. `finished` turns
+    true once the object's closing brace arrives.
+    """
+
+    def __init__(self):
+        self.finished = False
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._array_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._emitted: set[str] = set()
+
+    def feed(self, chunk: str) -> List[Tuple[str, List[Alignment]]]:
+        """Consume a chunk of response text and return any layers it completed."""
+        self._text += chunk
+        completed = []
+
+        while self._pos < len(self._text):
+            char = self._text[self._pos]
+
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._key = json.loads(self._text[self._string_start : self._pos + 1])
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif char in "{[":
+                if self._depth == 1 and char == "[":
+                    self._array_start = self._pos
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                self.finished = self._depth == 0
+                if self._depth == 1 and self._array_start is not None:
+                    layer = self._complete_layer(self._text[self._array_start : self._pos + 1])
+                    if layer:
+                        completed.append(layer)
+                    self._array_start = None
+
+            self._pos += 1
+
+        return completed
+
+    def _complete_layer(self, array_text: str) -> Optional[Tuple[str, List[Alignment]]]:
+        name = self._key
+        if name not in LAYER_NAMES or name in self._emitted:
+            return None
+        self._emitted.add(name)
+
+        try:
+            return name, _to_alignments(json.loads(array_text))
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            logger.error(f"Failed to parse streamed {name} layer: {e}")
+            return name, []
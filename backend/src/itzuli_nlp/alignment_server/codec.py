@@ -0,0 +1,73 @@
+"""Versioned encodings for cached alignment entries."""
+
+import zlib
+from typing import Union
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+# Encoded entries start with this byte, which never starts JSON text, so
+# entries written before encodings were versioned still decode as JSON.
+_MAGIC = b"\xa1"
+FORMAT_VERSION = 1
+
+_CODEC_IDS = {"json": 0, "zlib": 1, "zstd": 2}
+_CODEC_NAMES = {codec_id: name for name, codec_id in _CODEC_IDS.items()}
+CODECS = tuple(_CODEC_IDS)
+
+
+def check_codec(codec: str) -> None:
+    """Raise ValueError if `codec` is unknown or its library is not installed."""
+    if codec not in _CODEC_IDS:
+        raise ValueError(f"Unknown cache codec: {codec} (expected one of {', '.join(CODECS)})")
+    if codec == "zstd" and zstandard is None:
+        raise ValueError("The zstd cache codec requires the zstandard package")
+
+
+def encode(payload: bytes, codec: str) -> bytes:
+    """
+    Encode minified JSON with `codec`, behind a magic byte, format version and codec id.
+
+    Args:
+        payload: Minified JSON bytes
+        codec: One of CODECS
+
+    Returns:
+        Header followed by the encoded payload
+    """
+    check_codec(codec)
+    if codec == "zlib":
+        payload = zlib.compress(payload, 6)
+    elif codec == "zstd":
+        payload = zstandard.ZstdCompressor(level=3).compress(payload)
+    return _MAGIC + bytes([FORMAT_VERSION, _CODEC_IDS[codec]]) + payload
+
+
+def decode(stored: Union[bytes, str]) -> bytes:
+    """
+    Decode an entry written by encode(), or a legacy plain JSON entry, back to JSON bytes.
+
+    Raises:
+        ValueError: If the entry has an unknown format version or codec
+    """
+    if isinstance(stored, str):
+        return stored.encode()
+    if not stored.startswith(_MAGIC):
+        return stored
+
+    version, codec_id = stored[1], stored[2]
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported cache entry format version {version}")
+    codec = _CODEC_NAMES.get(codec_id)
+    if codec is None:
+        raise ValueError(f"Unknown cache entry codec id {codec_id}")
+
+    payload = stored[3:]
+    if codec == "zlib":
+        return zlib.decompress(payload)
+    if codec == "zstd":
+        check_codec(codec)
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return payload
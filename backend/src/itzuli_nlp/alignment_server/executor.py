@@ -0,0 +1,117 @@
+"""Bounded thread-pool stages for running blocking work off the event loop."""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+IO_CONCURRENCY = int(os.getenv("IO_CONCURRENCY", "16"))
+IO_MAX_QUEUE = int(os.getenv("IO_MAX_QUEUE", "0"))
+NLP_CONCURRENCY = int(os.getenv("NLP_CONCURRENCY", "2"))
+NLP_MAX_QUEUE = int(os.getenv("NLP_MAX_QUEUE", "0"))
+
+
+class StageSaturatedError(RuntimeError):
+    """Raised when a stage's queue is full and new work is rejected."""
+
+
+class Stage:
+    """
+    A named, bounded thread pool that async code can await work on.
+
+    At most `max_workers` calls run at once; further calls wait in the
+    queue. When `max_queue` is non-zero, calls beyond that many waiting
+    ones are rejected with StageSaturatedError instead of piling up.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int = 0):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-stage")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run `fn(*args, **kwargs)` on this stage's pool and await the result."""
+        with self._lock:
+            if self.max_queue and self._queued >= self.max_queue:
+                self._rejected += 1
+                raise StageSaturatedError(f"{self.name} stage queue is full ({self._queued} waiting)")
+            self._queued += 1
+
+        future = self._executor.submit(self._invoke, fn, time.monotonic(), args, kwargs)
+        future.add_done_callback(self._forget_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def _forget_cancelled(self, future: Future) -> None:
+        # Cancelling the awaiting task cancels a call that is still queued, so _invoke never runs for it
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def _invoke(self, fn: Callable[..., T], enqueued_at: float, args: tuple, kwargs: dict) -> T:
+        waited = time.monotonic() - enqueued_at
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+            self._wait_seconds += waited
+            self._max_wait_seconds = max(self._max_wait_seconds, waited)
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, concurrency and wait times for this stage."""
+        with self._lock:
+            started = self._completed + self._active
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self._queued,
+                "active": self._active,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_seconds / started * 1000, 2) if started else 0.0,
+                "max_wait_ms": round(self._max_wait_seconds * 1000, 2),
+            }
+
+    def shutdown(self) -> None:
+        """Stop accepting work and wait for running calls to finish."""
+        self._executor.shutdown(wait=True)
+
+
+# Network I/O: Itzuli, Claude and cache disk access.
+io_stage = Stage("io", IO_CONCURRENCY, IO_MAX_QUEUE)
+# Stanza analysis for batch requests, which wait on the per-language batcher.
+# Single requests await the batcher directly and take no worker here.
+nlp_stage = Stage("nlp", NLP_CONCURRENCY, NLP_MAX_QUEUE)
+
+
+def stage_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every stage, keyed by stage name."""
+    return {stage.name: stage.stats() for stage in (io_stage, nlp_stage)}
@@ -0,0 +1,42 @@
+"""Fingerprint of everything that shapes a generated alignment, for invalidating cached ones."""
+
+import hashlib
+import json
+from functools import lru_cache
+from typing import Dict
+
+import stanza
+from stanza.resources.common import DEFAULT_RESOURCES_VERSION
+
+from .claude_client import CLAUDE_MODEL, ClaudeClient
+from .scaffold import SCAFFOLD_VERSION
+
+
+def _prompt_hash() -> str:
+    """Hash of the system message and the user message template."""
+    template = ClaudeClient._build_user_message([], [], "{source_lang}", "{target_lang}", "{source}", "{target}")
+    prompt = ClaudeClient._build_system_message() + "\0" + template
+    return hashlib.sha256(prompt.encode()).hexdigest()[:16]
+
+
+def fingerprint_components() -> Dict[str, str]:
+    """The versions folded into the fingerprint, by name."""
+    return {
+        "prompt": _prompt_hash(),
+        "claude_model": CLAUDE_MODEL,
+        "stanza": stanza.__version__,
+        "stanza_resources": DEFAULT_RESOURCES_VERSION,
+        "scaffold": str(SCAFFOLD_VERSION),
+    }
+
+
+@lru_cache(maxsize=1)
+def alignment_fingerprint() -> str:
+    """
+    Short hash identifying the prompt, Claude model, Stanza version and scaffold format.
+
+    Cached alignments generated under a different fingerprint are treated as
+    misses, so changing any of them regenerates entries as they are requested.
+    """
+    components = json.dumps(fingerprint_components(), sort_keys=True)
+    return hashlib.sha256(components.encode()).hexdigest()[:16]
@@ -0,0 +1,152 @@
+"""Persistent job table for asynchronous alignment generation, backed by SQLite."""
+
+import json
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import aiosqlite
+
+DB_PATH = os.getenv("JOBS_DB", ".cache/jobs.db")
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+
+# Identifies the server launch that owns a job; unfinished jobs owned by an
+# earlier launch were interrupted by a restart and can be resumed.
+LAUNCH_ID = os.getenv("ALIGNMENT_BOOT_ID") or uuid.uuid4().hex
+# Owner recorded on this process's jobs; pre-fork workers add their slot and generation
+BOOT_ID = LAUNCH_ID
+# Owner prefix of the pre-fork worker slot this process runs in, if any
+_WORKER_SLOT: Optional[str] = None
+
+_UNFINISHED = ("queued", "running")
+
+
+@asynccontextmanager
+async def _connect() -> AsyncIterator[aiosqlite.Connection]:
+    os.makedirs(os.path.dirname(os.path.abspath(DB_PATH)), exist_ok=True)
+    async with aiosqlite.connect(DB_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        await db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT, request TEXT, boot_id TEXT, "
+            "created_at REAL, updated_at REAL, timings TEXT, result TEXT, error TEXT)"
+        )
+        yield db
+
+
+def set_worker(index: int, generation: int) -> None:
+    """
+    Own this process's jobs as generation `generation` of pre-fork worker `index`.
+
+    Sibling workers of the same launch leave each other's jobs alone, but a
+    worker forked to replace a dead one claims its predecessors' jobs.
+    """
+    global BOOT_ID, _WORKER_SLOT
+    _WORKER_SLOT = f"{LAUNCH_ID}/{index}/"
+    BOOT_ID = f"{_WORKER_SLOT}{generation}"
+
+
+def _interrupted(owner: str) -> bool:
+    """Whether the launch or worker that owned a job is gone."""
+    if owner.split("/", 1)[0] != LAUNCH_ID:
+        return True
+    return _WORKER_SLOT is not None and owner.startswith(_WORKER_SLOT) and owner != BOOT_ID
+
+
+def _to_dict(row: aiosqlite.Row) -> Dict[str, Any]:
+    return {
+        "id": row["id"],
+        "status": row["status"],
+        "request": json.loads(row["request"]),
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+        "timings": json.loads(row["timings"]) if row["timings"] else {},
+        "result": json.loads(row["result"]) if row["result"] else None,
+        "error": row["error"],
+    }
+
+
+async def create_job(request: Dict[str, Any]) -> str:
+    """Record a new queued job for `request` and return its id."""
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    async with _connect() as db:
+        await db.execute(
+            "INSERT INTO jobs (id, status, request, boot_id, created_at, updated_at) VALUES (?,?,?,?,?,?)",
+            (job_id, "queued", json.dumps(request), BOOT_ID, now, now),
+        )
+        await db.commit()
+    return job_id
+
+
+async def update_job(
+    job_id: str,
+    status: str,
+    timings: Optional[Dict[str, float]] = None,
+    result: Optional[Dict[str, Any]] = None,
+    error: Optional[str] = None,
+) -> None:
+    """Set a job's status, and its timings, result or error when given."""
+    async with _connect() as db:
+        await db.execute(
+            "UPDATE jobs SET status=?, updated_at=?, "
+            "timings=COALESCE(?, timings), result=COALESCE(?, result), error=COALESCE(?, error) "
+            "WHERE id=?",
+            (
+                status,
+                time.time(),
+                json.dumps(timings) if timings is not None else None,
+                json.dumps(result) if result is not None else None,
+                error,
+                job_id,
+            ),
+        )
+        await db.commit()
+
+
+async def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return a job as a dict, or None if no such job exists."""
+    async with _connect() as db:
+        row = await (await db.execute("SELECT * FROM jobs WHERE id=?", (job_id,))).fetchone()
+    return _to_dict(row) if row else None
+
+
+async def claim_interrupted_jobs() -> List[Dict[str, Any]]:
+    """
+    Take ownership of unfinished jobs left behind by an earlier server launch,
+    or by the dead pre-fork worker this one replaced.
+
+    Each job is claimed with a conditional update, so when several workers
+    start at once every interrupted job is resumed by exactly one of them.
+    """
+    claimed = []
+    async with _connect() as db:
+        rows = await (
+            await db.execute(
+                "SELECT * FROM jobs WHERE status IN (?,?) AND boot_id != ?", (*_UNFINISHED, BOOT_ID)
+            )
+        ).fetchall()
+        for row in rows:
+            if not _interrupted(row["boot_id"]):
+                continue
+            cursor = await db.execute(
+                "UPDATE jobs SET boot_id=?, status='queued', updated_at=? WHERE id=? AND boot_id=?",
+                (BOOT_ID, time.time(), row["id"], row["boot_id"]),
+            )
+            if cursor.rowcount == 1:
+                claimed.append(_to_dict(row))
+        await db.commit()
+    return claimed
+
+
+async def prune_jobs(max_age_seconds: int = JOB_RETENTION_SECONDS) -> int:
+    """Delete finished jobs older than `max_age_seconds`; returns how many were removed."""
+    async with _connect() as db:
+        cursor = await db.execute(
+            "DELETE FROM jobs WHERE status NOT IN (?,?) AND updated_at < ?",
+            (*_UNFINISHED, time.time() - max_age_seconds),
+        )
+        await db.commit()
+        return cursor.rowcount
@@ -0,0 +1,198 @@
+"""
+Pre-fork launcher for running the alignment server on several worker processes.
+
+The parent loads every Stanza pipeline once, freezes the garbage collector so
+the model objects' pages are never written to again, then forks uvicorn
+workers that share a listening socket. The workers inherit the models
+copy-on-write instead of loading their own copies.
+
+Usage:
+    WEB_CONCURRENCY=2 python -m itzuli_nlp.alignment_server.prefork
+"""
+
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+import uuid
+from typing import Dict, List, Optional
+
+WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+MEMORY_REPORT_INTERVAL = int(os.getenv("MEMORY_REPORT_INTERVAL", "300"))
+# A worker that exits this many times within the window is failing to run; the launcher gives up
+WORKER_MAX_RESTARTS = int(os.getenv("WORKER_MAX_RESTARTS", "5"))
+WORKER_RESTART_WINDOW = int(os.getenv("WORKER_RESTART_WINDOW", "60"))
+WORKER_RESTART_MAX_DELAY = float(os.getenv("WORKER_RESTART_MAX_DELAY", "30"))
+
+logger = logging.getLogger("itzuli_nlp.alignment_server.prefork")
+
+
+class RestartPolicy:
+    """
+    Backoff and limit for re-forking workers that exit.
+
+    Each restart of a worker within `window` seconds of its earlier ones
+    waits twice as long as the last, from half a second up to `max_delay`.
+    A worker that already restarted `max_restarts` times within the window
+    is not restarted again.
+    """
+
+    def __init__(
+        self,
+        max_restarts: int = WORKER_MAX_RESTARTS,
+        window: float = WORKER_RESTART_WINDOW,
+        max_delay: float = WORKER_RESTART_MAX_DELAY,
+    ):
+        self.max_restarts = max_restarts
+        self.window = window
+        self.max_delay = max_delay
+        self._restarts: Dict[int, List[float]] = {}
+
+    def delay(self, index: int, now: float) -> Optional[float]:
+        """Seconds to wait before restarting worker `index`, or None if it has restarted too often."""
+        recent = [started for started in self._restarts.get(index, []) if now - started < self.window]
+        if len(recent) >= self.max_restarts:
+            return None
+        recent.append(now)
+        self._restarts[index] = recent
+        return min(self.max_delay, 0.5 * 2 ** (len(recent) - 1))
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _spawn(sock: socket.socket, index: int, generation: int) -> int:
+    """Fork one uvicorn worker serving on `sock`; returns the child's pid in the parent."""
+    pid = os.fork()
+    if pid:
+        return pid
+
+    # Child: restore default signal handling for uvicorn and resume collection
+    # for objects created from here on; the frozen parent heap stays untouched.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    gc.enable()
+
+    import uvicorn
+
+    from . import jobs
+    from .server import app
+
+    # Own jobs per worker, so a replacement for a crashed worker resumes its jobs
+    jobs.set_worker(index, generation)
+
+    logger.info(f"Worker {index} started (pid {os.getpid()})")
+    uvicorn.Server(uvicorn.Config(app, log_config=None)).run(sockets=[sock])
+    os._exit(0)
+
+
+def _report_memory(workers: Dict[int, int]) -> None:
+    from ..core.memory import process_memory
+
+    for pid, index in sorted(workers.items(), key=lambda item: item[1]):
+        try:
+            usage = process_memory(pid)
+        except OSError:
+            continue
+        logger.info(
+            f"Worker {index} (pid {pid}): "
+            f"rss={usage['rss_bytes'] // 2**20} MiB "
+            f"shared={usage.get('shared_bytes', 0) // 2**20} MiB "
+            f"private={usage.get('private_bytes', 0) // 2**20} MiB"
+        )
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    gc.disable()
+
+    # Workers share one launch id so jobs interrupted by a restart are resumed by only one of them
+    os.environ.setdefault("ALIGNMENT_BOOT_ID", uuid.uuid4().hex)
+
+    from ..core.pipelines import pipeline_registry
+    from .server import PRELOAD_LANGUAGES
+
+    port = int(os.environ.get("PORT", 8000))
+    host = os.environ.get("HOST", "0.0.0.0")
+
+    # Load only: warm-up inference starts torch's thread pool, which must not
+    # be running at fork time. Each worker runs its own warm-up on startup.
+    logger.info("Pre-loading Stanza pipelines in parent process...")
+    for lang in PRELOAD_LANGUAGES:
+        pipeline_registry.get(lang)
+
+    sock = _bind(host, port)
+    gc.collect()
+    gc.freeze()
+
+    logger.info(f"Starting {WORKERS} alignment server workers on {host}:{port}")
+    workers = {_spawn(sock, index, 0): index for index in range(WORKERS)}
+    # Worker index -> how many times it has been forked
+    generations = {index: 1 for index in range(WORKERS)}
+
+    stopping = False
+    failed = False
+    restarts = RestartPolicy()
+    # Worker index -> monotonic time at which to fork it again
+    pending: Dict[int, float] = {}
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        pending.clear()
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    last_report = time.monotonic()
+    while workers or pending:
+        pid, status = os.waitpid(-1, os.WNOHANG) if workers else (0, 0)
+        if pid:
+            index = workers.pop(pid, None)
+            if index is not None and not stopping:
+                delay = restarts.delay(index, time.monotonic())
+                if delay is None:
+                    logger.error(
+                        f"Worker {index} (pid {pid}) exited with status {status} after "
+                        f"{restarts.max_restarts} restarts within {restarts.window:g}s; stopping all workers"
+                    )
+                    failed = True
+                    stop(None, None)
+                else:
+                    logger.warning(
+                        f"Worker {index} (pid {pid}) exited with status {status}; restarting in {delay:.1f}s"
+                    )
+                    pending[index] = time.monotonic() + delay
+            continue
+
+        now = time.monotonic()
+        for index in [index for index, due in pending.items() if due <= now]:
+            if pending.pop(index, None) is not None:
+                workers[_spawn(sock, index, generations[index])] = index
+                generations[index] += 1
+
+        if MEMORY_REPORT_INTERVAL and now - last_report >= MEMORY_REPORT_INTERVAL:
+            _report_memory(workers)
+            last_report = time.monotonic()
+        time.sleep(0.5)
+
+    logger.info("All workers stopped")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
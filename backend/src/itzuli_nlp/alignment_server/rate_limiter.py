@@ -11,12 +11,13 @@ DAILY_LIMIT = int(os.getenv("DAILY_LIMIT", "10"))
 _LOOPBACK = {"127.0.0.1", "::1", "localhost"}
 
 
-async def check_and_increment(ip: str) -> tuple[bool, int]:
+async def check_and_increment(ip: str, cost: int = 1) -> tuple[bool, int]:
     """
-    Check whether `ip` is under the daily limit and increment its count if so.
+    Check whether `ip` has `cost` requests left today and increment its count if so.
 
     Returns (allowed, remaining) where `remaining` is the number of requests
-    left after this one (0 when the limit is exactly reached).
+    left after this one (0 when the limit is exactly reached). Batch requests
+    pass their item count as `cost` so they draw on the same daily quota.
 
     Loopback addresses (127.0.0.1, ::1) are always allowed without counting,
     so local development is unaffected.
@@ -37,13 +38,13 @@ async def check_and_increment(ip: str) -> tuple[bool, int]:
         ).fetchone()
         count = row[0] if row else 0
 
-        if count >= DAILY_LIMIT:
-            return False, 0
+        if count + cost > DAILY_LIMIT:
+            return False, max(DAILY_LIMIT - count, 0)
 
         await db.execute(
-            "INSERT INTO usage (ip, day, count) VALUES (?,?,1) "
-            "ON CONFLICT(ip, day) DO UPDATE SET count=count+1",
-            (ip, day),
+            "INSERT INTO usage (ip, day, count) VALUES (?,?,?) "
+            "ON CONFLICT(ip, day) DO UPDATE SET count=count+?",
+            (ip, day, cost, cost),
         )
         await db.commit()
-        return True, DAILY_LIMIT - count - 1
+        return True, DAILY_LIMIT - count - cost
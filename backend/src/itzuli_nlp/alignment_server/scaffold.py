@@ -13,6 +13,9 @@ from .types import (
     TokenizedSentence,
 )
 
+# Bump when the scaffold's tokens, ids or features change for the same analysis
+SCAFFOLD_VERSION = 1
+
 
 def parse_features_string(feats_string: str, language: str = "en") -> List[str]:
     """
@@ -1,38 +1,97 @@
 """FastAPI HTTP server for alignment data generation."""
 
+import asyncio
+import json
 import logging
 import os
+import time
+from concurrent.futures import Future
 from contextlib import asynccontextmanager
-from typing import List
+from typing import AsyncIterator, Dict, List, Literal, Optional, Tuple, Union, get_args
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+
+from ..core.analysis_cache import analysis_cache
+from ..core.itzuli_client import ItzuliUnavailableError, itzuli_client
+from ..core.memory import process_memory
+from ..core.pipelines import pipeline_registry
+from ..core.translation_cache import translation_cache
 from ..core.types import AnalysisRow, LanguageCode
-from ..tools.dual_analysis import analyze_both_texts, get_cached_pipeline
-from .alignment_generator import create_enriched_alignment_data
-from .cache import AlignmentCache
+from ..tools.dual_analysis import (
+    batch_analyze,
+    batcher,
+    preload_pipelines,
+    translate_text,
+)
+from . import jobs
+from .alignment_generator import (
+    create_enriched_alignment_data_async,
+    has_alignments,
+    stream_alignments_for_pair_async,
+)
+from .cache import AlignmentCache, CachedResponse, NegativeCache
+from .claude_client import AsyncClaudeClient, claude_usage
+from .executor import StageSaturatedError, io_stage, nlp_stage, stage_stats
 from .rate_limiter import check_and_increment
-from .types import SentencePair
+from .scaffold import build_scaffold
+from .singleflight import SingleFlight
+from .types import AlignmentData, AlignmentLayers, SentencePair, TokenizedSentence
 
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-PRELOAD_LANGUAGES: list[LanguageCode] = ["eu", "en", "es", "fr"]
+
+def _parse_languages(value: str) -> list[LanguageCode]:
+    """Supported language codes from a comma-separated list; unsupported entries are logged and skipped."""
+    languages = []
+    for entry in value.split(","):
+        language = entry.strip()
+        if not language or language in languages:
+            continue
+        if language not in get_args(LanguageCode):
+            logger.warning(f"Ignoring unsupported language in PRELOAD_LANGUAGES: {language!r}")
+            continue
+        languages.append(language)
+    return languages
+
+
+# Languages loaded at startup; anything else is loaded on first use. Empty to load everything lazily.
+PRELOAD_LANGUAGES = _parse_languages(os.getenv("PRELOAD_LANGUAGES", "eu,en,es,fr"))
+# Seconds between attempts to load again a preloaded language that failed; 0 disables retries
+PRELOAD_RETRY_INTERVAL = int(os.getenv("PRELOAD_RETRY_INTERVAL", "30"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "200"))
+CACHE_EVICTION_INTERVAL = int(os.getenv("ALIGNMENT_CACHE_EVICTION_INTERVAL", "300"))
+
+
+# Warm-up futures for PRELOAD_LANGUAGES, reported by /ready
+_preload: Dict[str, Future] = {}
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    logger.info("Pre-loading Stanza pipelines...")
-    for lang in PRELOAD_LANGUAGES:
-        get_cached_pipeline(lang)
-    logger.info("Stanza pipelines ready.")
+    # Pipelines load in the background; cache hits and already-loaded
+    # languages are served while the rest are still loading.
+    logger.info(f"Pre-loading Stanza pipelines in the background: {', '.join(PRELOAD_LANGUAGES)}")
+    _preload.update(preload_pipelines(PRELOAD_LANGUAGES))
+    await _resume_interrupted_jobs()
+    if os.environ.get("CLAUDE_API_KEY"):
+        app.state.claude_client = AsyncClaudeClient()
+    eviction = asyncio.create_task(_evict_cache_periodically())
+    preload_retries = asyncio.create_task(_retry_preloads_periodically()) if PRELOAD_RETRY_INTERVAL else None
     yield
+    eviction.cancel()
+    if preload_retries is not None:
+        preload_retries.cancel()
+    claude_client = getattr(app.state, "claude_client", None)
+    if claude_client is not None:
+        app.state.claude_client = None
+        await claude_client.aclose()
 
 
 app = FastAPI(
@@ -44,6 +103,12 @@ app = FastAPI(
 
 # Initialize cache
 cache = AlignmentCache()
+# Recent upstream failures, kept out of the cache above and retried once they expire
+negative_cache = NegativeCache()
+# Identical concurrent requests share a single pipeline run
+inflight = SingleFlight()
+# Jobs resumed at startup and stale-entry refreshes, referenced until they finish
+_background_jobs: set[asyncio.Task] = set()
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -54,6 +119,32 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(StageSaturatedError)
+async def stage_saturated_handler(request: Request, exc: StageSaturatedError):
+    """Shed load with a 503 when a worker stage's queue is full."""
+    logger.warning(f"Rejecting request: {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"error": "overloaded", "message": "Server is busy. Try again shortly."},
+        headers={"Retry-After": "5"},
+    )
+
+
+@app.exception_handler(ItzuliUnavailableError)
+async def itzuli_unavailable_handler(request: Request, exc: ItzuliUnavailableError):
+    """Fail fast with a 503 while the Itzuli circuit breaker is open."""
+    logger.warning(f"Rejecting request: {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"error": "upstream_unavailable", "message": "Translation service is unavailable. Try again shortly."},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+    )
+
+
+# Temporary conditions answered with a 503 and never negatively cached
+_RETRY_LATER = (StageSaturatedError, ItzuliUnavailableError)
+
+
 class AnalysisRequest(BaseModel):
     """Request model for dual analysis."""
 
@@ -63,6 +154,47 @@ class AnalysisRequest(BaseModel):
     sentence_id: str = "default"
 
 
+class BatchAnalysisRequest(BaseModel):
+    """Request model for analyzing and scaffolding many sentences at once."""
+
+    items: List[AnalysisRequest] = Field(min_length=1)
+
+
+class BatchItemStatus(BaseModel):
+    """Outcome for one item of a batch request, in input order."""
+
+    index: int
+    sentence_id: str
+    status: Literal["cached", "generated", "failed"]
+    error: Optional[str] = None
+
+
+class BatchAnalysisResponse(BaseModel):
+    """Response model for batch analysis: one SentencePair and one status per input item."""
+
+    data: AlignmentData
+    items: List[BatchItemStatus]
+
+
+class JobSubmission(BaseModel):
+    """Response model for a newly submitted alignment job."""
+
+    job_id: str
+    status: str
+
+
+class JobStatus(BaseModel):
+    """Response model for polling an alignment job."""
+
+    job_id: str
+    status: Literal["queued", "running", "completed", "failed"]
+    created_at: float
+    updated_at: float
+    timings: Dict[str, float] = Field(default_factory=dict)
+    result: Optional[SentencePair] = None
+    error: Optional[str] = None
+
+
 class AnalysisResponse(BaseModel):
     """Response model for dual analysis."""
 
@@ -76,10 +208,53 @@ class AnalysisResponse(BaseModel):
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """Liveness check endpoint; does not wait for pipelines to load (see /ready)."""
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Per-language pipeline load state; 503 until every preloaded language has loaded and warmed up.
+
+    A language that failed is loaded again every PRELOAD_RETRY_INTERVAL
+    seconds, so readiness recovers once the cause is fixed.
+    """
+    languages = {}
+    for language, future in _preload.items():
+        if not future.done():
+            languages[language] = {"state": pipeline_registry.state(language), "error": None}
+        elif future.exception() is not None:
+            languages[language] = {"state": "failed", "error": str(future.exception())}
+        else:
+            languages[language] = {"state": "ready", "error": None}
+
+    states = {entry["state"] for entry in languages.values()}
+    status = "failed" if "failed" in states else "ready" if states <= {"ready"} else "loading"
+    return JSONResponse(
+        status_code=200 if status == "ready" else 503,
+        content={"status": status, "languages": languages},
+    )
+
+
+@app.get("/metrics")
+async def metrics():
+    """Worker stage queue depth, loaded pipelines, Stanza batching, cache sizes, request coalescing and memory."""
+    return {
+        "stages": stage_stats(),
+        "cache": await io_stage.run(cache.stats),
+        "pipelines": pipeline_registry.stats(),
+        "batching": batcher.stats(),
+        "coalescing": inflight.stats(),
+        "negative_cache": negative_cache.stats(),
+        "translations": await io_stage.run(translation_cache.stats),
+        "itzuli": itzuli_client.stats(),
+        "claude": claude_usage.stats(),
+        "analyses": analysis_cache.stats(),
+        "process": {"pid": os.getpid(), "memory": process_memory()},
+    }
+
+
 @app.options("/analyze-and-scaffold")
 async def options_analyze_and_scaffold():
     """Handle preflight OPTIONS request for analyze-and-scaffold endpoint."""
@@ -98,8 +273,11 @@ async def analyze_texts(request: AnalysisRequest):
         raise HTTPException(status_code=500, detail="ITZULI_API_KEY not configured")
 
     try:
-        translated_text, source_analysis, target_analysis = analyze_both_texts(
-            api_key=api_key, text=request.text, source_language=request.source_lang, target_language=request.target_lang
+        translated_text, source_analysis, target_analysis = await _analyze_both(
+            api_key=api_key,
+            text=request.text,
+            source_language=request.source_lang,
+            target_language=request.target_lang,
         )
 
         return AnalysisResponse(
@@ -111,25 +289,33 @@ async def analyze_texts(request: AnalysisRequest):
             target_analysis=target_analysis,
         )
 
+    except _RETRY_LATER:
+        raise
     except Exception as e:
         logger.error(f"Analysis failed: {e}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
-@app.post("/analyze-and-scaffold", response_model=SentencePair)
-async def analyze_and_scaffold(request: AnalysisRequest, req: Request):
-    """
-    Combined endpoint: analyze both texts, generate scaffold, and enrich with Claude-generated alignments.
-    """
-    ip = (req.headers.get("X-Forwarded-For") or req.client.host or "unknown").split(",")[0].strip()
-    allowed, remaining = await check_and_increment(ip)
+def _client_ip(req: Request) -> str:
+    """Client IP for rate limiting, honoring the proxy's X-Forwarded-For header."""
+    return (req.headers.get("X-Forwarded-For") or req.client.host or "unknown").split(",")[0].strip()
+
+
+async def _rate_limit(req: Request, cost: int = 1) -> Optional[JSONResponse]:
+    """Charge `cost` requests to the client's daily quota; return a 429 response if it is exhausted."""
+    ip = _client_ip(req)
+    allowed, remaining = await check_and_increment(ip, cost=cost)
     if not allowed:
         return JSONResponse(
             status_code=429,
             content={"error": "rate_limited", "message": "Daily limit reached. Try again tomorrow."},
         )
     logger.info(f"Rate limit check passed for {ip}: {remaining} requests remaining today")
+    return None
+
 
+def _api_keys() -> Tuple[str, str]:
+    """Itzuli and Claude API keys from the environment, or a 500 if either is missing."""
     itzuli_api_key = os.environ.get("ITZULI_API_KEY")
     if not itzuli_api_key:
         raise HTTPException(status_code=500, detail="ITZULI_API_KEY not configured")
@@ -138,43 +324,573 @@ async def analyze_and_scaffold(request: AnalysisRequest, req: Request):
     if not claude_api_key:
         raise HTTPException(status_code=500, detail="CLAUDE_API_KEY not configured")
 
-    # Check cache first
-    cached_data = cache.get(request.text, request.source_lang, request.target_lang)
-    if cached_data:
-        logger.info(f"Cache hit for text: {request.text[:50]}...")
-        return cached_data.sentences[0]
+    return itzuli_api_key, claude_api_key
+
+
+async def _generate_alignment(
+    request: AnalysisRequest,
+    itzuli_api_key: str,
+    claude_api_key: str,
+    timings: Optional[Dict[str, float]] = None,
+) -> AlignmentData:
+    """
+    Run the full translate/analyze/align pipeline for a request and cache the result.
+
+    When `timings` is given, the duration of each stage in milliseconds is recorded into it.
+    Results without alignments (Claude failed and the bare scaffold came back) and
+    exceptions are only kept in the short-lived negative cache, which answers
+    retries of the same request until it expires.
+    """
+    timings = {} if timings is None else timings
+    cache_key = cache.key_for(request.text, request.source_lang, request.target_lang)
+    recent_failure = negative_cache.get(cache_key)
+    if isinstance(recent_failure, BaseException):
+        raise recent_failure
+    if recent_failure is not None:
+        logger.info(f"Serving recent degraded result for key: {cache_key}")
+        return recent_failure
 
     try:
-        # Perform dual analysis
-        translated_text, source_analysis, target_analysis = analyze_both_texts(
-            api_key=itzuli_api_key,
-            text=request.text,
-            source_language=request.source_lang,
-            target_language=request.target_lang,
-        )
+        alignment_data = await _run_pipeline(request, itzuli_api_key, claude_api_key, timings)
+    except _RETRY_LATER:
+        raise
+    except Exception as e:
+        negative_cache.put(cache_key, e)
+        raise
+
+    if not has_alignments(alignment_data):
+        logger.warning(f"Alignment generation returned no alignments; not caching key: {cache_key}")
+        negative_cache.put(cache_key, alignment_data)
+        return alignment_data
+
+    # Cache the result
+    started = time.perf_counter()
+    await io_stage.run(cache.set, request.text, request.source_lang, request.target_lang, alignment_data)
+    timings["cache_write_ms"] = _elapsed_ms(started)
+
+    return alignment_data
+
+
+async def _analyze_both(
+    api_key: str,
+    text: str,
+    source_language: LanguageCode,
+    target_language: LanguageCode,
+    timings: Optional[Dict[str, float]] = None,
+) -> Tuple[str, List[AnalysisRow], List[AnalysisRow]]:
+    """
+    Awaitable analyze_both_texts(): translate a text and analyze both sides.
+
+    The source goes to the Stanza batcher before translation starts, the
+    translation runs on the io stage, and the target is queued the moment it
+    arrives. Both analyses are awaited as futures, so no worker thread sits
+    waiting on Itzuli or Stanza. `timings` is filled in as by analyze_both_texts.
+    """
+    finished: Dict[str, float] = {}
+    started = time.perf_counter()
+
+    source_future = asyncio.wrap_future(batcher.submit(source_language, text))
+    source_future.add_done_callback(lambda _: finished.setdefault("source", time.perf_counter()))
+    try:
+        translated_text = await io_stage.run(translate_text, api_key, text, source_language, target_language)
+    except BaseException:
+        source_future.cancel()
+        raise
+    translated = time.perf_counter()
+
+    target_future = asyncio.wrap_future(batcher.submit(target_language, translated_text))
+    target_future.add_done_callback(lambda _: finished.setdefault("target", time.perf_counter()))
+    source_analysis, target_analysis = await asyncio.gather(source_future, target_future)
+
+    if timings is not None:
+        now = time.perf_counter()
+        timings["translation_ms"] = round((translated - started) * 1000, 1)
+        timings["source_analysis_ms"] = round((finished.get("source", now) - started) * 1000, 1)
+        timings["target_analysis_ms"] = round((finished.get("target", now) - translated) * 1000, 1)
+
+    return translated_text, source_analysis, target_analysis
+
+
+async def _run_pipeline(
+    request: AnalysisRequest, itzuli_api_key: str, claude_api_key: str, timings: Dict[str, float]
+) -> AlignmentData:
+    """Translate, analyze and align a request, recording stage durations into `timings`."""
+    # Perform dual analysis; translation and source analysis overlap, and report their own timings
+    started = time.perf_counter()
+    translated_text, source_analysis, target_analysis = await _analyze_both(
+        api_key=itzuli_api_key,
+        text=request.text,
+        source_language=request.source_lang,
+        target_language=request.target_lang,
+        timings=timings,
+    )
+    timings["analysis_ms"] = _elapsed_ms(started)
+
+    # Generate enriched alignment data with Claude
+    started = time.perf_counter()
+    alignment_data = await create_enriched_alignment_data_async(
+        source_analysis=source_analysis,
+        target_analysis=target_analysis,
+        source_lang=request.source_lang,
+        target_lang=request.target_lang,
+        source_text=request.text,
+        target_text=translated_text,
+        sentence_id=request.sentence_id,
+        claude_client=_claude_client(claude_api_key),
+    )
+    timings["alignment_ms"] = _elapsed_ms(started)
+
+    return alignment_data
+
+
+def _cached_response(cached: CachedResponse, req: Request) -> Response:
+    """
+    Send a cached body as-is, gzip-encoded when stored that way and the client accepts it.
+
+    The gzip and identity representations are different bytes, so the gzip
+    one gets its own ETag, the stored one with a "-gz" suffix.
+    """
+    if cached.gzipped and "gzip" in req.headers.get("accept-encoding", ""):
+        headers = {"ETag": f'{cached.etag[:-1]}-gz"', "Vary": "Accept-Encoding", "Content-Encoding": "gzip"}
+        return Response(cached.body, media_type="application/json", headers=headers)
+    headers = {"ETag": cached.etag, "Vary": "Accept-Encoding"}
+    return Response(cached.json_bytes(), media_type="application/json", headers=headers)
 
-        # Generate enriched alignment data with Claude
-        alignment_data = create_enriched_alignment_data(
-            source_analysis=source_analysis,
-            target_analysis=target_analysis,
-            source_lang=request.source_lang,
-            target_lang=request.target_lang,
-            source_text=request.text,
-            target_text=translated_text,
-            sentence_id=request.sentence_id,
-            claude_api_key=claude_api_key,
-        )
 
-        # Cache the result
-        cache.set(request.text, request.source_lang, request.target_lang, alignment_data)
+def _revalidate(request: AnalysisRequest, itzuli_api_key: str, claude_api_key: str) -> None:
+    """Regenerate a stale cache entry in the background, unless its key is already being generated."""
+    cache_key = cache.key_for(request.text, request.source_lang, request.target_lang)
+    if inflight.running(cache_key):
+        return
 
+    async def refresh() -> None:
+        try:
+            await inflight.do(cache_key, lambda: _generate_alignment(request, itzuli_api_key, claude_api_key))
+            logger.info(f"Refreshed stale cache entry for key: {cache_key}")
+        except Exception as e:
+            logger.warning(f"Refreshing stale cache entry for key {cache_key} failed: {e}")
+
+    task = asyncio.create_task(refresh())
+    _background_jobs.add(task)
+    task.add_done_callback(_background_jobs.discard)
+
+
+def _claude_client(claude_api_key: str) -> AsyncClaudeClient:
+    """
+    The app's shared async Claude client, created at startup or on first use.
+
+    A client for a different key replaces it; requests still using the old
+    one finish on it, then its pool is closed in the background.
+    """
+    claude_client = getattr(app.state, "claude_client", None)
+    if claude_client is None or claude_client.api_key != claude_api_key:
+        if claude_client is not None:
+            task = asyncio.create_task(claude_client.aclose_when_idle())
+            _background_jobs.add(task)
+            task.add_done_callback(_background_jobs.discard)
+        claude_client = app.state.claude_client = AsyncClaudeClient(api_key=claude_api_key)
+    return claude_client
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+@app.post("/analyze-and-scaffold", response_model=SentencePair)
+async def analyze_and_scaffold(request: AnalysisRequest, req: Request):
+    """
+    Combined endpoint: analyze both texts, generate scaffold, and enrich with Claude-generated alignments.
+    """
+    rate_limited = await _rate_limit(req)
+    if rate_limited:
+        return rate_limited
+    itzuli_api_key, claude_api_key = _api_keys()
+
+    # Check cache first; hits are sent as stored, without building or validating models
+    cached = await io_stage.run(cache.get_response, request.text, request.source_lang, request.target_lang)
+    if cached:
+        logger.info(f"Cache hit for text: {request.text[:50]}...")
+        if cached.stale:
+            _revalidate(request, itzuli_api_key, claude_api_key)
+        return _cached_response(cached, req)
+
+    try:
+        cache_key = cache.key_for(request.text, request.source_lang, request.target_lang)
+        alignment_data = await inflight.do(
+            cache_key, lambda: _generate_alignment(request, itzuli_api_key, claude_api_key)
+        )
         return alignment_data.sentences[0]
 
+    except _RETRY_LATER:
+        raise
     except Exception as e:
         logger.error(f"Analysis and alignment generation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Analysis and alignment generation failed: {str(e)}")
 
 
+async def _generate_batch(
+    items: Dict[str, AnalysisRequest], itzuli_api_key: str, claude_api_key: str
+) -> Dict[str, Union[AlignmentData, BaseException]]:
+    """
+    Run the pipeline for many distinct requests and cache the successes.
+
+    Translations and Claude calls fan out concurrently; Stanza runs once per
+    language over every text in that language. Returns the alignment data, or
+    the exception that stopped it, for each cache key in `items`. As for single
+    requests, failures and results without alignments go to the negative cache.
+    """
+    results: Dict[str, Union[AlignmentData, BaseException]] = {}
+    for key in items:
+        recent_failure = negative_cache.get(key)
+        if recent_failure is not None:
+            results[key] = recent_failure
+    items = {key: item for key, item in items.items() if key not in results}
+    recent = dict(results)
+
+    translations = await asyncio.gather(
+        *(
+            io_stage.run(translate_text, itzuli_api_key, item.text, item.source_lang, item.target_lang)
+            for item in items.values()
+        ),
+        return_exceptions=True,
+    )
+    translated: Dict[str, str] = {}
+    for key, translation in zip(items, translations):
+        if isinstance(translation, BaseException):
+            results[key] = translation
+        else:
+            translated[key] = translation
+
+    # Group both sides of every pair by language: one bulk Stanza call each
+    by_language: Dict[str, List[Tuple[str, str, str]]] = {}
+    for key, target_text in translated.items():
+        item = items[key]
+        by_language.setdefault(item.source_lang, []).append((key, "source", item.text))
+        by_language.setdefault(item.target_lang, []).append((key, "target", target_text))
+
+    languages = list(by_language)
+    analyses = await asyncio.gather(
+        *(nlp_stage.run(batch_analyze, lang, [text for _, _, text in by_language[lang]]) for lang in languages),
+        return_exceptions=True,
+    )
+    rows: Dict[Tuple[str, str], List[AnalysisRow]] = {}
+    for lang, analysis in zip(languages, analyses):
+        for index, (key, side, _) in enumerate(by_language[lang]):
+            if isinstance(analysis, BaseException):
+                results.setdefault(key, analysis)
+            else:
+                rows[(key, side)] = analysis[index]
+
+    ready = [key for key in translated if key not in results]
+    enriched = await asyncio.gather(
+        *(
+            create_enriched_alignment_data_async(
+                source_analysis=rows[(key, "source")],
+                target_analysis=rows[(key, "target")],
+                source_lang=items[key].source_lang,
+                target_lang=items[key].target_lang,
+                source_text=items[key].text,
+                target_text=translated[key],
+                sentence_id=items[key].sentence_id,
+                claude_client=_claude_client(claude_api_key),
+            )
+            for key in ready
+        ),
+        return_exceptions=True,
+    )
+    results.update(zip(ready, enriched))
+
+    complete = []
+    for key, data in results.items():
+        if key in recent or isinstance(data, _RETRY_LATER):
+            continue
+        if isinstance(data, AlignmentData) and has_alignments(data):
+            complete.append((items[key].text, items[key].source_lang, items[key].target_lang, data))
+        else:
+            negative_cache.put(key, data)
+    await io_stage.run(cache.set_many, complete)
+
+    return results
+
+
+def _failed_pair(item: AnalysisRequest) -> SentencePair:
+    """Placeholder SentencePair that keeps a failed batch item's slot in the response."""
+    return SentencePair(
+        id=item.sentence_id,
+        source=TokenizedSentence(lang=item.source_lang, text=item.text, tokens=[]),
+        target=TokenizedSentence(lang=item.target_lang, text="", tokens=[]),
+        layers=AlignmentLayers(),
+    )
+
+
+@app.post("/analyze-and-scaffold/batch", response_model=BatchAnalysisResponse)
+async def analyze_and_scaffold_batch(request: BatchAnalysisRequest, req: Request):
+    """
+    Batch variant of /analyze-and-scaffold for lesson sets.
+
+    Cache hits come from one multi-get; misses share one Stanza call per
+    language and run their Claude calls concurrently. Each item counts
+    against the daily rate limit.
+    """
+    if len(request.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_ITEMS} items")
+
+    rate_limited = await _rate_limit(req, cost=len(request.items))
+    if rate_limited:
+        return rate_limited
+    itzuli_api_key, claude_api_key = _api_keys()
+
+    cached = await io_stage.run(
+        cache.get_many, [(item.text, item.source_lang, item.target_lang) for item in request.items]
+    )
+
+    # Duplicate sentences within the batch are generated once
+    keys = [cache.key_for(item.text, item.source_lang, item.target_lang) for item in request.items]
+    misses: Dict[str, AnalysisRequest] = {}
+    for key, item, hit in zip(keys, request.items, cached):
+        if hit is None:
+            misses.setdefault(key, item)
+    logger.info(f"Batch of {len(request.items)}: {len(request.items) - len(misses)} cached, {len(misses)} to generate")
+
+    generated = await _generate_batch(misses, itzuli_api_key, claude_api_key) if misses else {}
+
+    sentences = []
+    statuses = []
+    for index, (key, item, hit) in enumerate(zip(keys, request.items, cached)):
+        error = None
+        if hit is not None:
+            pair, status = hit.sentences[0], "cached"
+        elif isinstance(generated[key], AlignmentData):
+            pair, status = generated[key].sentences[0], "generated"
+        else:
+            pair, status, error = _failed_pair(item), "failed", str(generated[key])
+            logger.warning(f"Batch item {index} failed: {error}")
+
+        sentences.append(pair.model_copy(update={"id": item.sentence_id}))
+        statuses.append(BatchItemStatus(index=index, sentence_id=item.sentence_id, status=status, error=error))
+
+    return BatchAnalysisResponse(data=AlignmentData(sentences=sentences), items=statuses)
+
+
+def _event(name: str, **fields) -> str:
+    """Encode one NDJSON stream event."""
+    return json.dumps({"event": name, **fields}, ensure_ascii=False) + "\n"
+
+
+async def _alignment_events(request: AnalysisRequest, itzuli_api_key: str, claude_api_key: str) -> AsyncIterator[str]:
+    """
+    Produce the scaffold, each alignment layer and the final SentencePair as NDJSON events.
+
+    Like _generate_alignment, recent failures are answered from the negative
+    cache, and a request whose pair is already being generated waits for that
+    run instead of starting another. A streamed result is only cached once
+    Claude's response completed; a stream that breaks off after some layers
+    ends with an `error` event and is remembered as a failure.
+    """
+    cache_key = cache.key_for(request.text, request.source_lang, request.target_lang)
+    try:
+        cached_data = await io_stage.run(cache.get, request.text, request.source_lang, request.target_lang)
+        if cached_data:
+            logger.info(f"Cache hit for text: {request.text[:50]}...")
+            yield _event("done", data=cached_data.sentences[0].model_dump(mode="json"))
+            return
+
+        recent_failure = negative_cache.get(cache_key)
+        if isinstance(recent_failure, BaseException):
+            raise recent_failure
+        if recent_failure is not None:
+            logger.info(f"Serving recent degraded result for key: {cache_key}")
+            yield _event("done", data=recent_failure.sentences[0].model_dump(mode="json"))
+            return
+        if inflight.running(cache_key):
+            # Share the run already generating this pair; its layers are not streamed
+            alignment_data = await inflight.do(
+                cache_key, lambda: _generate_alignment(request, itzuli_api_key, claude_api_key)
+            )
+            yield _event("done", data=alignment_data.sentences[0].model_dump(mode="json"))
+            return
+
+        try:
+            translated_text, source_analysis, target_analysis = await _analyze_both(
+                api_key=itzuli_api_key,
+                text=request.text,
+                source_language=request.source_lang,
+                target_language=request.target_lang,
+            )
+            scaffold = build_scaffold(
+                source_analysis,
+                target_analysis,
+                request.source_lang,
+                request.target_lang,
+                request.text,
+                translated_text,
+                request.sentence_id,
+            )
+            yield _event("scaffold", data=scaffold.model_dump(mode="json"))
+
+            layers = {}
+            claude_client = _claude_client(claude_api_key)
+            async for layer_name, alignments in stream_alignments_for_pair_async(scaffold, claude_client):
+                layers[layer_name] = alignments
+                yield _event("layer", layer=layer_name, alignments=[a.model_dump(mode="json") for a in alignments])
+        except _RETRY_LATER:
+            raise
+        except Exception as e:
+            negative_cache.put(cache_key, e)
+            raise
+
+        sentence_pair = scaffold.model_copy(update={"layers": AlignmentLayers(**layers)})
+        alignment_data = AlignmentData(sentences=[sentence_pair])
+        if has_alignments(alignment_data):
+            await io_stage.run(cache.set, request.text, request.source_lang, request.target_lang, alignment_data)
+        else:
+            logger.warning(f"Streamed alignment returned no alignments; not caching key: {cache_key}")
+            negative_cache.put(cache_key, alignment_data)
+
+        yield _event("done", data=alignment_data.sentences[0].model_dump(mode="json"))
+
+    except Exception as e:
+        logger.error(f"Streaming alignment generation failed: {e}")
+        yield _event("error", message=str(e))
+
+
+@app.post("/analyze-and-scaffold/stream")
+async def analyze_and_scaffold_stream(request: AnalysisRequest, req: Request):
+    """
+    Streaming variant of /analyze-and-scaffold.
+
+    Responds with newline-delimited JSON events: `scaffold` with the token
+    scaffold as soon as Stanza finishes, one `layer` per alignment layer as
+    Claude completes it, then `done` with the full SentencePair (or `error`).
+    Cache hits produce a single `done` event.
+    """
+    rate_limited = await _rate_limit(req)
+    if rate_limited:
+        return rate_limited
+    itzuli_api_key, claude_api_key = _api_keys()
+
+    return StreamingResponse(
+        _alignment_events(request, itzuli_api_key, claude_api_key), media_type="application/x-ndjson"
+    )
+
+
+async def _run_job(job_id: str, request: AnalysisRequest, itzuli_api_key: str, claude_api_key: str) -> None:
+    """Run a submitted job to completion, recording its outcome in the job table."""
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    await jobs.update_job(job_id, "running")
+
+    try:
+        cached_data = await io_stage.run(cache.get, request.text, request.source_lang, request.target_lang)
+        if cached_data:
+            alignment_data = cached_data
+        else:
+            cache_key = cache.key_for(request.text, request.source_lang, request.target_lang)
+            alignment_data = await inflight.do(
+                cache_key, lambda: _generate_alignment(request, itzuli_api_key, claude_api_key, timings)
+            )
+        timings["total_ms"] = _elapsed_ms(started)
+        await jobs.update_job(
+            job_id, "completed", timings=timings, result=alignment_data.sentences[0].model_dump(mode="json")
+        )
+        logger.info(f"Job {job_id} completed in {timings['total_ms']} ms")
+
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}")
+        timings["total_ms"] = _elapsed_ms(started)
+        await jobs.update_job(job_id, "failed", timings=timings, error=str(e))
+
+
+async def _resume_interrupted_jobs() -> None:
+    """Restart jobs a previous server process accepted but never finished."""
+    removed = await jobs.prune_jobs()
+    if removed:
+        logger.info(f"Pruned {removed} expired jobs")
+
+    interrupted = await jobs.claim_interrupted_jobs()
+    if not interrupted:
+        return
+
+    itzuli_api_key = os.environ.get("ITZULI_API_KEY")
+    claude_api_key = os.environ.get("CLAUDE_API_KEY")
+    for job in interrupted:
+        if not itzuli_api_key or not claude_api_key:
+            await jobs.update_job(job["id"], "failed", error="API keys not configured")
+            continue
+        logger.info(f"Resuming interrupted job {job['id']}")
+        task = asyncio.create_task(
+            _run_job(job["id"], AnalysisRequest(**job["request"]), itzuli_api_key, claude_api_key)
+        )
+        _background_jobs.add(task)
+        task.add_done_callback(_background_jobs.discard)
+
+
+def _retry_failed_preloads() -> List[str]:
+    """Start loading and warming up again every preloaded language that failed; returns those languages."""
+    failed = [
+        language
+        for language, future in _preload.items()
+        if future.done() and not future.cancelled() and future.exception() is not None
+    ]
+    for language in failed:
+        logger.warning(f"Retrying Stanza pipeline warm-up for {language}: {_preload[language].exception()}")
+    _preload.update(preload_pipelines(failed))
+    return failed
+
+
+async def _retry_preloads_periodically() -> None:
+    while True:
+        await asyncio.sleep(PRELOAD_RETRY_INTERVAL)
+        _retry_failed_preloads()
+
+
+async def _evict_cache_periodically() -> None:
+    """Keep the alignment cache within its size and age bounds, off the request path."""
+    while True:
+        try:
+            await io_stage.run(cache.evict)
+        except Exception as e:
+            logger.warning(f"Cache eviction failed: {e}")
+        await asyncio.sleep(CACHE_EVICTION_INTERVAL)
+
+
+@app.post("/jobs", response_model=JobSubmission, status_code=202)
+async def submit_job(request: AnalysisRequest, req: Request, background_tasks: BackgroundTasks):
+    """
+    Submit an alignment job and return immediately with its id.
+
+    The pipeline runs in the background and writes into the alignment cache,
+    so the work is kept even if the client disconnects. Poll GET /jobs/{job_id}
+    for the result.
+    """
+    rate_limited = await _rate_limit(req)
+    if rate_limited:
+        return rate_limited
+    itzuli_api_key, claude_api_key = _api_keys()
+
+    job_id = await jobs.create_job(request.model_dump())
+    background_tasks.add_task(_run_job, job_id, request, itzuli_api_key, claude_api_key)
+    return JobSubmission(job_id=job_id, status="queued")
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job_status(job_id: str):
+    """Return a job's status, per-stage timings and, once completed, its SentencePair."""
+    job = await jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return JobStatus(
+        job_id=job["id"],
+        status=job["status"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        timings=job["timings"],
+        result=job["result"],
+        error=job["error"],
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,60 @@
+"""Coalescing of identical in-flight requests onto a single execution."""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time.
+
+    The first caller for a key starts the work; callers that arrive with the
+    same key while it is still running await the same result instead of
+    starting their own. The work is shielded, so a leader whose client
+    disconnects does not cancel it for the followers.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._leaders = 0
+        self._collapsed = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await `fn()`, sharing the call with any in-flight caller for `key`."""
+        task = self._calls.get(key)
+        if task is not None:
+            self._collapsed += 1
+            logger.info(f"Coalesced request onto in-flight call for key: {key}")
+            return await asyncio.shield(task)
+
+        self._leaders += 1
+        task = asyncio.ensure_future(fn())
+        self._calls[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def running(self, key: str) -> bool:
+        """Whether a call for `key` is in flight."""
+        return key in self._calls
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every waiter went away.
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counts of executed vs. collapsed calls."""
+        total = self._leaders + self._collapsed
+        return {
+            "in_flight": len(self._calls),
+            "executed": self._leaders,
+            "collapsed": self._collapsed,
+            "collapse_ratio": round(self._collapsed / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,209 @@
+"""Cache of Stanza analyses per language and text, in memory with optional SQLite persistence."""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import stanza
+from stanza.resources.common import DEFAULT_RESOURCES_VERSION
+
+from .types import AnalysisRow
+
+logger = logging.getLogger(__name__)
+
+# Analyses kept in process memory; 0 disables the cache
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "20000"))
+# SQLite file that also persists analyses across restarts; unset keeps them in memory only
+ANALYSIS_CACHE_DB = os.getenv("ANALYSIS_CACHE_DB", "")
+
+# Analyses depend on the Stanza code and the models it downloads for this version
+MODEL_VERSION = f"stanza-{stanza.__version__}/resources-{DEFAULT_RESOURCES_VERSION}"
+
+# Fields never contain tabs or newlines: Stanza splits tokens on whitespace
+_FIELD_SEP = "\t"
+_ROW_SEP = "\n"
+# Stands in for a missing field, such as a lemma Stanza could not assign
+_NONE = "\x00"
+
+
+def encode_rows(rows: List[AnalysisRow]) -> str:
+    """Pack rows into one string, far smaller in memory than a list of AnalysisRow objects."""
+    return _ROW_SEP.join(
+        _FIELD_SEP.join(_NONE if value is None else value for value in (row.word, row.lemma, row.upos, row.feats))
+        for row in rows
+    )
+
+
+def decode_rows(encoded: str) -> List[AnalysisRow]:
+    """Inverse of encode_rows()."""
+    if not encoded:
+        return []
+    return [
+        AnalysisRow(*(None if value == _NONE else value for value in line.split(_FIELD_SEP)))
+        for line in encoded.split(_ROW_SEP)
+    ]
+
+
+class AnalysisCache:
+    """
+    Stanza analyses keyed by language and exact text, for the current model version.
+
+    The most recently used `max_entries` analyses are kept in memory as
+    compact strings; each get() decodes a fresh list, so callers may modify
+    what they receive. With `db_path`, analyses are also written to SQLite
+    and read back on memory misses, surviving restarts. Entries there carry
+    the model version, so upgrading Stanza makes older ones unreachable.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES,
+        db_path: Optional[str] = ANALYSIS_CACHE_DB or None,
+        model_version: str = MODEL_VERSION,
+    ):
+        self.max_entries = max_entries
+        self.db_path = Path(db_path) if db_path else None
+        self.model_version = model_version
+        self._entries: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._schema_ready = False
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        os.register_at_fork(after_in_child=self._reset_connections)
+
+    def _reset_connections(self) -> None:
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        with self._lock:
+            if not self._schema_ready:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                with closing(sqlite3.connect(self.db_path, timeout=30)) as db, db:
+                    db.execute("PRAGMA journal_mode=WAL")
+                    db.execute("CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, rows TEXT NOT NULL)")
+                self._schema_ready = True
+
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.db_path, timeout=30)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _disk_key(self, language: str, text: str) -> str:
+        return hashlib.sha256(f"{self.model_version}:{language}:{text}".encode()).hexdigest()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, language: str, text: str) -> Optional[List[AnalysisRow]]:
+        """Cached rows for `text` in `language`, or None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            encoded = self._entries.get((language, text))
+            if encoded is not None:
+                self._entries.move_to_end((language, text))
+                self.hits += 1
+                return decode_rows(encoded)
+
+        if self.db_path is not None:
+            try:
+                row = (
+                    self._connection()
+                    .execute("SELECT rows FROM analyses WHERE key=?", (self._disk_key(language, text),))
+                    .fetchone()
+                )
+            except Exception as e:
+                logger.warning(f"Analysis cache retrieval failed: {e}")
+                row = None
+            if row is not None:
+                self._remember(language, text, row[0])
+                with self._lock:
+                    self.disk_hits += 1
+                return decode_rows(row[0])
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, language: str, text: str, rows: List[AnalysisRow]) -> None:
+        """Store the rows Stanza produced for `text` in `language`."""
+        if not self.enabled:
+            return
+        encoded = encode_rows(rows)
+        self._remember(language, text, encoded)
+        if self.db_path is not None:
+            try:
+                with self._connection() as db:
+                    db.execute(
+                        "INSERT OR REPLACE INTO analyses (key, rows) VALUES (?, ?)",
+                        (self._disk_key(language, text), encoded),
+                    )
+            except Exception as e:
+                logger.warning(f"Analysis cache storage failed: {e}")
+
+    def get_or_analyze(self, language: str, text: str, analyze: Callable[[], List[AnalysisRow]]) -> List[AnalysisRow]:
+        """
+        Return the cached rows, or call `analyze()` and cache its result.
+
+        Args:
+            language: Language code of `text`
+            text: Text to analyze
+            analyze: Runs Stanza on `text`, returning its AnalysisRow list
+
+        Returns:
+            AnalysisRow list for `text`
+        """
+        cached = self.get(language, text)
+        if cached is not None:
+            return cached
+        rows = analyze()
+        self.put(language, text, rows)
+        return rows
+
+    def _remember(self, language: str, text: str, encoded: str) -> None:
+        with self._lock:
+            self._entries[(language, text)] = encoded
+            self._entries.move_to_end((language, text))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every analysis, in memory and on disk."""
+        with self._lock:
+            self._entries.clear()
+        if self.db_path is not None:
+            with self._connection() as db:
+                db.execute("DELETE FROM analyses")
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, memory held by encoded rows, and hit/miss counters."""
+        with self._lock:
+            return {
+                "model_version": self.model_version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": sum(len(encoded) for encoded in self._entries.values()),
+                "persistent": self.db_path is not None,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+
+analysis_cache = AnalysisCache()
+
+
+def cached_analysis(language: str, text: str, analyze: Callable[[], List[AnalysisRow]]) -> List[AnalysisRow]:
+    """Analyze through the shared analysis cache; see AnalysisCache.get_or_analyze."""
+    return analysis_cache.get_or_analyze(language, text, analyze)
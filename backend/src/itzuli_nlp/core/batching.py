@@ -0,0 +1,186 @@
+"""Dynamic micro-batching of Stanza analysis across concurrent callers."""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import stanza
+
+from .analysis_cache import AnalysisCache
+from .nlp import process_raw_analysis_batch
+from .types import AnalysisRow
+
+logger = logging.getLogger(__name__)
+
+BATCH_WINDOW_MS = float(os.getenv("STANZA_BATCH_WINDOW_MS", "5"))
+MAX_BATCH_SIZE = int(os.getenv("STANZA_MAX_BATCH", "32"))
+
+_Pending = Tuple[str, Future, float]
+
+
+class _LanguageStats:
+    def __init__(self):
+        self.batches = 0
+        self.texts = 0
+        self.max_batch_size = 0
+        self.queue_wait_seconds = 0.0
+        self.inference_seconds = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "avg_queue_wait_ms": round(self.queue_wait_seconds / self.texts * 1000, 2) if self.texts else 0.0,
+            "avg_inference_ms": round(self.inference_seconds / self.batches * 1000, 2) if self.batches else 0.0,
+            "texts_per_second": round(self.texts / self.inference_seconds, 1) if self.inference_seconds else 0.0,
+        }
+
+
+class StanzaBatcher:
+    """
+    Collect texts per language and run them through Stanza in bulk.
+
+    Each language gets one dispatcher thread. It takes the first waiting
+    text, keeps collecting for up to `window_ms` or until `max_batch` texts
+    are queued, then runs them as one bulk pipeline call and hands each
+    caller its own AnalysisRow list. Dispatchers also serialize access to
+    each pipeline, which Stanza does not support concurrently.
+
+    With a `cache`, texts already analyzed resolve immediately without
+    being queued, and every batch result is added to it.
+
+    Threads start lazily on first use and are recreated after fork, so a
+    pre-fork parent can share the batcher with its workers.
+    """
+
+    def __init__(
+        self,
+        pipeline_for: Callable[[str], stanza.Pipeline],
+        window_ms: float = BATCH_WINDOW_MS,
+        max_batch: int = MAX_BATCH_SIZE,
+        cache: Optional[AnalysisCache] = None,
+    ):
+        self._pipeline_for = pipeline_for
+        self.window_seconds = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._queues: Dict[str, queue.Queue] = {}
+        self._stats: Dict[str, _LanguageStats] = {}
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        self._lock = threading.Lock()
+        self._queues = {}
+
+    def submit(self, language: str, text: str, use_cache: bool = True) -> "Future[List[AnalysisRow]]":
+        """Queue `text` for analysis and return a future for its rows; `use_cache=False` always runs Stanza."""
+        future: Future = Future()
+        if use_cache and self.cache is not None:
+            rows = self.cache.get(language, text)
+            if rows is not None:
+                future.set_result(rows)
+                return future
+        self._queue_for(language).put((text, future, time.monotonic()))
+        return future
+
+    def analyze(self, language: str, text: str) -> List[AnalysisRow]:
+        """Analyze `text`, blocking until its batch has run."""
+        return self.submit(language, text).result()
+
+    def analyze_many(self, language: str, texts: List[str]) -> List[List[AnalysisRow]]:
+        """Analyze several texts, letting them share batches with each other and with concurrent callers."""
+        futures = [self.submit(language, text) for text in texts]
+        return [future.result() for future in futures]
+
+    def _queue_for(self, language: str) -> queue.Queue:
+        with self._lock:
+            pending = self._queues.get(language)
+            if pending is None:
+                pending = self._queues[language] = queue.Queue()
+                self._stats.setdefault(language, _LanguageStats())
+                threading.Thread(
+                    target=self._dispatch, args=(language, pending), name=f"stanza-batch-{language}", daemon=True
+                ).start()
+            return pending
+
+    def _dispatch(self, language: str, pending: queue.Queue) -> None:
+        while True:
+            batch = [pending.get()]
+            deadline = time.monotonic() + self.window_seconds
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(pending.get(timeout=remaining) if remaining > 0 else pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._run(language, batch)
+
+    def _run(self, language: str, batch: List[_Pending]) -> None:
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        started = time.monotonic()
+        try:
+            outcomes = self._analyze(language, self._pipeline_for(language), [text for text, _, _ in batch])
+        except Exception as e:
+            logger.error(f"Stanza pipeline for {language} is unavailable: {e}")
+            outcomes = [e] * len(batch)
+        finished = time.monotonic()
+
+        for (text, future, _), outcome in zip(batch, outcomes):
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+                continue
+            if self.cache is not None:
+                self.cache.put(language, text, outcome)
+            future.set_result(outcome)
+
+        with self._lock:
+            stats = self._stats[language]
+            stats.batches += 1
+            stats.texts += len(batch)
+            stats.max_batch_size = max(stats.max_batch_size, len(batch))
+            stats.queue_wait_seconds += sum(started - enqueued for _, _, enqueued in batch)
+            stats.inference_seconds += finished - started
+
+    def _analyze(
+        self, language: str, pipeline: stanza.Pipeline, texts: List[str]
+    ) -> List[Union[List[AnalysisRow], Exception]]:
+        """
+        Rows, or the error that stopped them, for each text in one bulk call.
+
+        When the bulk call fails or returns the wrong number of documents,
+        each text is analyzed on its own, so a text Stanza cannot handle
+        only fails its own caller.
+        """
+        try:
+            results = process_raw_analysis_batch(pipeline, texts)
+            if len(results) != len(texts):
+                raise RuntimeError(f"Stanza returned {len(results)} documents for {len(texts)} texts")
+            return results
+        except Exception as e:
+            if len(texts) == 1:
+                logger.error(f"Stanza analysis ({language}) failed: {e}")
+                return [e]
+            logger.warning(f"Stanza batch ({language}, {len(texts)} texts) failed, analyzing them one at a time: {e}")
+
+        return [outcome for text in texts for outcome in self._analyze(language, pipeline, [text])]
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch sizes, queue wait, inference latency and throughput per language."""
+        with self._lock:
+            return {
+                "window_ms": self.window_seconds * 1000,
+                "max_batch": self.max_batch,
+                "languages": {language: stats.as_dict() for language, stats in self._stats.items()},
+            }
@@ -0,0 +1,272 @@
+"""Shared Itzuli API client with connection pooling, deadlines, retries and a circuit breaker."""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+ITZULI_URL = os.getenv("ITZULI_URL", "https://api.itzuli.vicomtech.org/")
+# Keep-alive connections kept open to Itzuli
+ITZULI_POOL_SIZE = int(os.getenv("ITZULI_POOL_SIZE", "16"))
+ITZULI_CONNECT_TIMEOUT_SECONDS = float(os.getenv("ITZULI_CONNECT_TIMEOUT_SECONDS", "3"))
+ITZULI_READ_TIMEOUT_SECONDS = float(os.getenv("ITZULI_READ_TIMEOUT_SECONDS", "10"))
+# Overall budget for one call, including retries and backoff
+ITZULI_DEADLINE_SECONDS = float(os.getenv("ITZULI_DEADLINE_SECONDS", "20"))
+ITZULI_MAX_RETRIES = int(os.getenv("ITZULI_MAX_RETRIES", "2"))
+ITZULI_BACKOFF_BASE_SECONDS = float(os.getenv("ITZULI_BACKOFF_BASE_SECONDS", "0.25"))
+ITZULI_BACKOFF_MAX_SECONDS = float(os.getenv("ITZULI_BACKOFF_MAX_SECONDS", "2"))
+# Consecutive failed calls that open the circuit, and how long it stays open
+ITZULI_BREAKER_THRESHOLD = int(os.getenv("ITZULI_BREAKER_THRESHOLD", "5"))
+ITZULI_BREAKER_RESET_SECONDS = float(os.getenv("ITZULI_BREAKER_RESET_SECONDS", "30"))
+
+_TRANSLATE_PATH = "translation/get"
+_FEEDBACK_PATH = "translation/feedback"
+_QUOTA_PATH = "quota/get"
+
+# Responses worth retrying: Itzuli is overloaded or briefly unavailable
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ItzuliError(RuntimeError):
+    """Raised when Itzuli rejects a call or keeps failing it."""
+
+
+class ItzuliRejectedError(ItzuliError):
+    """Raised when Itzuli refuses a call, such as for an invalid API key; never retried."""
+
+
+class ItzuliUnavailableError(ItzuliError):
+    """Raised without calling Itzuli while the circuit breaker is open."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `threshold` failed calls in a row the circuit opens and calls
+    fail fast for `reset_seconds`. Then one trial call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, threshold: int = ITZULI_BREAKER_THRESHOLD, reset_seconds: float = ITZULI_BREAKER_RESET_SECONDS):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_seconds:
+            return "open"
+        return "half_open"
+
+    def before_call(self) -> None:
+        """Raise ItzuliUnavailableError unless a call may go ahead."""
+        with self._lock:
+            state = self._state()
+            if state == "closed" or (state == "half_open" and not self._trial_running):
+                self._trial_running = state == "half_open"
+                return
+            self.rejected += 1
+            retry_after = max(0.0, self._opened_at + self.reset_seconds - time.monotonic())
+        raise ItzuliUnavailableError("Itzuli is unavailable; not calling it while the circuit is open", retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or (self._opened_at is None and self._failures >= self.threshold):
+                self._opened_at = time.monotonic()
+                self.times_opened += 1
+                logger.warning(f"Itzuli circuit opened after {self._failures} consecutive failures")
+            self._trial_running = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state(),
+                "consecutive_failures": self._failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
+
+
+class ItzuliClient:
+    """
+    Itzuli API client shared by every caller in the process.
+
+    Calls go through one pooled requests.Session, so connections and TLS
+    sessions are reused. Each call has connect and read timeouts and an
+    overall deadline. Timeouts, connection errors, 429 and 5xx responses
+    are retried with full-jitter exponential backoff while the deadline
+    allows; feedback is only retried when the connection could not be
+    made, since resending it could record it twice. Calls that fail after
+    their retries count towards the circuit breaker.
+
+    The API key is passed per call, as callers hold their own. The session
+    is recreated after fork.
+    """
+
+    def __init__(
+        self,
+        base_url: str = ITZULI_URL,
+        pool_size: int = ITZULI_POOL_SIZE,
+        connect_timeout: float = ITZULI_CONNECT_TIMEOUT_SECONDS,
+        read_timeout: float = ITZULI_READ_TIMEOUT_SECONDS,
+        deadline: float = ITZULI_DEADLINE_SECONDS,
+        max_retries: int = ITZULI_MAX_RETRIES,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self.session = self._new_session()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.latency_seconds = 0.0
+        os.register_at_fork(after_in_child=self._reset_session)
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _reset_session(self) -> None:
+        self.session = self._new_session()
+
+    def translate(self, api_key: str, text: str, source_language: str, target_language: str) -> Dict[str, Any]:
+        """Translate `text`; returns Itzuli's response with "translated_text" and "id"."""
+        payload = {"sourcelanguage": source_language, "targetlanguage": target_language, "text": text}
+        return self._call("POST", _TRANSLATE_PATH, api_key, payload)
+
+    def get_quota(self, api_key: str) -> Dict[str, Any]:
+        """Remaining quota for `api_key`."""
+        return self._call("GET", _QUOTA_PATH, api_key)
+
+    def send_feedback(self, api_key: str, translation_id: str, correction: str, evaluation: int) -> Dict[str, Any]:
+        """Send a correction and evaluation for a translation."""
+        payload = {"id": translation_id, "evaluation": evaluation, "correction": correction}
+        return self._call("POST", _FEEDBACK_PATH, api_key, payload, idempotent=False)
+
+    def _call(
+        self, method: str, path: str, api_key: str, payload: Optional[dict] = None, idempotent: bool = True
+    ) -> Dict[str, Any]:
+        self.breaker.before_call()
+        started = time.monotonic()
+        deadline = started + self.deadline
+        attempt = 0
+        try:
+            while True:
+                try:
+                    result = self._attempt(method, path, api_key, payload, deadline)
+                    break
+                except _Retryable as e:
+                    if not (idempotent or isinstance(e.__cause__, requests.exceptions.ConnectTimeout)):
+                        raise ItzuliError(str(e)) from e.__cause__
+                    if attempt >= self.max_retries:
+                        raise ItzuliError(f"{e} (after {attempt + 1} attempts)") from e.__cause__
+                    delay = random.uniform(0, min(ITZULI_BACKOFF_MAX_SECONDS, ITZULI_BACKOFF_BASE_SECONDS * 2**attempt))
+                    if time.monotonic() + delay >= deadline:
+                        raise ItzuliError(f"{e} (deadline of {self.deadline}s exceeded)") from e.__cause__
+                    attempt += 1
+                    with self._lock:
+                        self.retries += 1
+                    logger.info(f"Retrying Itzuli {path} in {delay:.2f}s after: {e}")
+                    time.sleep(delay)
+        except ItzuliRejectedError:
+            # Itzuli answered, so a rejected key or request says nothing about its health
+            self.breaker.record_success()
+            self._count_failure()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            self._count_failure()
+            raise
+        finally:
+            with self._lock:
+                self.calls += 1
+                self.latency_seconds += time.monotonic() - started
+
+        self.breaker.record_success()
+        return result
+
+    def _count_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+
+    def _attempt(
+        self, method: str, path: str, api_key: str, payload: Optional[dict], deadline: float
+    ) -> Dict[str, Any]:
+        read_timeout = min(self.read_timeout, max(0.001, deadline - time.monotonic()))
+        try:
+            response = self.session.request(
+                method,
+                self.base_url + path,
+                data=json.dumps(payload) if payload is not None else None,
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=(self.connect_timeout, read_timeout),
+            )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            raise _Retryable(f"Itzuli request failed: {e}") from e
+
+        if response.status_code in _RETRY_STATUSES:
+            raise _Retryable(f"Invalid status code: {response.status_code}")
+        if response.status_code == 401:
+            raise ItzuliRejectedError("Invalid API key or expired")
+        if response.status_code != 200:
+            raise ItzuliRejectedError(f"Invalid status code: {response.status_code}")
+        return response.json()
+
+    def stats(self) -> Dict[str, Any]:
+        """Call, failure and retry counts, average latency and circuit breaker state."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "failures": self.failures,
+                "retries": self.retries,
+                "avg_latency_ms": round(self.latency_seconds / self.calls * 1000, 1) if self.calls else 0.0,
+                "pool_size": self.pool_size,
+                "breaker": self.breaker.stats(),
+            }
+
+
+class _Retryable(Exception):
+    """A failed attempt that may succeed if repeated."""
+
+
+itzuli_client = ItzuliClient()
@@ -0,0 +1,61 @@
+"""Process memory introspection for reporting model residency and sharing."""
+
+import os
+import resource
+import sys
+from typing import Dict, Union
+
+_SMAPS_FIELDS = {
+    "Rss": "rss_bytes",
+    "Pss": "pss_bytes",
+    "Shared_Clean": "shared_clean_bytes",
+    "Shared_Dirty": "shared_dirty_bytes",
+    "Private_Clean": "private_clean_bytes",
+    "Private_Dirty": "private_dirty_bytes",
+}
+
+
+def parse_smaps_rollup(content: str) -> Dict[str, int]:
+    """
+    Parse /proc/<pid>/smaps_rollup into byte counts.
+
+    Returns rss, pss, shared and private totals. Shared memory here is pages
+    mapped by more than one process, e.g. models inherited copy-on-write
+    from a pre-fork parent.
+    """
+    usage = {name: 0 for name in _SMAPS_FIELDS.values()}
+    for line in content.splitlines():
+        field, _, rest = line.partition(":")
+        if field in _SMAPS_FIELDS:
+            usage[_SMAPS_FIELDS[field]] = int(rest.split()[0]) * 1024
+
+    usage["shared_bytes"] = usage.pop("shared_clean_bytes") + usage.pop("shared_dirty_bytes")
+    usage["private_bytes"] = usage.pop("private_clean_bytes") + usage.pop("private_dirty_bytes")
+    return usage
+
+
+def process_memory(pid: Union[int, str] = "self") -> Dict[str, int]:
+    """
+    Resident, proportional, shared and private memory of a process in bytes.
+
+    Uses /proc smaps_rollup on Linux. Elsewhere only the peak RSS of the
+    current process is available, reported as rss_bytes.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as f:
+            return parse_smaps_rollup(f.read())
+    except OSError:
+        if pid not in ("self", os.getpid()):
+            raise
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is kilobytes on Linux, bytes on macOS
+        return {"rss_bytes": peak if sys.platform == "darwin" else peak * 1024}
+
+
+def current_rss_bytes() -> int:
+    """Current resident set size of this process, cheap enough to call around individual allocations."""
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return process_memory()["rss_bytes"]
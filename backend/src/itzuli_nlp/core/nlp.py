@@ -14,6 +14,18 @@ def create_pipeline(language: LanguageCode = "eu") -> stanza.Pipeline:
 def process_raw_analysis(pipeline: stanza.Pipeline, input_text: str) -> List[AnalysisRow]:
     """Process text with Stanza and return raw analysis data."""
     doc = pipeline(input_text)
+    return _doc_to_rows(doc)
+
+
+def process_raw_analysis_batch(pipeline: stanza.Pipeline, input_texts: List[str]) -> List[List[AnalysisRow]]:
+    """Process several texts with one bulk Stanza call, returning rows per input text."""
+    if not input_texts:
+        return []
+    docs = pipeline([stanza.Document([], text=text) for text in input_texts])
+    return [_doc_to_rows(doc) for doc in docs]
+
+
+def _doc_to_rows(doc: stanza.Document) -> List[AnalysisRow]:
     rows = []
 
     for sent in doc.sentences:
@@ -0,0 +1,46 @@
+"""Text normalization for cache keys, so trivially different inputs share an entry."""
+
+import os
+import re
+import unicodedata
+
+# Bump when normalize_text() changes, so keys built by the old rules stop matching
+NORMALIZATION_VERSION = 1
+
+# Also ignore trailing punctuation ("Kaixo!" and "Kaixo" share a key)
+FOLD_TRAILING_PUNCTUATION = os.getenv("CACHE_KEY_FOLD_PUNCTUATION", "0") == "1"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _is_punctuation(char: str) -> bool:
+    return unicodedata.category(char).startswith("P")
+
+
+def normalize_text(text: str, fold_punctuation: bool = FOLD_TRAILING_PUNCTUATION) -> str:
+    """
+    Normalize text for use in a cache key.
+
+    Applies Unicode NFC, collapses runs of whitespace to a single space and
+    trims both ends. With `fold_punctuation`, trailing punctuation is
+    dropped as well.
+
+    Args:
+        text: Text as received from the client
+        fold_punctuation: Whether to drop trailing punctuation
+
+    Returns:
+        Normalized text
+    """
+    text = _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+    if fold_punctuation:
+        end = len(text)
+        while end and (_is_punctuation(text[end - 1]) or text[end - 1] == " "):
+            end -= 1
+        text = text[:end]
+    return text
+
+
+def normalization_tag(fold_punctuation: bool = FOLD_TRAILING_PUNCTUATION) -> str:
+    """Identifies the normalization rules in a key, e.g. "n1" or "n1p" with punctuation folding."""
+    return f"n{NORMALIZATION_VERSION}{'p' if fold_punctuation else ''}"
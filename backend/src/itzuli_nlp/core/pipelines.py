@@ -0,0 +1,207 @@
+"""Process-wide registry of Stanza pipelines with a memory budget."""
+
+import gc
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import stanza
+
+from .memory import current_rss_bytes
+from .nlp import create_pipeline
+from .types import LanguageCode
+
+logger = logging.getLogger(__name__)
+
+# 0 keeps every pipeline that has been loaded
+PIPELINE_MEMORY_BUDGET_MB = int(os.getenv("PIPELINE_MEMORY_BUDGET_MB", "0"))
+
+
+@dataclass
+class _Entry:
+    pipeline: stanza.Pipeline
+    resident_bytes: int
+    load_ms: float
+    loaded_at: float
+    last_used_at: float
+    hits: int = 0
+
+
+def _model_bytes(pipeline: stanza.Pipeline) -> int:
+    """Size of the tensors held by a pipeline's processor models."""
+    processors = getattr(pipeline, "processors", None)
+    if not isinstance(processors, dict):
+        return 0
+
+    seen = set()
+    total = 0
+    for processor in processors.values():
+        model = getattr(getattr(processor, "_trainer", None), "model", None)
+        if model is None or not hasattr(model, "parameters"):
+            continue
+        for tensor in (*model.parameters(), *model.buffers()):
+            if id(tensor) not in seen:
+                seen.add(id(tensor))
+                total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class PipelineRegistry:
+    """
+    Loads Stanza pipelines on first use and keeps them within a memory budget.
+
+    Pipelines are shared by everything in the process. When loading one
+    pushes the total resident size over `budget_bytes`, the least recently
+    used other languages are dropped until it fits again. A pipeline's size
+    is the size of its model tensors, or the process RSS growth while it
+    loaded when that cannot be determined.
+
+    Loads of different languages run concurrently; concurrent requests for
+    the same language wait for a single load.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[LanguageCode], stanza.Pipeline] = lambda language: create_pipeline(language),
+        budget_bytes: int = PIPELINE_MEMORY_BUDGET_MB * 2**20,
+    ):
+        self._factory = factory
+        self.budget_bytes = budget_bytes
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._loading: set = set()
+        self._loads = 0
+        self._evictions = 0
+
+    def get(self, language: LanguageCode) -> stanza.Pipeline:
+        """Return the pipeline for `language`, loading it if needed."""
+        pipeline = self._lookup(language)
+        if pipeline is not None:
+            return pipeline
+
+        with self._load_lock(language):
+            pipeline = self._lookup(language)
+            if pipeline is not None:
+                return pipeline
+
+            logger.info(f"Creating Stanza pipeline for language: {language}")
+            with self._lock:
+                self._loading.add(language)
+            rss_before = current_rss_bytes()
+            started = time.monotonic()
+            try:
+                pipeline = self._factory(language)
+            finally:
+                with self._lock:
+                    self._loading.discard(language)
+            load_ms = (time.monotonic() - started) * 1000
+            resident_bytes = _model_bytes(pipeline) or max(current_rss_bytes() - rss_before, 0)
+            logger.info(
+                f"Loaded Stanza pipeline for {language} in {load_ms:.0f} ms ({resident_bytes // 2**20} MiB)"
+            )
+
+            now = time.time()
+            with self._lock:
+                self._entries[language] = _Entry(pipeline, resident_bytes, round(load_ms, 1), now, now)
+                self._loads += 1
+                evicted = self._evict_over_budget(keep=language)
+
+        if evicted:
+            gc.collect()
+        return pipeline
+
+    def _lookup(self, language: str) -> Optional[stanza.Pipeline]:
+        with self._lock:
+            entry = self._entries.get(language)
+            if entry is None:
+                return None
+            self._entries.move_to_end(language)
+            entry.hits += 1
+            entry.last_used_at = time.time()
+            return entry.pipeline
+
+    def _load_lock(self, language: str) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(language, threading.Lock())
+
+    def _evict_over_budget(self, keep: str) -> List[str]:
+        evicted = []
+        if not self.budget_bytes:
+            return evicted
+
+        for language in list(self._entries):
+            if self._resident_bytes() <= self.budget_bytes:
+                break
+            if language == keep:
+                continue
+            entry = self._entries.pop(language)
+            self._evictions += 1
+            evicted.append(language)
+            logger.info(
+                f"Evicted Stanza pipeline for {language} ({entry.resident_bytes // 2**20} MiB) to stay within budget"
+            )
+
+        if self._resident_bytes() > self.budget_bytes:
+            logger.warning(
+                f"Stanza pipeline for {keep} alone exceeds the {self.budget_bytes // 2**20} MiB memory budget"
+            )
+        return evicted
+
+    def _resident_bytes(self) -> int:
+        return sum(entry.resident_bytes for entry in self._entries.values())
+
+    def state(self, language: LanguageCode) -> str:
+        """'loaded', 'loading' or 'unloaded'."""
+        with self._lock:
+            if language in self._entries:
+                return "loaded"
+            return "loading" if language in self._loading else "unloaded"
+
+    def loaded(self) -> List[str]:
+        """Loaded languages, least recently used first."""
+        with self._lock:
+            return list(self._entries)
+
+    def evict(self, language: LanguageCode) -> bool:
+        """Drop the pipeline for `language`; returns False if it was not loaded."""
+        with self._lock:
+            entry = self._entries.pop(language, None)
+            if entry is not None:
+                self._evictions += 1
+        if entry is None:
+            return False
+        gc.collect()
+        return True
+
+    def clear(self) -> None:
+        """Drop every loaded pipeline."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Budget, total and per-language resident size, and load/eviction counters."""
+        with self._lock:
+            return {
+                "budget_bytes": self.budget_bytes,
+                "resident_bytes": self._resident_bytes(),
+                "loads": self._loads,
+                "evictions": self._evictions,
+                "languages": {
+                    language: {
+                        "resident_bytes": entry.resident_bytes,
+                        "load_ms": entry.load_ms,
+                        "loaded_at": entry.loaded_at,
+                        "last_used_at": entry.last_used_at,
+                        "hits": entry.hits,
+                    }
+                    for language, entry in self._entries.items()
+                },
+            }
+
+
+pipeline_registry = PipelineRegistry()
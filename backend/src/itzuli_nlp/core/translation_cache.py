@@ -0,0 +1,230 @@
+"""Persistent translation memory for Itzuli results."""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .normalize import normalization_tag, normalize_text
+
+logger = logging.getLogger(__name__)
+
+TRANSLATION_CACHE_DB = os.getenv("TRANSLATION_CACHE_DB", ".cache/translations.db")
+# Least recently used translations beyond this many are evicted; 0 keeps everything
+TRANSLATION_CACHE_MAX_ENTRIES = int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "100000"))
+# Translations older than this are fetched again, picking up Itzuli model updates; 0 never expires
+TRANSLATION_CACHE_TTL_SECONDS = int(os.getenv("TRANSLATION_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+# 0 disables the cache: every call goes to Itzuli
+TRANSLATION_CACHE_ENABLED = os.getenv("TRANSLATION_CACHE_ENABLED", "1") == "1"
+
+# Writes between eviction passes
+_EVICT_EVERY = 500
+
+
+class TranslationCache:
+    """
+    SQLite translation memory keyed by normalized text and language pair.
+
+    Stores the translated text and the Itzuli `translation_id`, so feedback
+    can still be sent for a cached translation. Texts are normalized as for
+    alignment cache keys, without punctuation folding, which could change a
+    translation.
+
+    Bounded by its own policy, independent of the alignment cache: entries
+    past `ttl_seconds` are misses, and every few hundred writes the oldest
+    and least recently used entries beyond `max_entries` are removed. The
+    database is created on first use; each thread gets its own connection,
+    and connections are reopened after fork.
+    """
+
+    def __init__(
+        self,
+        db_path: str = TRANSLATION_CACHE_DB,
+        max_entries: int = TRANSLATION_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = TRANSLATION_CACHE_TTL_SECONDS,
+        enabled: bool = TRANSLATION_CACHE_ENABLED,
+    ):
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        os.register_at_fork(after_in_child=self._reset_connections)
+
+    def _reset_connections(self) -> None:
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        with self._schema_lock:
+            if not self._schema_ready:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                with closing(sqlite3.connect(self.db_path, timeout=30)) as db, db:
+                    db.execute("PRAGMA journal_mode=WAL")
+                    db.execute(
+                        "CREATE TABLE IF NOT EXISTS translations ("
+                        "key TEXT PRIMARY KEY, source_lang TEXT NOT NULL, target_lang TEXT NOT NULL, "
+                        "source_text TEXT NOT NULL, translated_text TEXT NOT NULL, translation_id TEXT NOT NULL, "
+                        "created_at REAL NOT NULL, accessed_at REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+                    )
+                    db.execute("CREATE INDEX IF NOT EXISTS translations_accessed_at ON translations (accessed_at)")
+                self._schema_ready = True
+
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.db_path, timeout=30)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def key_for(self, text: str, source_lang: str, target_lang: str) -> str:
+        """Cache key for a translation request."""
+        key_string = f"{normalization_tag(False)}:{normalize_text(text, False)}:{source_lang}:{target_lang}"
+        return hashlib.sha256(key_string.encode()).hexdigest()
+
+    def get(self, text: str, source_lang: str, target_lang: str) -> Optional[Dict[str, str]]:
+        """Cached translation as {"translated_text", "id"}, or None."""
+        key = self.key_for(text, source_lang, target_lang)
+        not_before = time.time() - self.ttl_seconds if self.ttl_seconds else 0.0
+        try:
+            db = self._connection()
+            row = db.execute(
+                "SELECT translated_text, translation_id FROM translations WHERE key=? AND created_at >= ?",
+                (key, not_before),
+            ).fetchone()
+            if row is not None:
+                with db:
+                    db.execute("UPDATE translations SET accessed_at=?, hits=hits+1 WHERE key=?", (time.time(), key))
+        except Exception as e:
+            logger.warning(f"Translation cache retrieval failed: {e}")
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return {"translated_text": row[0], "id": row[1]}
+
+    def set(self, text: str, source_lang: str, target_lang: str, translation_data: Dict[str, Any]) -> None:
+        """Store an Itzuli translation response; empty translations are not stored."""
+        translated_text = translation_data.get("translated_text", "")
+        if not translated_text:
+            return
+        now = time.time()
+        try:
+            with self._connection() as db:
+                db.execute(
+                    "INSERT INTO translations (key, source_lang, target_lang, source_text, translated_text, "
+                    "translation_id, created_at, accessed_at) VALUES (?,?,?,?,?,?,?,?) ON CONFLICT(key) DO UPDATE SET "
+                    "translated_text=excluded.translated_text, translation_id=excluded.translation_id, "
+                    "created_at=excluded.created_at, accessed_at=excluded.accessed_at",
+                    (
+                        self.key_for(text, source_lang, target_lang),
+                        source_lang,
+                        target_lang,
+                        text,
+                        translated_text,
+                        str(translation_data.get("id", "")),
+                        now,
+                        now,
+                    ),
+                )
+        except Exception as e:
+            logger.warning(f"Translation cache storage failed: {e}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            due = self._writes % _EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def get_or_translate(
+        self, text: str, source_lang: str, target_lang: str, translate: Callable[[], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Return the cached translation, or call `translate()` and cache its result.
+
+        Args:
+            text: Source text
+            source_lang: Source language code
+            target_lang: Target language code
+            translate: Fetches the translation from Itzuli, returning its response dict
+
+        Returns:
+            Dict with at least "translated_text" and, when known, "id"
+        """
+        if not self.enabled:
+            return translate()
+        cached = self.get(text, source_lang, target_lang)
+        if cached is not None:
+            logger.info(f"Translation cache hit for text: {text[:50]}...")
+            return cached
+        translation_data = translate()
+        self.set(text, source_lang, target_lang, translation_data)
+        return translation_data
+
+    def evict(self) -> int:
+        """Remove expired entries and the least recently used beyond `max_entries`; returns the number removed."""
+        try:
+            with self._connection() as db:
+                before = db.total_changes
+                if self.ttl_seconds:
+                    db.execute("DELETE FROM translations WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+                if self.max_entries:
+                    db.execute(
+                        "DELETE FROM translations WHERE key IN (SELECT key FROM translations "
+                        "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,),
+                    )
+                removed = db.total_changes - before
+        except Exception as e:
+            logger.warning(f"Translation cache eviction failed: {e}")
+            return 0
+
+        with self._lock:
+            self.evicted += removed
+        if removed:
+            logger.info(f"Translation cache evicted {removed} entries")
+        return removed
+
+    def clear(self) -> None:
+        """Remove every cached translation."""
+        with self._connection() as db:
+            db.execute("DELETE FROM translations")
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, bounds, and hit/miss/eviction counters."""
+        (entries,) = self._connection().execute("SELECT COUNT(*) FROM translations").fetchone()
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evicted": self.evicted,
+            }
+
+
+translation_cache = TranslationCache()
+
+
+def cached_translation(
+    text: str, source_lang: str, target_lang: str, translate: Callable[[], Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Translate through the shared translation cache; see TranslationCache.get_or_translate."""
+    return translation_cache.get_or_translate(text, source_lang, target_lang, translate)
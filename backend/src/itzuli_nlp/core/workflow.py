@@ -2,19 +2,19 @@
 
 import logging
 
-from Itzuli import Itzuli
-
-from .nlp import create_pipeline, process_raw_analysis
+from .analysis_cache import cached_analysis
+from .itzuli_client import itzuli_client
+from .nlp import process_raw_analysis
+from .pipelines import pipeline_registry
+from .translation_cache import cached_translation
 from .types import LanguageCode, TranslationResult
 
 logger = logging.getLogger("itzuli-stanza-pipeline")
 
 
-def get_cached_stanza_pipeline():
-    """Get or create Stanza pipeline (cached)."""
-    if not hasattr(get_cached_stanza_pipeline, "_pipeline"):
-        get_cached_stanza_pipeline._pipeline = create_pipeline()
-    return get_cached_stanza_pipeline._pipeline
+def get_cached_stanza_pipeline(language: LanguageCode = "eu"):
+    """Get or create Stanza pipeline from the shared registry."""
+    return pipeline_registry.get(language)
 
 
 def process_translation_with_analysis(
@@ -37,18 +37,23 @@ def process_translation_with_analysis(
     Returns:
         TranslationResult with translation and analysis data
     """
-    # Get translation from Itzuli
-    itzuli_client = Itzuli(api_key)
-    translation_data = itzuli_client.getTranslation(text, source_language, target_language)
+    # Get translation from Itzuli, or the translation cache
+    translation_data = cached_translation(
+        text,
+        source_language,
+        target_language,
+        lambda: itzuli_client.translate(api_key, text, source_language, target_language),
+    )
     translated_text = translation_data.get("translated_text", "")
     translation_id = translation_data.get("id", "")
 
     # Determine which text to analyze (always analyze Basque text)
     basque_text = text if source_language == "eu" else translated_text
 
-    # Perform morphological analysis (raw Stanza output)
-    stanza_pipeline = get_cached_stanza_pipeline()
-    analysis_rows = process_raw_analysis(stanza_pipeline, basque_text)
+    # Perform morphological analysis (raw Stanza output), or reuse a cached one
+    analysis_rows = cached_analysis(
+        "eu", basque_text, lambda: process_raw_analysis(get_cached_stanza_pipeline(), basque_text)
+    )
 
     return TranslationResult(
         source_text=text,
@@ -2,9 +2,8 @@
 
 import logging
 
-from Itzuli import Itzuli
-
 from ..core.formatters import format_as_markdown_table
+from ..core.itzuli_client import itzuli_client
 from ..core.types import LanguageCode
 from ..core.workflow import process_translation_with_analysis
 
@@ -24,12 +23,10 @@ def translate_with_analysis(
 
 
 def get_quota(api_key: str) -> dict:
-    """Check API quota using Itzuli client."""
-    itzuli_client = Itzuli(api_key)
-    return itzuli_client.getQuota()
+    """Check API quota using the shared Itzuli client."""
+    return itzuli_client.get_quota(api_key)
 
 
 def send_feedback(api_key: str, translation_id: str, correction: str, evaluation: int) -> dict:
-    """Send feedback using Itzuli client."""
-    itzuli_client = Itzuli(api_key)
-    return itzuli_client.sendFeedback(translation_id, correction, evaluation)
+    """Send feedback using the shared Itzuli client."""
+    return itzuli_client.send_feedback(api_key, translation_id, correction, evaluation)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Compare the encodings available for alignment cache entries.
+
+Reads entries from an existing cache database and reports, for each codec,
+the stored size and the time taken to encode and decode an entry. Sizes are
+compared with the indented JSON the file-based cache used to store. A real
+cache is required: a handful of sample scaffolds compress unrealistically
+well, so the ratios would say nothing about which codec to pick.
+
+`zstd` is only measured when the optional `zstandard` package is installed;
+it is not a dependency of this project.
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from typing import List
+
+from itzuli_nlp.alignment_server import codec
+from itzuli_nlp.alignment_server.types import AlignmentData
+
+
+def load_payloads(db_path: str, limit: int = 1000) -> List[bytes]:
+    """Minified JSON payloads of up to `limit` entries from a cache database."""
+    with sqlite3.connect(db_path) as db:
+        rows = db.execute("SELECT data FROM alignments LIMIT ?", (limit,)).fetchall()
+    return [json.dumps(json.loads(codec.decode(data)), separators=(",", ":")).encode() for (data,) in rows]
+
+
+def legacy_size(payloads: List[bytes]) -> int:
+    """Total size of the payloads as the file-based cache stored them: indented JSON."""
+    return sum(
+        len(AlignmentData.model_validate_json(payload).model_dump_json(indent=2).encode()) for payload in payloads
+    )
+
+
+def benchmark(payloads: List[bytes], codec_name: str) -> dict:
+    """Total encoded size and mean encode/decode time per entry for one codec."""
+    started = time.perf_counter()
+    encoded = [codec.encode(payload, codec_name) for payload in payloads]
+    encode_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    for entry in encoded:
+        codec.decode(entry)
+    decode_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        "bytes": sum(len(entry) for entry in encoded),
+        "encode_ms": encode_ms / len(payloads),
+        "decode_ms": decode_ms / len(payloads),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare alignment cache entry encodings")
+    parser.add_argument("--db", required=True, help="Alignment cache database to read entries from")
+    parser.add_argument("--limit", type=int, default=1000, help="Maximum number of entries to read")
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.db, args.limit)
+    if not payloads:
+        print("No cache entries found", file=sys.stderr)
+        sys.exit(1)
+
+    baseline = legacy_size(payloads)
+    print(f"{len(payloads)} entries; ratios are relative to the indented JSON the file cache stored")
+    print(f"{'codec':<6} {'bytes':>12} {'ratio':>7} {'encode ms':>10} {'decode ms':>10}")
+    print(f"{'legacy':<6} {baseline:>12} {1:>7.2f} {'-':>10} {'-':>10}")
+    for codec_name in codec.CODECS:
+        try:
+            codec.check_codec(codec_name)
+        except ValueError as e:
+            print(f"{codec_name:<6} skipped: {e}")
+            continue
+        result = benchmark(payloads, codec_name)
+        print(
+            f"{codec_name:<6} {result['bytes']:>12} {result['bytes'] / baseline:>7.2f} "
+            f"{result['encode_ms']:>10.3f} {result['decode_ms']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Show the time-to-first-token effect of prompt caching against a stub Messages API.
+
+Starts a local HTTP server that streams Messages API responses and models
+prefill cost: every uncached prompt token delays the first token by
+`--prefill-us-per-token`, while tokens read from its prompt cache cost a
+tenth of that. Like the real API, it caches the prefix up to a
+`cache_control` breakpoint on first use and reports cache writes and reads
+in `usage`.
+
+The alignment requests are sent through the Anthropic SDK exactly as
+AsyncClaudeClient builds them, once with prompt caching and once without, and
+the mean time to first token and token usage are printed for each. The
+stub's cost model is an assumption; the real speed-up depends on the model
+and prompt length, and is reported by `claude` in the server's /metrics.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+from unittest.mock import patch
+
+from itzuli_nlp.alignment_server import claude_client
+from itzuli_nlp.alignment_server.claude_client import AsyncClaudeClient, ClaudeUsage
+
+SAMPLE_TOKENS = (
+    [{"id": "s0", "form": "Kaixo"}, {"id": "s1", "form": "mundua"}],
+    [{"id": "t0", "form": "Hello"}, {"id": "t1", "form": "world"}],
+)
+SAMPLE_RESPONSE = '{"lexical": [{"source": ["s1"], "target": ["t1"], "label": "mundua → world"}]}'
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for the stub's cost model: about four characters per token."""
+    return max(1, len(text) // 4)
+
+
+class StubMessagesServer(ThreadingHTTPServer):
+    """Local Messages API stand-in with a prompt cache and a prefill cost model."""
+
+    def __init__(self, prefill_us_per_token: float):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.prefill_seconds_per_token = prefill_us_per_token / 1_000_000
+        self.cached_prefixes = set()
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def usage_for(self, body: Dict[str, Any]) -> Dict[str, int]:
+        """Split the prompt into uncached, cache-written and cache-read tokens, as the API does."""
+        system = body.get("system", [])
+        blocks = [{"type": "text", "text": system}] if isinstance(system, str) else system
+        user_tokens = sum(estimate_tokens(json.dumps(message["content"])) for message in body["messages"])
+
+        prefix, cacheable_tokens = "", 0
+        for block in blocks:
+            prefix += block["text"]
+            if "cache_control" in block:
+                cacheable_tokens = estimate_tokens(prefix)
+        uncached_tokens = estimate_tokens(prefix) - cacheable_tokens + user_tokens
+
+        usage = {"input_tokens": uncached_tokens, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+        if cacheable_tokens:
+            with self.lock:
+                hit = prefix in self.cached_prefixes
+                self.cached_prefixes.add(prefix)
+            usage["cache_read_input_tokens" if hit else "cache_creation_input_tokens"] = cacheable_tokens
+        return usage
+
+    def prefill_seconds(self, usage: Dict[str, int]) -> float:
+        full_cost = usage["input_tokens"] + usage["cache_creation_input_tokens"]
+        return (full_cost + usage["cache_read_input_tokens"] / 10) * self.prefill_seconds_per_token
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server: StubMessagesServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        usage = self.server.usage_for(body)
+        time.sleep(self.server.prefill_seconds(usage))
+
+        message = {
+            "id": "msg_stub",
+            "type": "message",
+            "role": "assistant",
+            "model": body["model"],
+            "content": [],
+            "stop_reason": None,
+            "stop_sequence": None,
+            "usage": {**usage, "output_tokens": 1},
+        }
+        text_block = {"type": "text", "text": ""}
+        text_delta = {"type": "text_delta", "text": SAMPLE_RESPONSE}
+        final_delta = {"stop_reason": "end_turn", "stop_sequence": None}
+        output_usage = {"output_tokens": estimate_tokens(SAMPLE_RESPONSE)}
+        events = [
+            {"type": "message_start", "message": message},
+            {"type": "content_block_start", "index": 0, "content_block": text_block},
+            {"type": "content_block_delta", "index": 0, "delta": text_delta},
+            {"type": "content_block_stop", "index": 0},
+            {"type": "message_delta", "delta": final_delta, "usage": output_usage},
+            {"type": "message_stop"},
+        ]
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for event in events:
+            self.wfile.write(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode())
+            self.wfile.flush()
+
+
+async def run(base_url: str, requests: int, caching: bool) -> Dict[str, Any]:
+    """Stream `requests` alignment calls through AsyncClaudeClient; returns its usage stats."""
+    usage = ClaudeUsage()
+    with (
+        patch.object(claude_client, "CLAUDE_PROMPT_CACHING", caching),
+        patch.object(claude_client, "claude_usage", usage),
+        patch.dict(os.environ, {"ANTHROPIC_BASE_URL": base_url}),
+    ):
+        client = AsyncClaudeClient(api_key="stub")
+        try:
+            for _ in range(requests):
+                async for _layer in client.stream_alignments(*SAMPLE_TOKENS, "eu", "en", "Kaixo mundua", "Hello world"):
+                    pass
+        finally:
+            await client.aclose()
+    return usage.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare time to first token with and without prompt caching")
+    parser.add_argument("--requests", "-n", type=int, default=20, help="Requests per run (default: 20)")
+    parser.add_argument(
+        "--prefill-us-per-token",
+        type=float,
+        default=200,
+        help="Stub delay per uncached prompt token, in microseconds (default: 200)",
+    )
+    args = parser.parse_args()
+
+    results: List[Tuple[str, Dict[str, Any]]] = []
+    for caching in (False, True):
+        # A fresh server per run, so the cached run starts with a cold cache
+        server = StubMessagesServer(args.prefill_us_per_token)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            stats = asyncio.run(run(server.base_url, args.requests, caching))
+            results.append(("cached" if caching else "uncached", stats))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    print(f"{args.requests} requests per run, {args.prefill_us_per_token:g} µs prefill per uncached token")
+    print(f"{'run':<9} {'avg ttft ms':>12} {'input':>8} {'cache write':>12} {'cache read':>11}")
+    for name, stats in results:
+        print(
+            f"{name:<9} {stats['avg_ttft_ms']:>12.1f} {stats['input_tokens']:>8} "
+            f"{stats['cache_creation_input_tokens']:>12} {stats['cache_read_input_tokens']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -12,12 +12,17 @@ import json
 import logging
 import os
 import sys
-from typing import List, Tuple
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from Itzuli import Itzuli
 
-from itzuli_nlp.core.nlp import create_pipeline, process_raw_analysis
+from itzuli_nlp.core.analysis_cache import analysis_cache
+from itzuli_nlp.core.batching import StanzaBatcher
+from itzuli_nlp.core.itzuli_client import itzuli_client
+from itzuli_nlp.core.pipelines import pipeline_registry
+from itzuli_nlp.core.translation_cache import cached_translation
 from itzuli_nlp.core.types import AnalysisRow, LanguageCode
 
 load_dotenv()
@@ -25,16 +30,62 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
-# Cache pipelines to avoid recreating them
-_pipelines = {}
+def get_cached_pipeline(language: LanguageCode):
+    """Get or create a Stanza pipeline for the specified language from the shared registry."""
+    return pipeline_registry.get(language)
 
 
-def get_cached_pipeline(language: LanguageCode):
-    """Get or create a Stanza pipeline for the specified language."""
-    if language not in _pipelines:
-        logger.info(f"Creating Stanza pipeline for language: {language}")
-        _pipelines[language] = create_pipeline(language)
-    return _pipelines[language]
+# Concurrent analyses of the same language share Stanza calls
+batcher = StanzaBatcher(lambda language: get_cached_pipeline(language), cache=analysis_cache)
+
+WARM_UP_TEXTS = {
+    "eu": "Kaixo, zer moduz zaude?",
+    "en": "Hello, how are you?",
+    "es": "Hola, ¿qué tal estás?",
+    "fr": "Bonjour, comment allez-vous ?",
+}
+
+
+def preload_pipelines(languages: List[LanguageCode]) -> Dict[LanguageCode, "Future[List[AnalysisRow]]"]:
+    """
+    Load and warm up pipelines for several languages in parallel, without blocking.
+
+    Each language's batcher thread loads its pipeline and runs a short
+    warm-up analysis, so languages load concurrently and requests only
+    queue behind the language they need. Warm-ups skip the analysis
+    cache, which would otherwise answer them without loading anything.
+
+    Returns:
+        A future per language that completes once it has been warmed up
+    """
+    return {language: batcher.submit(language, WARM_UP_TEXTS.get(language, "Hello."), use_cache=False) for language in languages}
+
+
+def translate_text(api_key: str, text: str, source_language: LanguageCode, target_language: LanguageCode) -> str:
+    """Translate text with Itzuli, or the shared translation cache, and return the translated string."""
+    translation_data = cached_translation(
+        text,
+        source_language,
+        target_language,
+        lambda: itzuli_client.translate(api_key, text, source_language, target_language),
+    )
+    return translation_data.get("translated_text", "")
+
+
+def batch_analyze(language: LanguageCode, texts: List[str]) -> List[List[AnalysisRow]]:
+    """
+    Analyze several texts in one language through the shared batcher.
+
+    Args:
+        language: Language code shared by all texts
+        texts: Texts to analyze
+
+    Returns:
+        One list of AnalysisRow per input text, in input order
+    """
+    results = batcher.analyze_many(language, texts)
+    logger.info(f"Batch analysis ({language}): {len(texts)} texts")
+    return results
 
 
 def analyze_both_texts(
@@ -42,38 +93,52 @@ def analyze_both_texts(
     text: str,
     source_language: LanguageCode,
     target_language: LanguageCode,
+    timings: Optional[Dict[str, float]] = None,
 ) -> Tuple[str, List[AnalysisRow], List[AnalysisRow]]:
     """
     Translate text and analyze both source and translated text.
-    
+
+    The source text is queued for analysis before the translation is
+    requested, so Stanza tags it while Itzuli translates, and the
+    translation is queued the moment it arrives.
+
     Args:
         api_key: Itzuli API key
         text: Source text to translate
         source_language: Source language code
         target_language: Target language code
-        
+        timings: When given, receives `translation_ms`, `source_analysis_ms` and
+            `target_analysis_ms`, each measured from when that stage could start
+
     Returns:
         Tuple of (translated_text, source_analysis, translation_analysis)
     """
-    # Get translation
-    itzuli_client = Itzuli(api_key)
-    translation_data = itzuli_client.getTranslation(text, source_language, target_language)
-    translated_text = translation_data.get("translated_text", "")
-    
+    finished: Dict[str, float] = {}
+    started = time.perf_counter()
+
+    source_future = batcher.submit(source_language, text)
+    source_future.add_done_callback(lambda _: finished.setdefault("source", time.perf_counter()))
+
+    translated_text = translate_text(api_key, text, source_language, target_language)
+    translated = time.perf_counter()
     logger.info(f"Translation: '{text}' -> '{translated_text}'")
-    
-    # Get pipelines for both languages
-    source_pipeline = get_cached_pipeline(source_language)
-    target_pipeline = get_cached_pipeline(target_language)
-    
-    # Analyze source text
-    source_analysis = process_raw_analysis(source_pipeline, text)
+
+    target_future = batcher.submit(target_language, translated_text)
+    target_future.add_done_callback(lambda _: finished.setdefault("target", time.perf_counter()))
+
+    source_analysis = source_future.result()
+    # result() can return before the done callbacks have run, so fall back to now
+    source_done = finished.get("source", time.perf_counter())
     logger.info(f"Source analysis: {len(source_analysis)} tokens")
-    
-    # Analyze translated text
-    translation_analysis = process_raw_analysis(target_pipeline, translated_text)
+    translation_analysis = target_future.result()
+    target_done = finished.get("target", time.perf_counter())
     logger.info(f"Translation analysis: {len(translation_analysis)} tokens")
-    
+
+    if timings is not None:
+        timings["translation_ms"] = round((translated - started) * 1000, 1)
+        timings["source_analysis_ms"] = round((source_done - started) * 1000, 1)
+        timings["target_analysis_ms"] = round((target_done - translated) * 1000, 1)
+
     return translated_text, source_analysis, translation_analysis
 
 
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Report and apply alignment cache key normalization.
+
+Shows how many cached alignments stored under distinct keys collapse into
+one entry under the current normalization rules, and optionally moves the
+entries in the cache database to their normalized keys. Also reports on a
+legacy one-file-per-entry cache directory without importing it.
+"""
+
+import argparse
+import logging
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+from itzuli_nlp.alignment_server.cache import AlignmentCache, default_db_path
+from itzuli_nlp.core.normalize import FOLD_TRAILING_PUNCTUATION
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def report_directory(directory: Path, fold_punctuation: bool) -> dict:
+    """Collapse counts for a legacy cache directory, whose file names are the old keys."""
+    with tempfile.TemporaryDirectory() as scratch:
+        cache = AlignmentCache(
+            db_path=str(Path(scratch) / "keys.db"),
+            fold_punctuation=fold_punctuation,
+            migrate_legacy=False,
+        )
+        keys = Counter()
+        unkeyable = 0
+        for cache_file in directory.glob("*.json"):
+            try:
+                key = cache.key_for_entry(cache_file.read_text(encoding="utf-8"))
+            except Exception as e:
+                logger.warning(f"Skipping unreadable cache file {cache_file.name}: {e}")
+                key = None
+            if key is None:
+                unkeyable += 1
+            else:
+                keys[key] += 1
+
+    duplicates = [count for count in keys.values() if count > 1]
+    return {
+        "entries": sum(keys.values()) + unkeyable,
+        "collapsed": sum(duplicates) - len(duplicates),
+        "groups": len(duplicates),
+        "unkeyable": unkeyable,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report and apply alignment cache key normalization")
+    parser.add_argument("--db", default=str(default_db_path()), help="Cache database")
+    parser.add_argument("--dir", type=Path, help="Report on a legacy JSON cache directory instead of the database")
+    parser.add_argument(
+        "--fold-punctuation",
+        action=argparse.BooleanOptionalAction,
+        default=FOLD_TRAILING_PUNCTUATION,
+        help="Fold trailing punctuation; defaults to CACHE_KEY_FOLD_PUNCTUATION, like the server",
+    )
+    parser.add_argument("--apply", action="store_true", help="Move database entries to their normalized keys")
+    args = parser.parse_args()
+
+    if args.dir:
+        result = report_directory(args.dir, args.fold_punctuation)
+    else:
+        # Leave any legacy directory alone; the server imports it on start
+        cache = AlignmentCache(db_path=args.db, fold_punctuation=args.fold_punctuation, migrate_legacy=False)
+        result = cache.rekey(apply=args.apply)
+
+    print(f"Entries:                {result['entries']}")
+    if "rekeyed" in result:
+        print(f"Entries changing key:   {result['rekeyed']}")
+    print(f"Duplicates collapsed:   {result['collapsed']} (into {result['groups']} entries)")
+    print(f"Without a request text: {result['unkeyable']}")
+    if not args.dir and not args.apply and result["rekeyed"]:
+        print("Run again with --apply to rewrite the database")
+
+
+if __name__ == "__main__":
+    main()
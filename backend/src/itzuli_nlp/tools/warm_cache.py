@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Precompute alignments for a corpus of sentences into the alignment cache.
+
+Reads (text, source, target, id) rows from a JSONL or CSV file, skips those
+already cached, and runs the full translate/analyze/align pipeline for the
+rest with bounded concurrency over one shared Claude client. Finished sentences are appended to a
+checkpoint file, so an interrupted run resumes where it stopped.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Set
+
+from dotenv import load_dotenv
+
+from itzuli_nlp.alignment_server.alignment_generator import (
+    create_enriched_alignment_data_async,
+    has_alignments,
+)
+from itzuli_nlp.alignment_server.cache import AlignmentCache
+from itzuli_nlp.alignment_server.claude_client import AsyncClaudeClient
+
+from .dual_analysis import analyze_both_texts
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+LANGUAGES = ("eu", "es", "en", "fr")
+
+
+@dataclass
+class CorpusItem:
+    text: str
+    source: str
+    target: str
+    id: str
+
+
+@dataclass
+class WarmReport:
+    total: int = 0
+    cached: int = 0
+    checkpointed: int = 0
+    generated: int = 0
+    failures: Dict[str, str] = field(default_factory=dict)
+    elapsed_s: float = 0.0
+
+    @property
+    def per_second(self) -> float:
+        return self.generated / self.elapsed_s if self.elapsed_s else 0.0
+
+
+def read_corpus(path: Path) -> List[CorpusItem]:
+    """
+    Read corpus rows from a JSONL file, or a CSV file with a header row.
+
+    Each row needs `text`, `source` and `target`; `id` is optional.
+
+    Raises:
+        ValueError: If a row is missing a field or names an unsupported language
+    """
+    with path.open(encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    items = []
+    for number, row in enumerate(rows, start=1):
+        missing = [name for name in ("text", "source", "target") if not row.get(name)]
+        if missing:
+            raise ValueError(f"Row {number} of {path} is missing {', '.join(missing)}")
+        for name in ("source", "target"):
+            if row[name] not in LANGUAGES:
+                raise ValueError(f"Row {number} of {path} has unsupported {name} language: {row[name]}")
+        sentence_id = row.get("id") or f"{row['source']}-{row['target']}-{number:04d}"
+        items.append(CorpusItem(row["text"], row["source"], row["target"], str(sentence_id)))
+    return items
+
+
+def read_checkpoint(path: Path) -> Set[str]:
+    """Cache keys recorded as finished by earlier runs."""
+    if not path.exists():
+        return set()
+    return {line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()}
+
+
+def warm_cache(
+    items: List[CorpusItem],
+    cache: AlignmentCache,
+    itzuli_api_key: str,
+    claude_api_key: str,
+    checkpoint: Path,
+    concurrency: int = 4,
+) -> WarmReport:
+    """
+    Generate and cache alignments for every item not already cached or checkpointed.
+
+    Sentences that come back without alignments are failures: they are not
+    cached or checkpointed, so the next run retries them.
+
+    Returns:
+        Counts of skipped and generated sentences, failures by sentence id, and elapsed time
+    """
+    report = WarmReport(total=len(items))
+    done = read_checkpoint(checkpoint)
+
+    # Duplicate sentences in the corpus are generated once
+    pending: Dict[str, CorpusItem] = {}
+    for item in items:
+        key = cache.key_for(item.text, item.source, item.target)
+        if key in done:
+            report.checkpointed += 1
+        else:
+            pending.setdefault(key, item)
+
+    cached = cache.get_many([(item.text, item.source, item.target) for item in pending.values()])
+    for key, hit in zip(list(pending), cached):
+        if hit is not None:
+            report.cached += 1
+            del pending[key]
+    logger.info(
+        f"{report.total} sentences: {report.cached} cached, {report.checkpointed} checkpointed, "
+        f"{len(pending)} to generate"
+    )
+
+    started = time.perf_counter()
+    asyncio.run(_generate_pending(pending, cache, itzuli_api_key, claude_api_key, checkpoint, concurrency, report))
+    report.elapsed_s = time.perf_counter() - started
+    return report
+
+
+async def _generate_pending(
+    pending: Dict[str, CorpusItem],
+    cache: AlignmentCache,
+    itzuli_api_key: str,
+    claude_api_key: str,
+    checkpoint: Path,
+    concurrency: int,
+    report: WarmReport,
+) -> None:
+    """Generate the pending sentences, `concurrency` at a time, recording outcomes in `report`."""
+    claude_client = AsyncClaudeClient(claude_api_key)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def generate(key: str, item: CorpusItem) -> None:
+        async with slots:
+            translated_text, source_analysis, target_analysis = await asyncio.to_thread(
+                analyze_both_texts,
+                api_key=itzuli_api_key,
+                text=item.text,
+                source_language=item.source,
+                target_language=item.target,
+            )
+            alignment_data = await create_enriched_alignment_data_async(
+                source_analysis=source_analysis,
+                target_analysis=target_analysis,
+                source_lang=item.source,
+                target_lang=item.target,
+                source_text=item.text,
+                target_text=translated_text,
+                sentence_id=item.id,
+                claude_client=claude_client,
+            )
+            if not has_alignments(alignment_data):
+                raise RuntimeError("Claude returned no alignments")
+            await asyncio.to_thread(cache.set, item.text, item.source, item.target, alignment_data)
+        with checkpoint.open("a", encoding="utf-8") as f:
+            f.write(f"{key}\n")
+
+    async def run(key: str, item: CorpusItem) -> None:
+        try:
+            await generate(key, item)
+        except Exception as e:
+            report.failures[item.id] = str(e)
+            logger.warning(f"Failed to warm {item.id}: {e}")
+        else:
+            report.generated += 1
+        finished = report.generated + len(report.failures)
+        if finished % 10 == 0 or finished == len(pending):
+            logger.info(f"Progress: {finished}/{len(pending)}")
+
+    try:
+        await asyncio.gather(*(run(key, item) for key, item in pending.items()))
+    finally:
+        await claude_client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute alignments for a corpus into the alignment cache")
+    parser.add_argument("corpus", type=Path, help="JSONL or CSV file with text, source, target and optional id")
+    parser.add_argument("--concurrency", "-c", type=int, default=4, help="Sentences generated at once (default: 4)")
+    parser.add_argument("--checkpoint", type=Path, help="Checkpoint file (default: <corpus>.checkpoint)")
+    parser.add_argument("--db", help="Alignment cache database (default: ALIGNMENT_CACHE_DB, else next to ALIGNMENT_CACHE_DIR)")
+    args = parser.parse_args()
+
+    itzuli_api_key = os.environ.get("ITZULI_API_KEY")
+    claude_api_key = os.environ.get("CLAUDE_API_KEY")
+    if not itzuli_api_key or not claude_api_key:
+        logger.error("ITZULI_API_KEY and CLAUDE_API_KEY environment variables are required")
+        sys.exit(1)
+
+    try:
+        items = read_corpus(args.corpus)
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not read corpus: {e}")
+        sys.exit(1)
+
+    checkpoint = args.checkpoint or args.corpus.with_name(f"{args.corpus.name}.checkpoint")
+    report = warm_cache(
+        items,
+        AlignmentCache(db_path=args.db),
+        itzuli_api_key,
+        claude_api_key,
+        checkpoint,
+        concurrency=args.concurrency,
+    )
+
+    print(f"\nSentences:    {report.total}")
+    print(f"Already done: {report.cached} cached, {report.checkpointed} checkpointed")
+    print(f"Generated:    {report.generated} in {report.elapsed_s:.1f}s ({report.per_second:.2f} sentences/s)")
+    print(f"Failed:       {len(report.failures)}")
+    for sentence_id, error in report.failures.items():
+        print(f"  {sentence_id}: {error}")
+    if report.failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
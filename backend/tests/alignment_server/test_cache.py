@@ -1,10 +1,17 @@
 """Tests for alignment cache functionality."""
 
+import hashlib
 import json
+import os
+import sqlite3
 import tempfile
+import time
 from pathlib import Path
+from unittest.mock import patch
 
-from itzuli_nlp.alignment_server.cache import AlignmentCache
+import pytest
+
+from itzuli_nlp.alignment_server.cache import AlignmentCache, NegativeCache
 from itzuli_nlp.alignment_server.types import (
     AlignmentData,
     AlignmentLayers,
@@ -12,6 +19,39 @@ from itzuli_nlp.alignment_server.types import (
     Token,
     TokenizedSentence,
 )
+from itzuli_nlp.core.normalize import normalization_tag
+
+
+def sample_data(text="Hello", translation="Kaixo"):
+    return AlignmentData(
+        sentences=[
+            SentencePair(
+                id="test-001",
+                source=TokenizedSentence(
+                    lang="en",
+                    text=text,
+                    tokens=[Token(id="s0", form=text, lemma=text.lower(), pos="intj", features=[])],
+                ),
+                target=TokenizedSentence(
+                    lang="eu",
+                    text=translation,
+                    tokens=[Token(id="t0", form=translation, lemma=translation.lower(), pos="intj", features=[])],
+                ),
+                layers=AlignmentLayers(),
+            )
+        ]
+    )
+
+
+def make_cache(temp_dir, **kwargs):
+    return AlignmentCache(
+        db_path=str(Path(temp_dir) / "alignments.db"), legacy_dir=str(Path(temp_dir) / "legacy"), **kwargs
+    )
+
+
+def rows(temp_dir, query="SELECT key, created_at, accessed_at, hits FROM alignments"):
+    with sqlite3.connect(Path(temp_dir) / "alignments.db") as db:
+        return db.execute(query).fetchall()
 
 
 class TestAlignmentCache:
@@ -20,7 +60,7 @@ class TestAlignmentCache:
     def test_cache_key_generation(self):
         """Test that cache keys are consistent."""
         with tempfile.TemporaryDirectory() as temp_dir:
-            cache = AlignmentCache(cache_dir=temp_dir)
+            cache = make_cache(temp_dir)
 
             key1 = cache._get_cache_key("Hello", "en", "eu")
             key2 = cache._get_cache_key("Hello", "en", "eu")
@@ -33,7 +73,7 @@ class TestAlignmentCache:
     def test_cache_miss(self):
         """Test cache miss returns None."""
         with tempfile.TemporaryDirectory() as temp_dir:
-            cache = AlignmentCache(cache_dir=temp_dir)
+            cache = make_cache(temp_dir)
 
             result = cache.get("Hello", "en", "eu")
             assert result is None
@@ -41,27 +81,9 @@ class TestAlignmentCache:
     def test_cache_set_and_get(self):
         """Test storing and retrieving cache data."""
         with tempfile.TemporaryDirectory() as temp_dir:
-            cache = AlignmentCache(cache_dir=temp_dir)
-
-            # Create test alignment data
-            test_data = AlignmentData(
-                sentences=[
-                    SentencePair(
-                        id="test-001",
-                        source=TokenizedSentence(
-                            lang="en",
-                            text="Hello",
-                            tokens=[Token(id="s0", form="Hello", lemma="hello", pos="intj", features=[])],
-                        ),
-                        target=TokenizedSentence(
-                            lang="eu",
-                            text="Kaixo",
-                            tokens=[Token(id="t0", form="Kaixo", lemma="kaixo", pos="intj", features=[])],
-                        ),
-                        layers=AlignmentLayers(),
-                    )
-                ]
-            )
+            cache = make_cache(temp_dir)
+
+            test_data = sample_data()
 
             # Store in cache
             cache.set("Hello", "en", "eu", test_data)
@@ -75,42 +97,86 @@ class TestAlignmentCache:
             assert result.sentences[0].source.text == "Hello"
             assert result.sentences[0].target.text == "Kaixo"
 
-    def test_cache_file_created(self):
-        """Test that cache files are created on disk."""
+    def test_cache_entry_created(self):
+        """Test that entries are stored in the database with timestamps."""
         with tempfile.TemporaryDirectory() as temp_dir:
-            cache = AlignmentCache(cache_dir=temp_dir)
+            cache = make_cache(temp_dir)
 
             test_data = AlignmentData(sentences=[])
             cache.set("test", "en", "eu", test_data)
 
-            cache_dir = Path(temp_dir)
-            json_files = list(cache_dir.glob("*.json"))
+            [(key, created_at, accessed_at, hits)] = rows(temp_dir)
+            assert key == cache._get_cache_key("test", "en", "eu")
+            assert created_at == accessed_at
+            assert hits == 0
+
+    def test_get_records_access(self):
+        """Test that reads update the access time and hit count."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = make_cache(temp_dir)
+            cache.set("test", "en", "eu", AlignmentData(sentences=[]))
+
+            cache.get("test", "en", "eu")
+            cache.get("test", "en", "eu")
+            # Reads served from memory are written back on the next eviction pass
+            cache.evict()
 
-            assert len(json_files) == 1
-            assert json_files[0].suffix == ".json"
+            [(_, created_at, accessed_at, hits)] = rows(temp_dir)
+            assert accessed_at >= created_at
+            assert hits == 2
 
-            # Verify file contains valid JSON
-            content = json_files[0].read_text()
-            data = json.loads(content)
-            assert "sentences" in data
+    def test_uses_wal_mode(self):
+        """Test that the database runs in WAL mode."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            make_cache(temp_dir)
+
+            assert rows(temp_dir, "PRAGMA journal_mode") == [("wal",)]
+
+    def test_bulk_get_and_set(self):
+        """Test storing and retrieving several entries at once."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = make_cache(temp_dir)
+            cache.set_many(
+                [
+                    ("Hello", "en", "eu", sample_data("Hello", "Kaixo")),
+                    ("Bye", "en", "eu", sample_data("Bye", "Agur")),
+                ]
+            )
+
+            results = cache.get_many([("Bye", "en", "eu"), ("Missing", "en", "eu"), ("Hello", "en", "eu")])
+
+            assert results[0].sentences[0].target.text == "Agur"
+            assert results[1] is None
+            assert results[2].sentences[0].target.text == "Kaixo"
+
+    def test_set_overwrites_existing_entry(self):
+        """Test that storing the same request again replaces its data."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = make_cache(temp_dir)
+
+            cache.set("Hello", "en", "eu", sample_data("Hello", "Kaixo"))
+            cache.set("Hello", "en", "eu", sample_data("Hello", "Aupa"))
+
+            assert cache.get("Hello", "en", "eu").sentences[0].target.text == "Aupa"
+            assert len(rows(temp_dir)) == 1
 
     def test_cache_clear(self):
         """Test clearing all cached data."""
         with tempfile.TemporaryDirectory() as temp_dir:
-            cache = AlignmentCache(cache_dir=temp_dir)
+            cache = make_cache(temp_dir)
 
             # Create multiple cache entries
             test_data = AlignmentData(sentences=[])
             cache.set("test1", "en", "eu", test_data)
             cache.set("test2", "en", "es", test_data)
 
-            cache_dir = Path(temp_dir)
-            assert len(list(cache_dir.glob("*.json"))) == 2
+            assert len(rows(temp_dir)) == 2
 
             # Clear cache
             cache.clear()
 
-            assert len(list(cache_dir.glob("*.json"))) == 0
+            assert len(rows(temp_dir)) == 0
+            assert cache.get("test1", "en", "eu") is None
 
     def test_cache_directory_creation(self):
         """Test that cache directory is created if it doesn't exist."""
@@ -118,20 +184,637 @@ class TestAlignmentCache:
             cache_path = Path(temp_dir) / "nested" / "cache"
             assert not cache_path.exists()
 
-            AlignmentCache(cache_dir=str(cache_path))
-            assert cache_path.exists()
+            AlignmentCache(db_path=str(cache_path / "alignments.db"), legacy_dir=str(Path(temp_dir) / "legacy"))
             assert cache_path.is_dir()
+            assert (cache_path / "alignments.db").exists()
 
-    def test_corrupted_cache_file_handling(self):
-        """Test graceful handling of corrupted cache files."""
+    def test_corrupted_cache_entry_handling(self):
+        """Test graceful handling of corrupted cache entries."""
         with tempfile.TemporaryDirectory() as temp_dir:
-            cache = AlignmentCache(cache_dir=temp_dir)
+            cache = make_cache(temp_dir)
 
-            # Create corrupted cache file
+            # Create corrupted cache entry
             cache_key = cache._get_cache_key("test", "en", "eu")
-            cache_path = cache._get_cache_path(cache_key)
-            cache_path.write_text("invalid json content")
+            with sqlite3.connect(Path(temp_dir) / "alignments.db") as db:
+                db.execute(
+                    "INSERT INTO alignments (key, data, size, created_at, accessed_at) VALUES (?, ?, 0, 0, 0)",
+                    (cache_key, "invalid json content"),
+                )
 
-            # Should return None for corrupted file
+            # Should return None for corrupted entry
             result = cache.get("test", "en", "eu")
             assert result is None
+
+
+class TestLegacyMigration:
+    """Test importing the old one-file-per-entry cache directory."""
+
+    def test_imports_json_files_and_renames_directory(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            legacy = Path(temp_dir) / "legacy"
+            legacy.mkdir()
+            key = hashlib.sha256("Hello:en:eu".encode()).hexdigest()
+            (legacy / f"{key}.json").write_text(sample_data().model_dump_json(indent=2), encoding="utf-8")
+            (legacy / "broken.json").write_text("not json", encoding="utf-8")
+
+            cache = make_cache(temp_dir)
+
+            assert cache.get("Hello", "en", "eu").sentences[0].target.text == "Kaixo"
+            assert len(rows(temp_dir)) == 1
+            assert not legacy.exists()
+            assert (Path(temp_dir) / "legacy.migrated" / f"{key}.json").exists()
+
+    def test_migration_can_be_skipped(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            legacy = Path(temp_dir) / "legacy"
+            legacy.mkdir()
+            (legacy / "entry.json").write_text(sample_data().model_dump_json(), encoding="utf-8")
+
+            make_cache(temp_dir, migrate_legacy=False)
+
+            assert rows(temp_dir) == []
+            assert (legacy / "entry.json").exists()
+
+    def test_default_database_sits_beside_legacy_directory(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            legacy = Path(temp_dir) / "volume" / "alignments"
+            legacy.mkdir(parents=True)
+            key = hashlib.sha256("Hello:en:eu".encode()).hexdigest()
+            (legacy / f"{key}.json").write_text(sample_data().model_dump_json(), encoding="utf-8")
+
+            with patch.dict(os.environ, {"ALIGNMENT_CACHE_DIR": str(legacy)}):
+                os.environ.pop("ALIGNMENT_CACHE_DB", None)
+                cache = AlignmentCache()
+
+            assert cache.db_path == Path(temp_dir) / "volume" / "alignments.db"
+            assert cache.get("Hello", "en", "eu") is not None
+
+    def test_existing_entries_win(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = make_cache(temp_dir)
+            cache.set("Hello", "en", "eu", sample_data("Hello", "Aupa"))
+
+            legacy = Path(temp_dir) / "legacy"
+            legacy.mkdir()
+            key = cache._get_cache_key("Hello", "en", "eu")
+            (legacy / f"{key}.json").write_text(sample_data("Hello", "Kaixo").model_dump_json(), encoding="utf-8")
+
+            assert cache.migrate_directory(legacy) == 0
+            assert cache.get("Hello", "en", "eu").sentences[0].target.text == "Aupa"
+
+
+class TestEviction:
+    """Test size- and age-bounded eviction."""
+
+    def _cache(self, temp_dir, **bounds):
+        # Without the memory tier, so rows aged directly in the database take effect
+        return AlignmentCache(
+            db_path=str(Path(temp_dir) / "alignments.db"),
+            legacy_dir=str(Path(temp_dir) / "legacy"),
+            memory_entries=0,
+            **bounds,
+        )
+
+    def _age(self, temp_dir, text, created_at=None, accessed_at=None, hits=None):
+        key = hashlib.sha256(f"{normalization_tag()}:{text}:en:eu".encode()).hexdigest()
+        with sqlite3.connect(Path(temp_dir) / "alignments.db") as db:
+            if created_at is not None:
+                db.execute("UPDATE alignments SET created_at=? WHERE key=?", (created_at, key))
+            if accessed_at is not None:
+                db.execute("UPDATE alignments SET accessed_at=? WHERE key=?", (accessed_at, key))
+            if hits is not None:
+                db.execute("UPDATE alignments SET hits=? WHERE key=?", (hits, key))
+
+    def test_no_bounds_keeps_everything(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir)
+            cache.set("a", "en", "eu", sample_data("a"))
+
+            assert cache.evict() == {"expired": 0, "evicted": 0, "bytes_reclaimed": 0}
+            assert len(rows(temp_dir)) == 1
+
+    def test_lru_evicts_least_recently_read(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir, max_entries=2)
+            for text in ("a", "b", "c"):
+                cache.set(text, "en", "eu", sample_data(text))
+            self._age(temp_dir, "a", accessed_at=300)
+            self._age(temp_dir, "b", accessed_at=100)
+            self._age(temp_dir, "c", accessed_at=200)
+
+            result = cache.evict()
+
+            assert result["evicted"] == 1
+            assert result["bytes_reclaimed"] > 0
+            assert cache.get("b", "en", "eu") is None
+            assert cache.get("a", "en", "eu") is not None
+
+    def test_lfu_evicts_least_often_read(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir, max_entries=2, policy="lfu")
+            for text in ("a", "b", "c"):
+                cache.set(text, "en", "eu", sample_data(text))
+            self._age(temp_dir, "a", hits=1, accessed_at=300)
+            self._age(temp_dir, "b", hits=9, accessed_at=100)
+            self._age(temp_dir, "c", hits=5, accessed_at=200)
+
+            cache.evict()
+
+            assert cache.get("a", "en", "eu") is None
+            assert cache.get("b", "en", "eu") is not None
+
+    def test_max_bytes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir)
+            for text in ("a", "b", "c", "d"):
+                cache.set(text, "en", "eu", sample_data(text))
+            entry_size = rows(temp_dir, "SELECT MAX(size) FROM alignments")[0][0]
+            cache.max_bytes = entry_size * 2
+
+            result = cache.evict()
+
+            assert result["evicted"] == 2
+            assert rows(temp_dir, "SELECT SUM(size) FROM alignments")[0][0] <= cache.max_bytes
+
+    def test_ttl_expires_entries(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir, ttl_seconds=3600)
+            cache.set("old", "en", "eu", sample_data("old"))
+            cache.set("new", "en", "eu", sample_data("new"))
+            self._age(temp_dir, "old", created_at=time.time() - 7200)
+
+            # Expired entries are misses even before eviction runs
+            assert cache.get("old", "en", "eu") is None
+
+            result = cache.evict()
+
+            assert result["expired"] == 1
+            assert len(rows(temp_dir)) == 1
+            assert cache.get("new", "en", "eu") is not None
+
+    def test_stats_accumulate_evictions(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir, max_entries=1)
+            cache.set("a", "en", "eu", sample_data("a"))
+            cache.set("b", "en", "eu", sample_data("b"))
+
+            reclaimed = cache.evict()["bytes_reclaimed"]
+            stats = cache.stats()
+
+            assert stats["entries"] == 1
+            assert stats["eviction"]["runs"] == 1
+            assert stats["eviction"]["evicted"] == 1
+            assert stats["eviction"]["bytes_reclaimed"] == reclaimed
+
+    def test_rejects_unknown_policy(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with pytest.raises(ValueError):
+                self._cache(temp_dir, policy="random")
+
+
+class TestMemoryTier:
+    """Test the in-process LRU in front of the database."""
+
+    def _cache(self, temp_dir, memory_entries=2):
+        return AlignmentCache(
+            db_path=str(Path(temp_dir) / "alignments.db"),
+            legacy_dir=str(Path(temp_dir) / "legacy"),
+            memory_entries=memory_entries,
+        )
+
+    def test_repeated_hits_are_served_from_memory(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir)
+            cache.set("a", "en", "eu", sample_data("a"))
+
+            first = cache.get("a", "en", "eu")
+            with patch.object(cache, "_read_disk") as mock_read_disk:
+                second = cache.get("a", "en", "eu")
+
+            mock_read_disk.assert_not_called()
+            assert second is first
+            assert cache.stats()["tiers"]["memory"]["hits"] == 2
+
+    def test_read_through_from_disk(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self._cache(temp_dir).set("a", "en", "eu", sample_data("a"))
+            cache = self._cache(temp_dir)
+
+            assert cache.get("a", "en", "eu") is not None
+            assert cache.get("a", "en", "eu") is not None
+
+            tiers = cache.stats()["tiers"]
+            assert tiers["memory"] == {"hits": 1, "misses": 1, "entries": 1, "max_entries": 2}
+            assert tiers["disk"] == {"hits": 1, "misses": 0}
+
+    def test_misses_are_counted_per_tier(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir)
+
+            assert cache.get_many([("a", "en", "eu"), ("b", "en", "eu")]) == [None, None]
+
+            tiers = cache.stats()["tiers"]
+            assert tiers["memory"]["misses"] == 2
+            assert tiers["disk"] == {"hits": 0, "misses": 2}
+
+    def test_memory_is_bounded_lru(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir, memory_entries=2)
+            for text in ("a", "b", "c"):
+                cache.set(text, "en", "eu", sample_data(text))
+
+            assert cache.stats()["tiers"]["memory"]["entries"] == 2
+            cache.get("a", "en", "eu")
+            assert cache.stats()["tiers"]["disk"]["hits"] == 1
+
+    def test_memory_reads_count_toward_disk_recency(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir)
+            cache.set("a", "en", "eu", sample_data("a"))
+            cache.get("a", "en", "eu")
+            cache.get("a", "en", "eu")
+
+            cache.evict()
+
+            [(_, _, _, hits)] = rows(temp_dir)
+            assert hits == 2
+
+    def test_clear_empties_both_tiers(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir)
+            cache.set("a", "en", "eu", sample_data("a"))
+
+            cache.clear()
+
+            assert cache.get("a", "en", "eu") is None
+            assert cache.stats()["tiers"]["memory"]["entries"] == 0
+
+
+class TestCachedResponses:
+    """Test ready-to-send response bodies."""
+
+    def _cache(self, temp_dir, **options):
+        return AlignmentCache(
+            db_path=str(Path(temp_dir) / "alignments.db"), legacy_dir=str(Path(temp_dir) / "legacy"), **options
+        )
+
+    def test_body_is_first_sentence_pair(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir, memory_entries=0)
+            cache.set("Hello", "en", "eu", sample_data())
+
+            cached = cache.get_response("Hello", "en", "eu")
+
+            assert cached.gzipped
+            assert json.loads(cached.json_bytes()) == sample_data().sentences[0].model_dump(mode="json")
+
+    def test_uncompressed_bodies(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir, gzip_responses=False)
+            cache.set("Hello", "en", "eu", sample_data())
+
+            cached = cache.get_response("Hello", "en", "eu")
+
+            assert not cached.gzipped
+            assert cached.body == cached.json_bytes()
+
+    def test_etag_depends_on_content(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir)
+            cache.set("Hello", "en", "eu", sample_data("Hello", "Kaixo"))
+            cache.set("Bye", "en", "eu", sample_data("Bye", "Agur"))
+
+            assert cache.get_response("Hello", "en", "eu").etag != cache.get_response("Bye", "en", "eu").etag
+
+    def test_miss_and_empty_entries(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir)
+            cache.set("empty", "en", "eu", AlignmentData(sentences=[]))
+
+            assert cache.get_response("missing", "en", "eu") is None
+            assert cache.get_response("empty", "en", "eu") is None
+
+    def test_builds_body_for_entries_stored_without_one(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            legacy = Path(temp_dir) / "legacy"
+            legacy.mkdir()
+            key = hashlib.sha256("Hello:en:eu".encode()).hexdigest()
+            (legacy / f"{key}.json").write_text(sample_data().model_dump_json(), encoding="utf-8")
+            cache = self._cache(temp_dir, memory_entries=0)
+
+            cached = cache.get_response("Hello", "en", "eu")
+
+            assert json.loads(cached.json_bytes())["id"] == "test-001"
+            [(body,)] = rows(temp_dir, "SELECT body FROM alignments")
+            assert body == cached.body
+
+    def test_adds_columns_to_older_databases(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with sqlite3.connect(Path(temp_dir) / "alignments.db") as db:
+                db.execute(
+                    "CREATE TABLE alignments (key TEXT PRIMARY KEY, data TEXT NOT NULL, size INTEGER NOT NULL, "
+                    "created_at REAL NOT NULL, accessed_at REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+                )
+
+            cache = self._cache(temp_dir)
+            cache.set("Hello", "en", "eu", sample_data())
+
+            assert cache.get_response("Hello", "en", "eu") is not None
+
+
+class TestEncodedEntries:
+    """Test that entries are stored compactly and older encodings still read."""
+
+    def _cache(self, temp_dir, codec_name):
+        return AlignmentCache(
+            db_path=str(Path(temp_dir) / "alignments.db"),
+            legacy_dir=str(Path(temp_dir) / "legacy"),
+            memory_entries=0,
+            codec_name=codec_name,
+        )
+
+    def test_entries_written_with_one_codec_read_with_another(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self._cache(temp_dir, "json").set("Hello", "en", "eu", sample_data("Hello", "Kaixo"))
+            cache = self._cache(temp_dir, "zlib")
+            cache.set("Bye", "en", "eu", sample_data("Bye", "Agur"))
+
+            assert cache.get("Hello", "en", "eu").sentences[0].target.text == "Kaixo"
+            assert cache.get("Bye", "en", "eu").sentences[0].target.text == "Agur"
+
+    def test_reads_unversioned_text_entries(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir, "zlib")
+            key = cache._get_cache_key("Hello", "en", "eu")
+            with sqlite3.connect(Path(temp_dir) / "alignments.db") as db:
+                db.execute(
+                    "INSERT INTO alignments (key, data, size, created_at, accessed_at, fingerprint) "
+                    "VALUES (?, ?, 0, ?, ?, ?)",
+                    (key, sample_data().model_dump_json(indent=2), time.time(), time.time(), cache.fingerprint),
+                )
+
+            assert cache.get("Hello", "en", "eu").sentences[0].target.text == "Kaixo"
+
+    def test_zlib_entries_are_smaller(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            plain = self._cache(Path(temp_dir), "json")
+            plain.set("Hello", "en", "eu", sample_data())
+            plain_size = len(rows(temp_dir, "SELECT data FROM alignments")[0][0])
+            plain.clear()
+
+            self._cache(temp_dir, "zlib").set("Hello", "en", "eu", sample_data())
+            zlib_size = len(rows(temp_dir, "SELECT data FROM alignments")[0][0])
+
+            assert zlib_size < plain_size
+
+    def test_rejects_unknown_codec(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with pytest.raises(ValueError):
+                self._cache(temp_dir, "brotli")
+
+
+class TestKeyNormalization:
+    """Test that trivially different texts share an entry, and re-keying older entries."""
+
+    def test_variants_share_an_entry(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = make_cache(temp_dir)
+            cache.set("Kaixo, zer moduz?", "eu", "en", sample_data())
+
+            assert cache.get(" Kaixo,  zer moduz? ", "eu", "en") is not None
+            assert cache.get("Kaixo, zer moduz", "eu", "en") is None
+
+    def test_punctuation_folding_is_optional(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = AlignmentCache(
+                db_path=str(Path(temp_dir) / "alignments.db"),
+                legacy_dir=str(Path(temp_dir) / "legacy"),
+                fold_punctuation=True,
+            )
+
+            assert cache.key_for("Kaixo!", "eu", "en") == cache.key_for("Kaixo", "eu", "en")
+            assert cache.key_for("Kaixo", "eu", "en") != make_cache(temp_dir).key_for("Kaixo", "eu", "en")
+
+    def test_normalization_can_be_disabled(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = AlignmentCache(
+                db_path=str(Path(temp_dir) / "alignments.db"),
+                legacy_dir=str(Path(temp_dir) / "legacy"),
+                normalize_keys=False,
+            )
+
+            assert cache.key_for("Hello", "en", "eu") == hashlib.sha256(b"Hello:en:eu").hexdigest()
+            assert cache.key_for("Hello ", "en", "eu") != cache.key_for("Hello", "en", "eu")
+
+    def test_rekey_collapses_entries_stored_under_raw_keys(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            raw = AlignmentCache(
+                db_path=str(Path(temp_dir) / "alignments.db"),
+                legacy_dir=str(Path(temp_dir) / "legacy"),
+                normalize_keys=False,
+            )
+            raw.set("Hello", "en", "eu", sample_data("Hello", "Kaixo"))
+            raw.set(" Hello ", "en", "eu", sample_data(" Hello ", "Aupa"))
+            raw.set("Bye", "en", "eu", sample_data("Bye", "Agur"))
+            raw.set("empty", "en", "eu", AlignmentData(sentences=[]))
+            cache = make_cache(temp_dir)
+
+            report = cache.rekey()
+
+            assert report == {"entries": 4, "rekeyed": 3, "collapsed": 1, "groups": 1, "unkeyable": 1}
+            assert cache.get("Bye", "en", "eu") is None
+            assert len(rows(temp_dir)) == 4
+
+            cache.rekey(apply=True)
+
+            assert cache.get("Bye", "en", "eu").sentences[0].target.text == "Agur"
+            assert cache.get("Hello", "en", "eu") is not None
+            assert len(rows(temp_dir)) == 3
+            assert cache.rekey() == {"entries": 3, "rekeyed": 0, "collapsed": 0, "groups": 0, "unkeyable": 1}
+
+
+class TestFingerprints:
+    """Test that entries from another prompt, model or scaffold version are invalidated lazily."""
+
+    def _cache(self, temp_dir, fingerprint, **kwargs):
+        return AlignmentCache(
+            db_path=str(Path(temp_dir) / "alignments.db"),
+            legacy_dir=str(Path(temp_dir) / "legacy"),
+            memory_entries=0,
+            fingerprint=fingerprint,
+            **kwargs,
+        )
+
+    def test_entries_from_another_fingerprint_are_misses(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self._cache(temp_dir, "old").set("Hello", "en", "eu", sample_data())
+            cache = self._cache(temp_dir, "new")
+
+            assert cache.get("Hello", "en", "eu") is None
+            assert cache.get_response("Hello", "en", "eu") is None
+            assert cache.stats()["stale_entries"] == 1
+
+    def test_stale_entries_are_replaced_on_write(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self._cache(temp_dir, "old").set("Hello", "en", "eu", sample_data("Hello", "Aupa"))
+            self._cache(temp_dir, "old").set("Bye", "en", "eu", sample_data("Bye", "Agur"))
+            cache = self._cache(temp_dir, "new")
+
+            cache.set("Hello", "en", "eu", sample_data("Hello", "Kaixo"))
+
+            assert cache.get("Hello", "en", "eu").sentences[0].target.text == "Kaixo"
+            assert self._cache(temp_dir, "old").get("Bye", "en", "eu") is not None
+            assert cache.stats()["stale_entries"] == 1
+
+    def test_entries_without_a_fingerprint_are_adopted(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir, "old")
+            cache.set("Hello", "en", "eu", sample_data())
+            with sqlite3.connect(Path(temp_dir) / "alignments.db") as db:
+                db.execute("UPDATE alignments SET fingerprint = NULL")
+
+            assert self._cache(temp_dir, "new").get("Hello", "en", "eu") is not None
+
+    def test_eviction_removes_stale_entries_first(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self._cache(temp_dir, "old").set("Hello", "en", "eu", sample_data())
+            cache = self._cache(temp_dir, "new", max_entries=1)
+            cache.set("Bye", "en", "eu", sample_data("Bye", "Agur"))
+            self._cache(temp_dir, "old").get("Hello", "en", "eu")
+
+            assert cache.evict()["evicted"] == 1
+            assert cache.get("Bye", "en", "eu") is not None
+            assert cache.stats()["stale_entries"] == 0
+
+
+class TestStaleWhileRevalidate:
+    """Test serving entries past the soft TTL or from another fingerprint, flagged as stale."""
+
+    def _cache(self, temp_dir, fingerprint="current", **kwargs):
+        return AlignmentCache(
+            db_path=str(Path(temp_dir) / "alignments.db"),
+            legacy_dir=str(Path(temp_dir) / "legacy"),
+            fingerprint=fingerprint,
+            stale_while_revalidate=True,
+            **kwargs,
+        )
+
+    def test_fresh_entries_are_not_stale(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir, soft_ttl_seconds=60)
+            cache.set("Hello", "en", "eu", sample_data())
+
+            assert cache.get_response("Hello", "en", "eu").stale is False
+
+    def test_entries_from_another_fingerprint_are_stale(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self._cache(temp_dir, fingerprint="old").set("Hello", "en", "eu", sample_data())
+            cache = self._cache(temp_dir)
+
+            cached = cache.get_response("Hello", "en", "eu")
+
+            assert cached.stale is True
+            assert json.loads(cached.json_bytes())["id"] == "test-001"
+            assert cache.get("Hello", "en", "eu") is None
+            assert cache.stats()["stale_hits"] == 1
+
+    def test_entries_past_soft_ttl_are_stale(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir, soft_ttl_seconds=60)
+            cache.set("Hello", "en", "eu", sample_data())
+            assert cache.get_response("Hello", "en", "eu").stale is False
+
+            with patch("itzuli_nlp.alignment_server.cache.time.time", return_value=time.time() + 120):
+                assert cache.get_response("Hello", "en", "eu").stale is True
+
+    def test_entries_past_soft_ttl_are_misses_for_get_many(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir, soft_ttl_seconds=60)
+            cache.set("Hello", "en", "eu", sample_data())
+            assert cache.get("Hello", "en", "eu") is not None
+
+            with patch("itzuli_nlp.alignment_server.cache.time.time", return_value=time.time() + 120):
+                assert cache.get_many([("Hello", "en", "eu")]) == [None]
+
+    def test_entries_past_hard_ttl_are_misses(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = self._cache(temp_dir, soft_ttl_seconds=60, ttl_seconds=600)
+            cache.set("Hello", "en", "eu", sample_data())
+
+            with patch("itzuli_nlp.alignment_server.cache.time.time", return_value=time.time() + 1200):
+                assert cache.get_response("Hello", "en", "eu") is None
+
+    def test_replacing_a_stale_entry_makes_it_fresh(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self._cache(temp_dir, fingerprint="old").set("Hello", "en", "eu", sample_data("Hello", "Aupa"))
+            cache = self._cache(temp_dir)
+            assert cache.get_response("Hello", "en", "eu").stale is True
+
+            cache.set("Hello", "en", "eu", sample_data("Hello", "Kaixo"))
+            cached = cache.get_response("Hello", "en", "eu")
+
+            assert cached.stale is False
+            assert json.loads(cached.json_bytes())["target"]["text"] == "Kaixo"
+
+    def test_disabled_by_default(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self._cache(temp_dir, fingerprint="old").set("Hello", "en", "eu", sample_data())
+            cache = AlignmentCache(
+                db_path=str(Path(temp_dir) / "alignments.db"),
+                legacy_dir=str(Path(temp_dir) / "legacy"),
+                fingerprint="current",
+            )
+
+            assert cache.get_response("Hello", "en", "eu") is None
+
+
+class TestNegativeCache:
+    """Test the short-lived record of failed requests."""
+
+    def test_remembers_failures_and_degraded_results(self):
+        negative = NegativeCache(ttl_seconds=30)
+        error = RuntimeError("Claude down")
+        negative.put("a", error)
+        negative.put("b", sample_data())
+
+        recalled = negative.get("a")
+        assert type(recalled) is RuntimeError and str(recalled) == "Claude down"
+        assert negative.get("b").sentences[0].id == "test-001"
+        assert negative.get("c") is None
+        assert negative.stats() == {"ttl_seconds": 30, "entries": 2, "stored": 2, "hits": 2}
+
+    def test_each_hit_gets_a_new_exception(self):
+        negative = NegativeCache(ttl_seconds=30)
+        try:
+            raise ValueError("bad text")
+        except ValueError as e:
+            negative.put("a", e)
+
+        first, second = negative.get("a"), negative.get("a")
+
+        assert first is not second
+        assert type(first) is ValueError and str(first) == "bad text"
+        assert first.__traceback__ is None
+
+    def test_entries_expire(self):
+        negative = NegativeCache(ttl_seconds=30)
+        negative.put("a", RuntimeError("down"))
+
+        with patch("itzuli_nlp.alignment_server.cache.time.monotonic", return_value=time.monotonic() + 31):
+            assert negative.get("a") is None
+        assert negative.stats()["entries"] == 0
+
+    def test_bounded(self):
+        negative = NegativeCache(ttl_seconds=30, max_entries=2)
+        for key in "abc":
+            negative.put(key, RuntimeError(key))
+
+        assert negative.get("a") is None
+        assert negative.get("c") is not None
+
+    def test_zero_ttl_disables(self):
+        negative = NegativeCache(ttl_seconds=0)
+        negative.put("a", RuntimeError("down"))
+
+        assert negative.get("a") is None
+
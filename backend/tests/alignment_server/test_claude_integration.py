@@ -1,11 +1,20 @@
 """Tests for Claude API integration."""
 
+import asyncio
 import os
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 
-from itzuli_nlp.alignment_server.claude_client import ClaudeClient
+from itzuli_nlp.alignment_server.claude_client import (
+    CLAUDE_CONNECT_TIMEOUT_SECONDS,
+    CLAUDE_MAX_RETRIES,
+    CLAUDE_MODEL,
+    AsyncClaudeClient,
+    ClaudeClient,
+    ClaudeUsage,
+    LayerStreamParser,
+)
 from itzuli_nlp.alignment_server.types import Alignment, AlignmentLayers
 
 
@@ -162,4 +171,231 @@ class TestClaudeClient:
         assert "en" in user_message
         assert "eu" in user_message
         assert "s0" in user_message
-        assert "t0" in user_message
\ No newline at end of file
+        assert "t0" in user_message
+
+STREAMED_RESPONSE = """Here you go:
+{
+  "lexical": [
+    {"source": ["s0"], "target": ["t0"], "label": "hello \\"quoted\\" → kaixo [x]"}
+  ],
+  "grammatical_relations": [],
+  "features": [
+    {"source": ["s1"], "target": ["t1"], "label": "definiteness: 'the' → '-a' {fused}"}
+  ]
+}"""
+
+
+class TestLayerStreamParser:
+    """Test incremental layer extraction from streamed responses."""
+
+    def feed_in_chunks(self, parser, text, size):
+        layers = []
+        for start in range(0, len(text), size):
+            layers.extend(parser.feed(text[start : start + size]))
+        return layers
+
+    def test_emits_each_layer_once_complete(self):
+        parser = LayerStreamParser()
+
+        layers = self.feed_in_chunks(parser, STREAMED_RESPONSE, 7)
+
+        assert [name for name, _ in layers] == ["lexical", "grammatical_relations", "features"]
+        assert layers[0][1][0].label == 'hello "quoted" → kaixo [x]'
+        assert layers[1][1] == []
+        assert layers[2][1][0].target == ["t1"]
+
+    def test_emits_layer_before_response_finishes(self):
+        parser = LayerStreamParser()
+        cutoff = STREAMED_RESPONSE.index('"grammatical_relations"')
+
+        layers = parser.feed(STREAMED_RESPONSE[:cutoff])
+
+        assert [name for name, _ in layers] == ["lexical"]
+
+    def test_single_character_chunks(self):
+        parser = LayerStreamParser()
+
+        layers = self.feed_in_chunks(parser, STREAMED_RESPONSE, 1)
+
+        assert len(layers) == 3
+
+    def test_ignores_unknown_keys(self):
+        parser = LayerStreamParser()
+
+        layers = parser.feed('{"notes": [1, 2], "lexical": []}')
+
+        assert layers == [("lexical", [])]
+
+    def test_malformed_layer_yields_empty_alignments(self):
+        parser = LayerStreamParser()
+
+        layers = parser.feed('{"lexical": [{"source": ["s0"]}]}')
+
+        assert layers == [("lexical", [])]
+
+    def test_finished_once_object_closes(self):
+        parser = LayerStreamParser()
+
+        parser.feed(STREAMED_RESPONSE[:-1])
+        assert not parser.finished
+        parser.feed(STREAMED_RESPONSE[-1:])
+        assert parser.finished
+
+
+class TestAsyncClaudeClient:
+    def test_shares_configured_connection_pool_and_retries(self):
+        client = AsyncClaudeClient(api_key="test-key")
+
+        assert client.client.max_retries == CLAUDE_MAX_RETRIES
+        assert client.client.timeout.connect == CLAUDE_CONNECT_TIMEOUT_SECONDS
+
+    @pytest.mark.anyio
+    async def test_generate_alignments_awaits_messages_create(self):
+        mock_content = Mock(text='{"lexical": [{"source": ["s0"], "target": ["t0"], "label": "greeting"}]}')
+        client = AsyncClaudeClient(api_key="test-key")
+        client.client = Mock()
+        client.client.messages.create = AsyncMock(return_value=Mock(content=[mock_content]))
+
+        result = await client.generate_alignments([], [], "en", "eu", "Hello", "Kaixo")
+
+        assert result.lexical[0].label == "greeting"
+        assert client.client.messages.create.await_args.kwargs["model"] == CLAUDE_MODEL
+
+    @pytest.mark.anyio
+    async def test_close_when_idle_waits_for_calls_in_flight(self):
+        release = asyncio.Event()
+
+        async def create(**kwargs):
+            await release.wait()
+            return Mock(content=[Mock(text="{}")])
+
+        client = AsyncClaudeClient(api_key="test-key")
+        client.client = Mock(close=AsyncMock())
+        client.client.messages.create = create
+
+        call = asyncio.ensure_future(client.generate_alignments([], [], "en", "eu", "Hello", "Kaixo"))
+        await asyncio.sleep(0)
+        closing = asyncio.ensure_future(client.aclose_when_idle())
+        await asyncio.sleep(0)
+        client.client.close.assert_not_awaited()
+
+        release.set()
+        await asyncio.gather(call, closing)
+        client.client.close.assert_awaited_once()
+
+    @pytest.mark.anyio
+    async def test_api_error_returns_empty_layers(self):
+        client = AsyncClaudeClient(api_key="test-key")
+        client.client = Mock()
+        client.client.messages.create = AsyncMock(side_effect=Exception("API Error"))
+
+        assert await client.generate_alignments([], [], "en", "eu", "Hello", "Kaixo") == AlignmentLayers()
+
+    @pytest.mark.anyio
+    async def test_streams_layers(self):
+        async def text_stream():
+            yield STREAMED_RESPONSE[:50]
+            yield STREAMED_RESPONSE[50:]
+
+        final_message = Mock(usage=Mock(input_tokens=40, output_tokens=200, cache_read_input_tokens=1500))
+        stream = MagicMock()
+        stream.__aenter__.return_value = Mock(
+            text_stream=text_stream(), get_final_message=AsyncMock(return_value=final_message)
+        )
+        client = AsyncClaudeClient(api_key="test-key")
+        client.client = Mock()
+        client.client.messages.stream.return_value = stream
+
+        usage = ClaudeUsage()
+        with patch("itzuli_nlp.alignment_server.claude_client.claude_usage", usage):
+            layers = [layer async for layer in client.stream_alignments([], [], "en", "eu", "Hello", "Kaixo")]
+
+        assert [name for name, _ in layers] == ["lexical", "grammatical_relations", "features"]
+        assert usage.stats()["cache_read_input_tokens"] == 1500
+        assert usage.streams == 1
+
+    @pytest.mark.anyio
+    async def test_stream_error_is_raised_after_completed_layers(self):
+        async def text_stream():
+            yield STREAMED_RESPONSE[: STREAMED_RESPONSE.index('"grammatical_relations"')]
+            raise RuntimeError("connection reset")
+
+        stream = MagicMock()
+        stream.__aenter__.return_value = Mock(text_stream=text_stream())
+        client = AsyncClaudeClient(api_key="test-key")
+        client.client = Mock()
+        client.client.messages.stream.return_value = stream
+
+        layers = []
+        with (
+            patch("itzuli_nlp.alignment_server.claude_client.claude_usage", ClaudeUsage()),
+            pytest.raises(RuntimeError, match="connection reset"),
+        ):
+            async for layer in client.stream_alignments([], [], "en", "eu", "Hello", "Kaixo"):
+                layers.append(layer)
+
+        assert [name for name, _ in layers] == ["lexical"]
+
+    @pytest.mark.anyio
+    async def test_truncated_response_raises(self):
+        async def text_stream():
+            yield STREAMED_RESPONSE[:-1]
+
+        stream = MagicMock()
+        stream.__aenter__.return_value = Mock(
+            text_stream=text_stream(), get_final_message=AsyncMock(return_value=Mock(usage=None))
+        )
+        client = AsyncClaudeClient(api_key="test-key")
+        client.client = Mock()
+        client.client.messages.stream.return_value = stream
+
+        with (
+            patch("itzuli_nlp.alignment_server.claude_client.claude_usage", ClaudeUsage()),
+            pytest.raises(ValueError, match="before its alignment JSON was complete"),
+        ):
+            [layer async for layer in client.stream_alignments([], [], "en", "eu", "Hello", "Kaixo")]
+
+
+class TestPromptCaching:
+    def test_system_prompt_is_a_cache_breakpoint(self):
+        params = ClaudeClient._request_params([], [], "en", "eu", "Hello", "Kaixo")
+
+        assert params["system"] == [
+            {"type": "text", "text": ClaudeClient._build_system_message(), "cache_control": {"type": "ephemeral"}}
+        ]
+
+    def test_caching_can_be_disabled(self):
+        with patch("itzuli_nlp.alignment_server.claude_client.CLAUDE_PROMPT_CACHING", False):
+            params = ClaudeClient._request_params([], [], "en", "eu", "Hello", "Kaixo")
+
+        assert "cache_control" not in params["system"][0]
+
+    @patch("itzuli_nlp.alignment_server.claude_client.Anthropic")
+    def test_records_cache_writes_and_reads(self, mock_anthropic):
+        first = Mock(input_tokens=300, output_tokens=50, cache_creation_input_tokens=1500, cache_read_input_tokens=0)
+        second = Mock(input_tokens=300, output_tokens=50, cache_creation_input_tokens=0, cache_read_input_tokens=1500)
+        mock_anthropic.return_value.messages.create.side_effect = [
+            Mock(content=[], usage=first),
+            Mock(content=[], usage=second),
+        ]
+        usage = ClaudeUsage()
+
+        with patch("itzuli_nlp.alignment_server.claude_client.claude_usage", usage):
+            client = ClaudeClient(api_key="test-key")
+            client.generate_alignments([], [], "en", "eu", "Hello", "Kaixo")
+            client.generate_alignments([], [], "en", "eu", "Hello", "Kaixo")
+
+        stats = usage.stats()
+        assert stats["calls"] == 2
+        assert stats["cache_creation_input_tokens"] == 1500
+        assert stats["cache_read_input_tokens"] == 1500
+        assert stats["input_tokens"] == 600
+        assert stats["cache_read_ratio"] == round(1500 / 3600, 3)
+
+    def test_missing_usage_fields_count_as_zero(self):
+        usage = ClaudeUsage()
+
+        usage.record(Mock(spec=["input_tokens"], input_tokens=10))
+
+        assert usage.stats()["input_tokens"] == 10
+        assert usage.stats()["cache_read_input_tokens"] == 0
@@ -0,0 +1,40 @@
+"""Tests for cached entry encodings."""
+
+import pytest
+
+from itzuli_nlp.alignment_server import codec
+
+PAYLOAD = b'{"sentences":[{"id":"test-001","layers":{"lexical":[],"grammatical_relations":[],"features":[]}}]}'
+
+
+class TestCodec:
+    @pytest.mark.parametrize("name", ["json", "zlib"])
+    def test_round_trip(self, name):
+        assert codec.decode(codec.encode(PAYLOAD, name)) == PAYLOAD
+
+    def test_zstd_round_trip(self):
+        pytest.importorskip("zstandard")
+
+        assert codec.decode(codec.encode(PAYLOAD, "zstd")) == PAYLOAD
+
+    def test_header_records_version_and_codec(self):
+        encoded = codec.encode(PAYLOAD, "zlib")
+
+        assert encoded[:3] == b"\xa1" + bytes([codec.FORMAT_VERSION, 1])
+
+    def test_zlib_is_smaller_than_json(self):
+        payload = PAYLOAD * 50
+
+        assert len(codec.encode(payload, "zlib")) < len(codec.encode(payload, "json")) / 5
+
+    def test_legacy_plain_json_still_decodes(self):
+        assert codec.decode(PAYLOAD.decode()) == PAYLOAD
+        assert codec.decode(PAYLOAD) == PAYLOAD
+
+    def test_rejects_unknown_version(self):
+        with pytest.raises(ValueError, match="format version"):
+            codec.decode(b"\xa1\x09\x00{}")
+
+    def test_rejects_unknown_codec(self):
+        with pytest.raises(ValueError):
+            codec.check_codec("brotli")
@@ -0,0 +1,115 @@
+"""Tests for bounded executor stages."""
+
+import asyncio
+import threading
+
+import pytest
+
+from itzuli_nlp.alignment_server.executor import Stage, StageSaturatedError
+
+
+class TestStageRun:
+    @pytest.mark.anyio
+    async def test_returns_result_of_blocking_call(self):
+        stage = Stage("test", max_workers=1)
+
+        result = await stage.run(lambda a, b=0: a + b, 1, b=2)
+
+        assert result == 3
+
+    @pytest.mark.anyio
+    async def test_runs_off_the_event_loop_thread(self):
+        stage = Stage("test", max_workers=1)
+
+        thread_name = await stage.run(lambda: threading.current_thread().name)
+
+        assert thread_name.startswith("test-stage")
+
+    @pytest.mark.anyio
+    async def test_propagates_exceptions(self):
+        stage = Stage("test", max_workers=1)
+
+        def boom():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            await stage.run(boom)
+
+        assert stage.stats()["failed"] == 1
+
+
+class TestStageLimits:
+    @pytest.mark.anyio
+    async def test_limits_concurrency_and_reports_queue_depth(self):
+        stage = Stage("test", max_workers=1)
+        release = threading.Event()
+        started = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        first = asyncio.ensure_future(stage.run(block))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        second = asyncio.ensure_future(stage.run(block))
+        await asyncio.sleep(0.01)
+
+        stats = stage.stats()
+        assert stats["active"] == 1
+        assert stats["queued"] == 1
+
+        release.set()
+        await asyncio.gather(first, second)
+
+        stats = stage.stats()
+        assert stats["active"] == 0
+        assert stats["queued"] == 0
+        assert stats["completed"] == 2
+
+    @pytest.mark.anyio
+    async def test_rejects_when_queue_is_full(self):
+        stage = Stage("test", max_workers=1, max_queue=1)
+        release = threading.Event()
+        started = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        first = asyncio.ensure_future(stage.run(block))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        second = asyncio.ensure_future(stage.run(block))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(StageSaturatedError):
+            await stage.run(block)
+
+        release.set()
+        await asyncio.gather(first, second)
+        assert stage.stats()["rejected"] == 1
+
+    @pytest.mark.anyio
+    async def test_cancelled_queued_calls_free_their_queue_slots(self):
+        stage = Stage("test", max_workers=1, max_queue=2)
+        release = threading.Event()
+        started = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        first = asyncio.ensure_future(stage.run(block))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        queued = [asyncio.ensure_future(stage.run(block)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+
+        for task in queued:
+            task.cancel()
+        await asyncio.gather(*queued, return_exceptions=True)
+
+        assert stage.stats()["queued"] == 0
+        release.set()
+        await first
+        assert await stage.run(lambda: "accepted") == "accepted"
+        assert stage.stats()["rejected"] == 0
+
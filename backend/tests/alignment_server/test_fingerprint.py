@@ -0,0 +1,48 @@
+"""Tests for the alignment fingerprint."""
+
+from unittest.mock import patch
+
+import pytest
+
+from itzuli_nlp.alignment_server import fingerprint
+from itzuli_nlp.alignment_server.claude_client import ClaudeClient
+
+
+@pytest.fixture(autouse=True)
+def fresh_fingerprint():
+    fingerprint.alignment_fingerprint.cache_clear()
+    yield
+    fingerprint.alignment_fingerprint.cache_clear()
+
+
+class TestAlignmentFingerprint:
+    def test_is_stable(self):
+        assert fingerprint.alignment_fingerprint() == fingerprint.alignment_fingerprint()
+        assert len(fingerprint.alignment_fingerprint()) == 16
+
+    def test_components(self):
+        components = fingerprint.fingerprint_components()
+
+        assert set(components) == {"prompt", "claude_model", "stanza", "stanza_resources", "scaffold"}
+
+    @pytest.mark.parametrize(
+        "target, value",
+        [
+            ("CLAUDE_MODEL", "claude-other"),
+            ("SCAFFOLD_VERSION", 999),
+            ("DEFAULT_RESOURCES_VERSION", "0.0.1"),
+        ],
+    )
+    def test_changes_with_versions(self, target, value):
+        before = fingerprint.alignment_fingerprint()
+        fingerprint.alignment_fingerprint.cache_clear()
+
+        with patch.object(fingerprint, target, value):
+            assert fingerprint.alignment_fingerprint() != before
+
+    def test_changes_with_prompt(self):
+        before = fingerprint.alignment_fingerprint()
+        fingerprint.alignment_fingerprint.cache_clear()
+
+        with patch.object(ClaudeClient, "_build_system_message", staticmethod(lambda: "A different prompt")):
+            assert fingerprint.alignment_fingerprint() != before
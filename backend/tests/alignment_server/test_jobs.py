@@ -0,0 +1,111 @@
+"""Tests for the SQLite-backed job table."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+import itzuli_nlp.alignment_server.jobs as jobs_module
+from itzuli_nlp.alignment_server.jobs import (
+    claim_interrupted_jobs,
+    create_job,
+    get_job,
+    prune_jobs,
+    update_job,
+)
+
+REQUEST = {"text": "Kaixo", "source_lang": "eu", "target_lang": "en", "sentence_id": "default"}
+
+
+@pytest.fixture(autouse=True)
+def isolate_db(tmp_path):
+    """Redirect the module's DB_PATH to a temp file for every test."""
+    with patch.object(jobs_module, "DB_PATH", str(tmp_path / "jobs.db")):
+        yield
+
+
+class TestJobLifecycle:
+    @pytest.mark.anyio
+    async def test_new_job_is_queued(self):
+        job_id = await create_job(REQUEST)
+
+        job = await get_job(job_id)
+
+        assert job["status"] == "queued"
+        assert job["request"] == REQUEST
+        assert job["timings"] == {}
+        assert job["result"] is None
+
+    @pytest.mark.anyio
+    async def test_update_records_result_and_timings(self):
+        job_id = await create_job(REQUEST)
+
+        await update_job(job_id, "running")
+        await update_job(job_id, "completed", timings={"total_ms": 12.5}, result={"id": "default"})
+
+        job = await get_job(job_id)
+        assert job["status"] == "completed"
+        assert job["timings"] == {"total_ms": 12.5}
+        assert job["result"] == {"id": "default"}
+
+    @pytest.mark.anyio
+    async def test_unknown_job_is_none(self):
+        assert await get_job("missing") is None
+
+
+class TestInterruptedJobs:
+    @pytest.mark.anyio
+    async def test_claims_unfinished_jobs_from_previous_launch(self):
+        with patch.object(jobs_module, "BOOT_ID", "old-launch"):
+            queued = await create_job(REQUEST)
+            running = await create_job(REQUEST)
+            done = await create_job(REQUEST)
+            await update_job(running, "running")
+            await update_job(done, "completed")
+
+        with patch.object(jobs_module, "BOOT_ID", "new-launch"):
+            claimed = await claim_interrupted_jobs()
+            claimed_again = await claim_interrupted_jobs()
+
+        assert {job["id"] for job in claimed} == {queued, running}
+        assert claimed_again == []
+        assert (await get_job(running))["status"] == "queued"
+
+    @pytest.mark.anyio
+    async def test_does_not_claim_own_jobs(self):
+        await create_job(REQUEST)
+
+        assert await claim_interrupted_jobs() == []
+
+
+class TestPruneJobs:
+    @pytest.mark.anyio
+    async def test_removes_old_finished_jobs_only(self):
+        finished = await create_job(REQUEST)
+        unfinished = await create_job(REQUEST)
+        await update_job(finished, "completed")
+
+        with patch.object(jobs_module.time, "time", return_value=time.time() + 3600):
+            removed = await prune_jobs(max_age_seconds=60)
+
+        assert removed == 1
+        assert await get_job(finished) is None
+        assert await get_job(unfinished) is not None
+
+    @pytest.mark.anyio
+    async def test_replacement_worker_claims_only_its_predecessors_jobs(self):
+        with (
+            patch.object(jobs_module, "LAUNCH_ID", "launch"),
+            patch.object(jobs_module, "BOOT_ID", jobs_module.BOOT_ID),
+            patch.object(jobs_module, "_WORKER_SLOT", None),
+        ):
+            jobs_module.set_worker(0, 0)
+            crashed = await create_job(REQUEST)
+            jobs_module.set_worker(1, 0)
+            sibling = await create_job(REQUEST)
+
+            jobs_module.set_worker(0, 1)
+            claimed = await claim_interrupted_jobs()
+
+        assert [job["id"] for job in claimed] == [crashed]
+        assert (await get_job(sibling))["status"] == "queued"
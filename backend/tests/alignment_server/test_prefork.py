@@ -0,0 +1,33 @@
+"""Tests for the pre-fork launcher's worker restart policy."""
+
+from itzuli_nlp.alignment_server.prefork import RestartPolicy
+
+
+class TestRestartPolicy:
+    def test_delay_doubles_up_to_the_maximum(self):
+        policy = RestartPolicy(max_restarts=10, window=60, max_delay=3)
+
+        delays = [policy.delay(0, now=float(second)) for second in range(5)]
+
+        assert delays == [0.5, 1, 2, 3, 3]
+
+    def test_gives_up_after_too_many_restarts_in_the_window(self):
+        policy = RestartPolicy(max_restarts=2, window=60, max_delay=30)
+
+        assert policy.delay(0, now=0) is not None
+        assert policy.delay(0, now=1) is not None
+        assert policy.delay(0, now=2) is None
+
+    def test_restarts_outside_the_window_are_forgotten(self):
+        policy = RestartPolicy(max_restarts=2, window=60, max_delay=30)
+        policy.delay(0, now=0)
+        policy.delay(0, now=1)
+
+        assert policy.delay(0, now=100) == 0.5
+
+    def test_workers_are_counted_separately(self):
+        policy = RestartPolicy(max_restarts=1, window=60, max_delay=30)
+        policy.delay(0, now=0)
+
+        assert policy.delay(1, now=0) == 0.5
+        assert policy.delay(0, now=1) is None
@@ -145,3 +145,24 @@ class TestConfiguration:
         assert not os.path.exists(db_path)
         await check_and_increment("1.1.1.1")
         assert os.path.exists(db_path)
+
+
+class TestCost:
+    @pytest.mark.anyio
+    async def test_cost_draws_multiple_requests_from_quota(self):
+        allowed, remaining = await check_and_increment("4.4.4.4", cost=4)
+
+        assert allowed is True
+        assert remaining == 6
+
+    @pytest.mark.anyio
+    async def test_cost_over_remaining_quota_is_denied_without_incrementing(self):
+        with patch.object(rl_module, "DAILY_LIMIT", 5):
+            await check_and_increment("4.4.4.4", cost=3)
+            allowed, remaining = await check_and_increment("4.4.4.4", cost=3)
+            allowed_after, remaining_after = await check_and_increment("4.4.4.4", cost=2)
+
+        assert allowed is False
+        assert remaining == 2
+        assert allowed_after is True
+        assert remaining_after == 0
@@ -1,24 +1,48 @@
 """Tests for alignment server FastAPI endpoints."""
 
+import asyncio
+import json
 import os
 import subprocess
 import sys
-from unittest.mock import patch
+import threading
+from concurrent.futures import Future
+from unittest.mock import ANY, AsyncMock, Mock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
+import itzuli_nlp.alignment_server.jobs as jobs_module
+import itzuli_nlp.alignment_server.rate_limiter as rl_module
+import itzuli_nlp.alignment_server.server as server_module
+from itzuli_nlp.alignment_server.cache import AlignmentCache, NegativeCache
 from itzuli_nlp.alignment_server.server import app
 from itzuli_nlp.alignment_server.types import (
+    Alignment,
     AlignmentData,
     AlignmentLayers,
     SentencePair,
     Token,
     TokenizedSentence,
 )
+from itzuli_nlp.core.batching import StanzaBatcher
+from itzuli_nlp.core.itzuli_client import ItzuliUnavailableError
 from itzuli_nlp.core.types import AnalysisRow
 
 
+@pytest.fixture(autouse=True)
+def isolate_databases(tmp_path):
+    """Give every test a fresh rate-limit quota, job table and alignment caches."""
+    cache = AlignmentCache(db_path=str(tmp_path / "alignments.db"), legacy_dir=str(tmp_path / "legacy"))
+    with (
+        patch.object(rl_module, "DB_PATH", str(tmp_path / "rate_limits.db")),
+        patch.object(jobs_module, "DB_PATH", str(tmp_path / "jobs.db")),
+        patch.object(server_module, "cache", cache),
+        patch.object(server_module, "negative_cache", NegativeCache()),
+    ):
+        yield
+
+
 @pytest.fixture
 def client():
     return TestClient(app)
@@ -38,20 +62,28 @@ def full_env():
 
 @pytest.fixture
 def mock_analyze():
-    with patch("itzuli_nlp.alignment_server.server.analyze_both_texts") as mock:
+    with patch("itzuli_nlp.alignment_server.server._analyze_both") as mock:
         yield mock
 
 
 @pytest.fixture
 def mock_scaffold():
-    with patch("itzuli_nlp.alignment_server.server.create_enriched_alignment_data") as mock:
+    with patch("itzuli_nlp.alignment_server.server.create_enriched_alignment_data_async") as mock:
         yield mock
 
 
 @pytest.fixture
 def scaffold_setup(full_env, mock_analyze, mock_scaffold):
-    with patch("itzuli_nlp.alignment_server.server.cache.get", return_value=None) as mock_cache:
-        yield {"mock_analyze": mock_analyze, "mock_scaffold": mock_scaffold, "mock_cache": mock_cache}
+    with (
+        patch("itzuli_nlp.alignment_server.server.cache.get", return_value=None) as mock_cache,
+        patch("itzuli_nlp.alignment_server.server.cache.get_response", return_value=None) as mock_cache_response,
+    ):
+        yield {
+            "mock_analyze": mock_analyze,
+            "mock_scaffold": mock_scaffold,
+            "mock_cache": mock_cache,
+            "mock_cache_response": mock_cache_response,
+        }
 
 
 @pytest.fixture
@@ -84,9 +116,8 @@ def mock_alignment_data():
     source_sentence = TokenizedSentence(lang="eu", text="Kaixo mundua", tokens=source_tokens)
     target_sentence = TokenizedSentence(lang="en", text="Hello world", tokens=target_tokens)
 
-    sentence_pair = SentencePair(
-        id="test-001", source=source_sentence, target=target_sentence, layers=AlignmentLayers()
-    )
+    layers = AlignmentLayers(lexical=[Alignment(source=["s0"], target=["t0"], label="kaixo → hello")])
+    sentence_pair = SentencePair(id="test-001", source=source_sentence, target=target_sentence, layers=layers)
 
     return AlignmentData(sentences=[sentence_pair])
 
@@ -115,9 +146,9 @@ def setup_scaffold_mock(mock_scaffold, data=None, error=None):
         raise ValueError("Must provide either data or error")
 
 
-def assert_analyze_called(mock_analyze, text="Kaixo mundua", source_lang="eu", target_lang="en"):
+def assert_analyze_called(mock_analyze, text="Kaixo mundua", source_lang="eu", target_lang="en", **kwargs):
     mock_analyze.assert_called_once_with(
-        api_key="test-key", text=text, source_language=source_lang, target_language=target_lang
+        api_key="test-key", text=text, source_language=source_lang, target_language=target_lang, **kwargs
     )
 
 
@@ -138,8 +169,9 @@ def assert_scaffold_called(
         source_text=text,
         target_text=translated_text,
         sentence_id=sentence_id,
-        claude_api_key="test-claude-key",
+        claude_client=ANY,
     )
+    assert mock_scaffold.call_args.kwargs["claude_client"].api_key == "test-claude-key"
 
 
 # Response validation helper functions
@@ -173,6 +205,76 @@ class TestHealthCheck:
         assert response.json() == {"status": "healthy"}
 
 
+async def async_iter(items):
+    for item in items:
+        yield item
+
+
+def finished_future(error=None):
+    future = Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result([])
+    return future
+
+
+class TestReadyEndpoint:
+    def test_ready_when_all_languages_warmed_up(self, client):
+        with patch.dict(server_module._preload, {"eu": finished_future(), "en": finished_future()}, clear=True):
+            response = client.get("/ready")
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "status": "ready",
+            "languages": {"eu": {"state": "ready", "error": None}, "en": {"state": "ready", "error": None}},
+        }
+
+    def test_loading_languages_return_503(self, client):
+        with patch.dict(server_module._preload, {"eu": finished_future(), "fr": Future()}, clear=True):
+            response = client.get("/ready")
+
+        assert response.status_code == 503
+        body = response.json()
+        assert body["status"] == "loading"
+        assert body["languages"]["eu"]["state"] == "ready"
+        assert body["languages"]["fr"]["state"] in ("unloaded", "loading", "loaded")
+
+    def test_failed_language_is_reported(self, client):
+        with patch.dict(server_module._preload, {"eu": finished_future(RuntimeError("model missing"))}, clear=True):
+            response = client.get("/ready")
+
+        assert response.status_code == 503
+        assert response.json()["languages"]["eu"] == {"state": "failed", "error": "model missing"}
+
+    def test_failed_language_is_retried(self, client):
+        retried = finished_future()
+        preload = {"eu": finished_future(RuntimeError("model missing")), "en": finished_future()}
+        with (
+            patch.dict(server_module._preload, preload, clear=True),
+            patch.object(server_module, "preload_pipelines", return_value={"eu": retried}) as mock_preload,
+        ):
+            assert client.get("/ready").status_code == 503
+
+            assert server_module._retry_failed_preloads() == ["eu"]
+            response = client.get("/ready")
+
+        mock_preload.assert_called_once_with(["eu"])
+        assert response.status_code == 200
+
+    def test_health_does_not_depend_on_readiness(self, client):
+        with patch.dict(server_module._preload, {"fr": Future()}, clear=True):
+            assert client.get("/health").status_code == 200
+
+
+class TestPreloadLanguages:
+    def test_entries_are_stripped_and_validated(self):
+        assert server_module._parse_languages(" eu, en ,,xx,eu") == ["eu", "en"]
+
+    def test_empty_preloads_nothing(self):
+        assert server_module._parse_languages("") == []
+
+
 class TestAnalyzeEndpoint:
     def test_analyze_texts_success(self, itzuli_env, mock_analyze, client, mock_analysis_data):
         setup_analyze_mock(mock_analyze, data=mock_analysis_data)
@@ -241,7 +343,7 @@ class TestAnalyzeAndScaffoldEndpoint:
         assert_scaffold_response_structure(data)
 
         # Verify both functions were called correctly
-        assert_analyze_called(scaffold_setup["mock_analyze"])
+        assert_analyze_called(scaffold_setup["mock_analyze"], timings=ANY)
         assert_scaffold_called(scaffold_setup["mock_scaffold"], mock_analysis_data)
 
     @patch.dict(os.environ, {}, clear=True)
@@ -284,6 +386,215 @@ class TestAnalyzeAndScaffoldEndpoint:
         call_args = scaffold_setup["mock_scaffold"].call_args
         assert call_args.kwargs["sentence_id"] == "default"
 
+    def test_cache_hit_served_as_stored_bytes(self, full_env, mock_analyze, client, mock_alignment_data):
+        server_module.cache.set("Kaixo mundua", "eu", "en", mock_alignment_data)
+
+        response = client.post("/analyze-and-scaffold", json=basic_request())
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"].startswith('"')
+        assert response.json() == mock_alignment_data.sentences[0].model_dump(mode="json")
+        mock_analyze.assert_not_called()
+
+    def test_cache_hit_without_gzip_support(self, full_env, mock_analyze, client, mock_alignment_data):
+        server_module.cache.set("Kaixo mundua", "eu", "en", mock_alignment_data)
+
+        response = client.post("/analyze-and-scaffold", json=basic_request(), headers={"Accept-Encoding": "identity"})
+
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert response.json()["id"] == "test-001"
+
+    def test_cache_hit_etag_is_stable_per_encoding(self, full_env, mock_analyze, client, mock_alignment_data):
+        server_module.cache.set("Kaixo mundua", "eu", "en", mock_alignment_data)
+
+        gzipped = [client.post("/analyze-and-scaffold", json=basic_request()) for _ in range(2)]
+        identity = client.post("/analyze-and-scaffold", json=basic_request(), headers={"Accept-Encoding": "identity"})
+
+        assert gzipped[0].headers["etag"] == gzipped[1].headers["etag"]
+        assert gzipped[0].headers["etag"] == identity.headers["etag"][:-1] + '-gz"'
+        assert all("Accept-Encoding" in response.headers["vary"] for response in [*gzipped, identity])
+
+    def test_stale_cache_hit_served_and_refreshed(self, full_env, mock_analyze, client, mock_alignment_data, tmp_path):
+        paths = {"db_path": str(tmp_path / "swr.db"), "legacy_dir": str(tmp_path / "legacy")}
+        AlignmentCache(**paths, fingerprint="old").set("Kaixo mundua", "eu", "en", mock_alignment_data)
+        cache = AlignmentCache(**paths, fingerprint="new", stale_while_revalidate=True)
+
+        with (
+            patch.object(server_module, "cache", cache),
+            patch("itzuli_nlp.alignment_server.server._revalidate") as mock_revalidate,
+        ):
+            response = client.post("/analyze-and-scaffold", json=basic_request())
+
+        assert response.status_code == 200
+        assert response.json()["id"] == "test-001"
+        mock_analyze.assert_not_called()
+        mock_revalidate.assert_called_once()
+        assert mock_revalidate.call_args.args[0].text == "Kaixo mundua"
+
+    def test_fresh_cache_hit_is_not_refreshed(self, full_env, mock_analyze, client, mock_alignment_data):
+        server_module.cache.set("Kaixo mundua", "eu", "en", mock_alignment_data)
+
+        with patch("itzuli_nlp.alignment_server.server._revalidate") as mock_revalidate:
+            client.post("/analyze-and-scaffold", json=basic_request())
+
+        mock_revalidate.assert_not_called()
+
+
+class TestAnalyzeBoth:
+    @pytest.fixture
+    def echo_batcher(self):
+        def pipeline_for(language):
+            def run(docs):
+                return [
+                    Mock(sentences=[Mock(words=[Mock(text=doc.text, lemma=doc.text.lower(), upos="X", feats=None)])])
+                    for doc in docs
+                ]
+
+            return run
+
+        with patch.object(server_module, "batcher", StanzaBatcher(pipeline_for, window_ms=0)) as batcher:
+            yield batcher
+
+    @pytest.mark.anyio
+    async def test_translates_on_io_stage_while_source_is_analyzed(self, echo_batcher):
+        echo_batcher.submit = Mock(wraps=echo_batcher.submit)
+        translated_on = []
+
+        def translate(api_key, text, source_language, target_language):
+            # The source was queued for Stanza before the translation started
+            assert echo_batcher.submit.call_args_list[0].args == ("eu", "Kaixo")
+            translated_on.append(threading.current_thread().name)
+            return "Hello"
+
+        with patch.object(server_module, "translate_text", side_effect=translate):
+            translated_text, source_analysis, target_analysis = await server_module._analyze_both(
+                "key", "Kaixo", "eu", "en"
+            )
+
+        assert translated_text == "Hello"
+        assert [row.word for row in source_analysis] == ["Kaixo"]
+        assert [row.word for row in target_analysis] == ["Hello"]
+        assert translated_on[0].startswith("io-stage")
+
+    @pytest.mark.anyio
+    async def test_reports_stage_timings(self, echo_batcher):
+        timings = {}
+
+        with patch.object(server_module, "translate_text", return_value="Hello"):
+            await server_module._analyze_both("key", "Kaixo", "eu", "en", timings=timings)
+
+        assert set(timings) == {"translation_ms", "source_analysis_ms", "target_analysis_ms"}
+        assert all(value >= 0 for value in timings.values())
+
+
+class TestRevalidate:
+    @pytest.mark.anyio
+    async def test_regenerates_once_per_key(self, mock_alignment_data):
+        request = server_module.AnalysisRequest(**basic_request())
+
+        with patch(
+            "itzuli_nlp.alignment_server.server._generate_alignment", return_value=mock_alignment_data
+        ) as mock_generate:
+            server_module._revalidate(request, "itzuli-key", "claude-key")
+            server_module._revalidate(request, "itzuli-key", "claude-key")
+            await asyncio.gather(*server_module._background_jobs)
+
+        mock_generate.assert_called_once_with(request, "itzuli-key", "claude-key")
+
+    @pytest.mark.anyio
+    async def test_failures_are_logged(self):
+        request = server_module.AnalysisRequest(**basic_request())
+
+        with (
+            patch("itzuli_nlp.alignment_server.server._generate_alignment", side_effect=RuntimeError("boom")),
+            patch("itzuli_nlp.alignment_server.server.logger") as mock_logger,
+        ):
+            server_module._revalidate(request, "itzuli-key", "claude-key")
+            await asyncio.gather(*server_module._background_jobs)
+
+        assert "boom" in mock_logger.warning.call_args.args[0]
+
+
+class TestClaudeClient:
+    @pytest.mark.anyio
+    async def test_key_change_closes_previous_client_when_idle(self):
+        previous = Mock(api_key="old-key", aclose_when_idle=AsyncMock())
+
+        with patch.object(server_module.app.state, "claude_client", previous, create=True):
+            claude_client = server_module._claude_client("new-key")
+            await asyncio.gather(*server_module._background_jobs)
+
+        assert claude_client.api_key == "new-key"
+        previous.aclose_when_idle.assert_awaited_once()
+        await claude_client.aclose()
+
+    @patch.dict(os.environ, {"CLAUDE_API_KEY": "test-claude-key"})
+    def test_shutdown_closes_client(self):
+        with (
+            patch("itzuli_nlp.alignment_server.server.preload_pipelines", return_value={}),
+            patch.object(server_module.AsyncClaudeClient, "aclose", autospec=True) as mock_aclose,
+        ):
+            with TestClient(app):
+                claude_client = app.state.claude_client
+
+        mock_aclose.assert_awaited_once_with(claude_client)
+        assert app.state.claude_client is None
+
+
+class TestNegativeCaching:
+    def test_result_without_alignments_is_not_cached(
+        self, scaffold_setup, client, mock_analysis_data, mock_alignment_data
+    ):
+        setup_analyze_mock(scaffold_setup["mock_analyze"], data=mock_analysis_data)
+        pair = mock_alignment_data.sentences[0].model_copy(update={"layers": AlignmentLayers()})
+        setup_scaffold_mock(scaffold_setup["mock_scaffold"], data=AlignmentData(sentences=[pair]))
+
+        first = client.post("/analyze-and-scaffold", json=basic_request())
+        second = client.post("/analyze-and-scaffold", json=basic_request())
+
+        assert first.status_code == second.status_code == 200
+        assert second.json()["layers"]["lexical"] == []
+        assert scaffold_setup["mock_analyze"].call_count == 1
+        assert server_module.cache.stats()["entries"] == 0
+        assert server_module.negative_cache.stats()["hits"] == 1
+
+    def test_upstream_failure_is_remembered_briefly(self, scaffold_setup, client):
+        setup_analyze_mock(scaffold_setup["mock_analyze"], error="Itzuli down")
+
+        first = client.post("/analyze-and-scaffold", json=basic_request())
+        second = client.post("/analyze-and-scaffold", json=basic_request())
+
+        assert first.status_code == second.status_code == 500
+        assert "Itzuli down" in second.json()["detail"]
+        assert scaffold_setup["mock_analyze"].call_count == 1
+
+    def test_retried_after_expiry(self, scaffold_setup, client, mock_analysis_data, mock_alignment_data):
+        setup_analyze_mock(scaffold_setup["mock_analyze"], error="Itzuli down")
+        client.post("/analyze-and-scaffold", json=basic_request())
+
+        server_module.negative_cache.clear()
+        scaffold_setup["mock_analyze"].side_effect = None
+        setup_analyze_mock(scaffold_setup["mock_analyze"], data=mock_analysis_data)
+        setup_scaffold_mock(scaffold_setup["mock_scaffold"], data=mock_alignment_data)
+        response = client.post("/analyze-and-scaffold", json=basic_request())
+
+        assert response.status_code == 200
+        assert server_module.cache.stats()["entries"] == 1
+
+    def test_open_itzuli_circuit_is_a_503_and_not_remembered(self, scaffold_setup, client):
+        scaffold_setup["mock_analyze"].side_effect = ItzuliUnavailableError("Itzuli is unavailable", retry_after=12.3)
+
+        first = client.post("/analyze-and-scaffold", json=basic_request())
+        client.post("/analyze-and-scaffold", json=basic_request())
+
+        assert first.status_code == 503
+        assert first.headers["Retry-After"] == "12"
+        assert first.json()["error"] == "upstream_unavailable"
+        assert scaffold_setup["mock_analyze"].call_count == 2
+
 
 class TestModelValidation:
     def test_analysis_request_model_validation(self):
@@ -430,3 +741,249 @@ class TestResponseSchemas:
         target_row = data["target_analysis"][0]
         assert target_row["word"] == "Hello"
         assert target_row["feats"] == ""
+
+
+class TestBatchEndpoint:
+    @pytest.fixture
+    def batch_setup(self, full_env, mock_scaffold):
+        with (
+            patch("itzuli_nlp.alignment_server.server.translate_text", return_value="Hello world") as mock_translate,
+            patch("itzuli_nlp.alignment_server.server.batch_analyze") as mock_batch_analyze,
+            patch("itzuli_nlp.alignment_server.server.cache.get_many") as mock_get_many,
+            patch("itzuli_nlp.alignment_server.server.cache.set_many") as mock_set_many,
+        ):
+            mock_batch_analyze.side_effect = lambda lang, texts: [[AnalysisRow(t, t, "X", "")] for t in texts]
+            yield {
+                "mock_translate": mock_translate,
+                "mock_batch_analyze": mock_batch_analyze,
+                "mock_get_many": mock_get_many,
+                "mock_set_many": mock_set_many,
+                "mock_scaffold": mock_scaffold,
+            }
+
+    def test_batch_mixes_cached_and_generated_items(self, batch_setup, client, mock_alignment_data):
+        batch_setup["mock_get_many"].return_value = [mock_alignment_data, None]
+        setup_scaffold_mock(batch_setup["mock_scaffold"], data=mock_alignment_data)
+
+        response = client.post(
+            "/analyze-and-scaffold/batch",
+            json={
+                "items": [
+                    {**basic_request("Kaixo mundua"), "sentence_id": "a"},
+                    {**basic_request("Egun on"), "sentence_id": "b"},
+                ]
+            },
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [s["id"] for s in data["data"]["sentences"]] == ["a", "b"]
+        assert [i["status"] for i in data["items"]] == ["cached", "generated"]
+
+        batch_setup["mock_translate"].assert_called_once_with("test-key", "Egun on", "eu", "en")
+        assert batch_setup["mock_scaffold"].call_count == 1
+        assert len(batch_setup["mock_set_many"].call_args.args[0]) == 1
+
+    def test_batch_failures_are_not_cached_and_not_retried_immediately(self, batch_setup, client, mock_scaffold):
+        batch_setup["mock_get_many"].return_value = [None]
+        setup_scaffold_mock(mock_scaffold, error="Claude down")
+        body = {"items": [basic_request("Egun on")]}
+
+        first = client.post("/analyze-and-scaffold/batch", json=body)
+        second = client.post("/analyze-and-scaffold/batch", json=body)
+
+        assert first.json()["items"][0]["status"] == second.json()["items"][0]["status"] == "failed"
+        assert second.json()["items"][0]["error"] == "Claude down"
+        assert mock_scaffold.call_count == 1
+        assert batch_setup["mock_set_many"].call_args.args[0] == []
+
+    def test_batch_runs_one_stanza_call_per_language(self, batch_setup, client, mock_alignment_data):
+        batch_setup["mock_get_many"].return_value = [None, None, None]
+        setup_scaffold_mock(batch_setup["mock_scaffold"], data=mock_alignment_data)
+
+        response = client.post(
+            "/analyze-and-scaffold/batch",
+            json={"items": [basic_request("Bat"), basic_request("Bi"), basic_request("Hiru")]},
+        )
+
+        assert response.status_code == 200
+        calls = {c.args[0]: c.args[1] for c in batch_setup["mock_batch_analyze"].call_args_list}
+        assert calls == {"eu": ["Bat", "Bi", "Hiru"], "en": ["Hello world"] * 3}
+
+    def test_batch_generates_duplicate_items_once(self, batch_setup, client, mock_alignment_data):
+        batch_setup["mock_get_many"].return_value = [None, None]
+        setup_scaffold_mock(batch_setup["mock_scaffold"], data=mock_alignment_data)
+
+        response = client.post(
+            "/analyze-and-scaffold/batch",
+            json={"items": [basic_request("Kaixo"), basic_request("Kaixo")]},
+        )
+
+        assert response.status_code == 200
+        assert [i["status"] for i in response.json()["items"]] == ["generated", "generated"]
+        assert batch_setup["mock_scaffold"].call_count == 1
+
+    def test_batch_reports_per_item_failures(self, batch_setup, client, mock_alignment_data):
+        batch_setup["mock_get_many"].return_value = [None, None]
+        batch_setup["mock_translate"].side_effect = ["Hello", Exception("Itzuli down")]
+        setup_scaffold_mock(batch_setup["mock_scaffold"], data=mock_alignment_data)
+
+        response = client.post(
+            "/analyze-and-scaffold/batch",
+            json={"items": [basic_request("Kaixo"), basic_request("Agur")]},
+        )
+
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert items[0]["status"] == "generated"
+        assert items[1]["status"] == "failed"
+        assert items[1]["error"] == "Itzuli down"
+        assert response.json()["data"]["sentences"][1]["source"]["text"] == "Agur"
+
+    def test_batch_rejects_oversized_requests(self, batch_setup, client):
+        with patch("itzuli_nlp.alignment_server.server.BATCH_MAX_ITEMS", 1):
+            response = client.post(
+                "/analyze-and-scaffold/batch",
+                json={"items": [basic_request("Bat"), basic_request("Bi")]},
+            )
+
+        assert response.status_code == 413
+
+    def test_batch_rejects_empty_requests(self, client):
+        response = client.post("/analyze-and-scaffold/batch", json={"items": []})
+
+        assert response.status_code == 422
+
+
+class TestStreamEndpoint:
+    @pytest.fixture
+    def stream_setup(self, scaffold_setup):
+        with (
+            patch("itzuli_nlp.alignment_server.server.stream_alignments_for_pair_async") as mock_stream,
+            patch("itzuli_nlp.alignment_server.server.cache.set") as mock_cache_set,
+        ):
+            yield {**scaffold_setup, "mock_stream": mock_stream, "mock_cache_set": mock_cache_set}
+
+    def read_events(self, response):
+        return [json.loads(line) for line in response.text.splitlines() if line]
+
+    def test_streams_scaffold_then_layers_then_done(self, stream_setup, client, mock_analysis_data):
+        setup_analyze_mock(stream_setup["mock_analyze"], data=mock_analysis_data)
+        lexical = [Alignment(source=["s0"], target=["t0"], label="kaixo → hello")]
+        stream_setup["mock_stream"].return_value = async_iter([("lexical", lexical), ("features", [])])
+
+        response = client.post("/analyze-and-scaffold/stream", json=basic_request())
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = self.read_events(response)
+        assert [e["event"] for e in events] == ["scaffold", "layer", "layer", "done"]
+        assert events[0]["data"]["layers"]["lexical"] == []
+        assert len(events[0]["data"]["source"]["tokens"]) == 2
+        assert events[1]["layer"] == "lexical"
+        assert events[1]["alignments"][0]["label"] == "kaixo → hello"
+        assert events[3]["data"]["layers"]["lexical"][0]["source"] == ["s0"]
+
+        cached = stream_setup["mock_cache_set"].call_args.args[3]
+        assert cached.sentences[0].layers.lexical == lexical
+
+    def test_cache_hit_streams_single_done_event(self, stream_setup, client, mock_alignment_data):
+        stream_setup["mock_cache"].return_value = mock_alignment_data
+
+        response = client.post("/analyze-and-scaffold/stream", json=basic_request())
+
+        events = self.read_events(response)
+        assert [e["event"] for e in events] == ["done"]
+        assert events[0]["data"]["id"] == "test-001"
+        stream_setup["mock_analyze"].assert_not_called()
+
+    def test_analysis_failure_streams_error_event(self, stream_setup, client):
+        setup_analyze_mock(stream_setup["mock_analyze"], error="Itzuli down")
+
+        response = client.post("/analyze-and-scaffold/stream", json=basic_request())
+
+        events = self.read_events(response)
+        assert events == [{"event": "error", "message": "Itzuli down"}]
+
+    def test_stream_failing_midway_is_not_cached(self, stream_setup, client, mock_analysis_data):
+        setup_analyze_mock(stream_setup["mock_analyze"], data=mock_analysis_data)
+
+        async def broken_stream(*args):
+            yield "lexical", [Alignment(source=["s0"], target=["t0"], label="kaixo → hello")]
+            raise RuntimeError("stream broke")
+
+        stream_setup["mock_stream"].side_effect = broken_stream
+
+        first = self.read_events(client.post("/analyze-and-scaffold/stream", json=basic_request()))
+        second = self.read_events(client.post("/analyze-and-scaffold/stream", json=basic_request()))
+
+        assert [e["event"] for e in first] == ["scaffold", "layer", "error"]
+        assert first[-1]["message"] == "stream broke"
+        assert second == [{"event": "error", "message": "stream broke"}]
+        stream_setup["mock_cache_set"].assert_not_called()
+        assert stream_setup["mock_analyze"].call_count == 1
+
+    def test_joins_in_flight_generation(self, stream_setup, client, mock_alignment_data):
+        inflight = Mock(running=Mock(return_value=True), do=AsyncMock(return_value=mock_alignment_data))
+
+        with patch.object(server_module, "inflight", inflight):
+            response = client.post("/analyze-and-scaffold/stream", json=basic_request())
+
+        events = self.read_events(response)
+        assert [e["event"] for e in events] == ["done"]
+        assert events[0]["data"]["id"] == "test-001"
+        stream_setup["mock_analyze"].assert_not_called()
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_missing_api_key_fails_before_streaming(self, client):
+        response = client.post("/analyze-and-scaffold/stream", json=basic_request())
+
+        assert_error_response(response, 500, "ITZULI_API_KEY not configured")
+
+
+class TestJobsEndpoint:
+    def test_submit_runs_job_and_poll_returns_result(
+        self, scaffold_setup, client, mock_analysis_data, mock_alignment_data
+    ):
+        setup_analyze_mock(scaffold_setup["mock_analyze"], data=mock_analysis_data)
+        setup_scaffold_mock(scaffold_setup["mock_scaffold"], data=mock_alignment_data)
+
+        response = client.post("/jobs", json={**basic_request(), "sentence_id": "test-001"})
+
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        status = client.get(f"/jobs/{job_id}").json()
+        assert status["status"] == "completed"
+        assert status["result"]["id"] == "test-001"
+        assert set(status["timings"]) >= {"analysis_ms", "alignment_ms", "cache_write_ms", "total_ms"}
+        assert_scaffold_called(scaffold_setup["mock_scaffold"], mock_analysis_data)
+
+    def test_failed_job_reports_error(self, scaffold_setup, client):
+        setup_analyze_mock(scaffold_setup["mock_analyze"], error="Itzuli down")
+
+        job_id = client.post("/jobs", json=basic_request()).json()["job_id"]
+
+        status = client.get(f"/jobs/{job_id}").json()
+        assert status["status"] == "failed"
+        assert status["error"] == "Itzuli down"
+        assert status["result"] is None
+
+    def test_cache_hit_completes_without_pipeline(self, scaffold_setup, client, mock_alignment_data):
+        scaffold_setup["mock_cache"].return_value = mock_alignment_data
+
+        job_id = client.post("/jobs", json=basic_request()).json()["job_id"]
+
+        assert client.get(f"/jobs/{job_id}").json()["status"] == "completed"
+        scaffold_setup["mock_analyze"].assert_not_called()
+
+    def test_unknown_job_returns_404(self, client):
+        response = client.get("/jobs/does-not-exist")
+
+        assert response.status_code == 404
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_submit_requires_api_keys(self, client):
+        response = client.post("/jobs", json=basic_request())
+
+        assert_error_response(response, 500, "ITZULI_API_KEY not configured")
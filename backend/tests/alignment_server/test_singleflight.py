@@ -0,0 +1,101 @@
+"""Tests for single-flight request coalescing."""
+
+import asyncio
+
+import pytest
+
+from itzuli_nlp.alignment_server.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    @pytest.mark.anyio
+    async def test_concurrent_calls_with_same_key_share_one_execution(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+        assert results == ["result"] * 5
+        assert calls == 1
+        stats = flight.stats()
+        assert stats["executed"] == 1
+        assert stats["collapsed"] == 4
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.anyio
+    async def test_different_keys_run_independently(self):
+        flight = SingleFlight()
+
+        async def work(value):
+            await asyncio.sleep(0.01)
+            return value
+
+        results = await asyncio.gather(flight.do("a", lambda: work("a")), flight.do("b", lambda: work("b")))
+
+        assert results == ["a", "b"]
+        assert flight.stats()["collapsed"] == 0
+
+    @pytest.mark.anyio
+    async def test_running_reports_in_flight_keys(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+
+        task = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        assert flight.running("key")
+        assert not flight.running("other")
+
+        release.set()
+        await task
+        assert not flight.running("key")
+
+    @pytest.mark.anyio
+    async def test_sequential_calls_are_not_coalesced(self):
+        flight = SingleFlight()
+
+        async def work():
+            return "result"
+
+        await flight.do("key", work)
+        await flight.do("key", work)
+
+        assert flight.stats()["executed"] == 2
+
+    @pytest.mark.anyio
+    async def test_errors_propagate_to_every_waiter(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flight.stats()["in_flight"] == 0
+
+    @pytest.mark.anyio
+    async def test_cancelled_leader_does_not_cancel_followers(self):
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "result"
+
+        leader = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+
+        assert await follower == "result"
@@ -0,0 +1,24 @@
+"""Shared fixtures for the whole test suite."""
+
+from unittest.mock import patch
+
+import pytest
+
+import itzuli_nlp.core.translation_cache as translation_cache_module
+from itzuli_nlp.core.analysis_cache import analysis_cache
+from itzuli_nlp.core.translation_cache import TranslationCache
+
+
+@pytest.fixture(autouse=True)
+def isolate_translation_cache(tmp_path):
+    """Give every test an empty translation cache instead of the shared one under .cache/."""
+    with patch.object(translation_cache_module, "translation_cache", TranslationCache(str(tmp_path / "translations.db"))):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def isolate_analysis_cache():
+    """Start every test with an empty in-memory analysis cache, so mocked pipelines are always called."""
+    analysis_cache.clear()
+    yield
+    analysis_cache.clear()
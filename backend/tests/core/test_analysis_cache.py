@@ -0,0 +1,99 @@
+"""Tests for the Stanza analysis cache."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from itzuli_nlp.core.analysis_cache import AnalysisCache, decode_rows, encode_rows
+from itzuli_nlp.core.types import AnalysisRow
+
+ROWS = [
+    AnalysisRow("Kaixo", "kaixo", "INTJ", ""),
+    AnalysisRow("mundua", "mundu", "NOUN", "Case=Abs|Definite=Def|Number=Sing"),
+    AnalysisRow("!", None, "PUNCT", ""),
+]
+
+
+@pytest.fixture
+def cache():
+    return AnalysisCache(max_entries=10, db_path=None)
+
+
+class TestEncoding:
+    def test_round_trip(self):
+        assert decode_rows(encode_rows(ROWS)) == ROWS
+
+    def test_empty_analysis(self):
+        assert decode_rows(encode_rows([])) == []
+
+
+class TestAnalysisCache:
+    def test_analyzes_once(self, cache):
+        analyze = Mock(return_value=ROWS)
+
+        first = cache.get_or_analyze("eu", "Kaixo mundua!", analyze)
+        second = cache.get_or_analyze("eu", "Kaixo mundua!", analyze)
+
+        assert first == second == ROWS
+        analyze.assert_called_once()
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_returns_independent_copies(self, cache):
+        cache.put("eu", "Kaixo mundua!", ROWS)
+
+        cache.get("eu", "Kaixo mundua!")[0].word = "changed"
+
+        assert cache.get("eu", "Kaixo mundua!") == ROWS
+
+    def test_keyed_by_language_and_exact_text(self, cache):
+        cache.put("eu", "Kaixo mundua!", ROWS)
+
+        assert cache.get("es", "Kaixo mundua!") is None
+        assert cache.get("eu", "Kaixo  mundua!") is None
+
+    def test_evicts_least_recently_used(self):
+        cache = AnalysisCache(max_entries=2, db_path=None)
+        cache.put("eu", "a", ROWS)
+        cache.put("eu", "b", ROWS)
+        cache.get("eu", "a")
+        cache.put("eu", "c", ROWS)
+
+        assert cache.get("eu", "b") is None
+        assert cache.get("eu", "a") == ROWS
+        assert cache.stats()["entries"] == 2
+
+    def test_disabled_with_zero_entries(self):
+        cache = AnalysisCache(max_entries=0, db_path=None)
+        analyze = Mock(return_value=ROWS)
+
+        cache.get_or_analyze("eu", "a", analyze)
+        cache.get_or_analyze("eu", "a", analyze)
+
+        assert analyze.call_count == 2
+
+
+class TestPersistence:
+    def test_survives_restart(self, tmp_path):
+        db_path = str(tmp_path / "analyses.db")
+        AnalysisCache(max_entries=10, db_path=db_path).put("eu", "Kaixo mundua!", ROWS)
+
+        restarted = AnalysisCache(max_entries=10, db_path=db_path)
+
+        assert restarted.get("eu", "Kaixo mundua!") == ROWS
+        assert restarted.stats()["disk_hits"] == 1
+        assert restarted.stats()["entries"] == 1
+
+    def test_other_model_version_misses(self, tmp_path):
+        db_path = str(tmp_path / "analyses.db")
+        AnalysisCache(max_entries=10, db_path=db_path, model_version="old").put("eu", "Kaixo", ROWS)
+
+        assert AnalysisCache(max_entries=10, db_path=db_path, model_version="new").get("eu", "Kaixo") is None
+
+    def test_clear_empties_disk(self, tmp_path):
+        cache = AnalysisCache(max_entries=10, db_path=str(tmp_path / "analyses.db"))
+        cache.put("eu", "Kaixo", ROWS)
+
+        cache.clear()
+
+        assert cache.get("eu", "Kaixo") is None
@@ -0,0 +1,156 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import pytest
+
+from itzuli_nlp.core.analysis_cache import AnalysisCache
+from itzuli_nlp.core.batching import StanzaBatcher
+
+
+def fake_pipeline(calls, gate=None):
+    """A pipeline whose documents contain one word per input text, echoing the text."""
+
+    def run(docs):
+        if gate is not None:
+            gate.wait(timeout=5)
+        calls.append([doc.text for doc in docs])
+        results = []
+        for doc in docs:
+            word = Mock(text=doc.text, lemma=doc.text.lower(), upos="X", feats=None)
+            results.append(Mock(sentences=[Mock(words=[word])]))
+        return results
+
+    return run
+
+
+class TestStanzaBatcher:
+    def test_returns_rows_for_each_text(self):
+        calls = []
+        batcher = StanzaBatcher(lambda language: fake_pipeline(calls), window_ms=0)
+
+        rows = batcher.analyze("eu", "Kaixo")
+
+        assert [row.word for row in rows] == ["Kaixo"]
+        assert rows[0].lemma == "kaixo"
+
+    def test_concurrent_texts_share_a_batch(self):
+        calls = []
+        batcher = StanzaBatcher(lambda language: fake_pipeline(calls), window_ms=200)
+        texts = [f"text{i}" for i in range(6)]
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(lambda text: batcher.analyze("eu", text), texts))
+
+        assert [rows[0].word for rows in results] == texts
+        assert len(calls) < len(texts)
+        assert sorted(text for call in calls for text in call) == texts
+
+    def test_respects_max_batch(self):
+        calls = []
+        gate = threading.Event()
+        batcher = StanzaBatcher(lambda language: fake_pipeline(calls, gate), window_ms=50, max_batch=2)
+
+        futures = [batcher.submit("eu", f"text{i}") for i in range(5)]
+        gate.set()
+        [future.result(timeout=5) for future in futures]
+
+        assert all(len(call) <= 2 for call in calls)
+        assert sum(len(call) for call in calls) == 5
+
+    def test_languages_are_batched_separately(self):
+        calls = []
+        pipelines = {}
+
+        def pipeline_for(language):
+            pipelines[language] = fake_pipeline(calls)
+            return pipelines[language]
+
+        batcher = StanzaBatcher(pipeline_for, window_ms=0)
+        batcher.analyze("eu", "Kaixo")
+        batcher.analyze("en", "Hello")
+
+        assert set(pipelines) == {"eu", "en"}
+        assert set(batcher.stats()["languages"]) == {"eu", "en"}
+
+    def test_analyze_many_preserves_order(self):
+        calls = []
+        batcher = StanzaBatcher(lambda language: fake_pipeline(calls), window_ms=20)
+
+        results = batcher.analyze_many("eu", ["a", "b", "c"])
+
+        assert [rows[0].word for rows in results] == ["a", "b", "c"]
+
+    def test_pipeline_error_fails_whole_batch(self):
+        def broken(docs):
+            raise RuntimeError("model exploded")
+
+        batcher = StanzaBatcher(lambda language: broken, window_ms=0)
+
+        with pytest.raises(RuntimeError, match="model exploded"):
+            batcher.analyze("eu", "Kaixo")
+
+        # The dispatcher keeps serving after a failed batch
+        batcher._pipeline_for = lambda language: fake_pipeline([])
+        assert batcher.analyze("eu", "Kaixo")[0].word == "Kaixo"
+
+    def test_failing_text_only_fails_its_own_caller(self):
+        calls = []
+        gate = threading.Event()
+        echo = fake_pipeline(calls, gate)
+
+        def pipeline(docs):
+            if any(doc.text == "bad" for doc in docs):
+                raise RuntimeError("cannot parse")
+            return echo(docs)
+
+        batcher = StanzaBatcher(lambda language: pipeline, window_ms=200)
+        futures = {text: batcher.submit("eu", text) for text in ["a", "bad", "b"]}
+        gate.set()
+
+        assert futures["a"].result(timeout=5)[0].word == "a"
+        assert futures["b"].result(timeout=5)[0].word == "b"
+        with pytest.raises(RuntimeError, match="cannot parse"):
+            futures["bad"].result(timeout=5)
+
+    def test_missing_documents_fall_back_to_single_texts(self):
+        calls = []
+        echo = fake_pipeline(calls)
+
+        def pipeline(docs):
+            results = echo(docs)
+            # Drops the last document of any bulk call
+            return results[:-1] if len(docs) > 1 else results
+
+        batcher = StanzaBatcher(lambda language: pipeline, window_ms=20)
+
+        results = batcher.analyze_many("eu", ["a", "b", "c"])
+
+        assert [rows[0].word for rows in results] == ["a", "b", "c"]
+
+    def test_stats_report_batches_and_latency(self):
+        calls = []
+        batcher = StanzaBatcher(lambda language: fake_pipeline(calls), window_ms=0, max_batch=8)
+
+        batcher.analyze_many("eu", ["a", "b"])
+
+        stats = batcher.stats()
+        assert stats["max_batch"] == 8
+        eu = stats["languages"]["eu"]
+        assert eu["texts"] == 2
+        assert eu["batches"] == len(calls)
+        assert eu["avg_batch_size"] == 2 / len(calls)
+        assert eu["avg_inference_ms"] >= 0
+
+    def test_cached_texts_skip_the_pipeline(self):
+        calls = []
+        batcher = StanzaBatcher(
+            lambda language: fake_pipeline(calls), window_ms=0, cache=AnalysisCache(max_entries=10, db_path=None)
+        )
+
+        first = batcher.analyze("eu", "Kaixo")
+        second = batcher.analyze("eu", "Kaixo")
+        batcher.submit("eu", "Kaixo", use_cache=False).result(timeout=5)
+
+        assert first == second
+        assert calls == [["Kaixo"], ["Kaixo"]]
@@ -0,0 +1,129 @@
+"""Tests for the shared Itzuli client."""
+
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from itzuli_nlp.core.itzuli_client import (
+    CircuitBreaker,
+    ItzuliClient,
+    ItzuliError,
+    ItzuliRejectedError,
+    ItzuliUnavailableError,
+)
+
+
+def response(status_code=200, body=None):
+    return Mock(status_code=status_code, json=Mock(return_value=body or {"translated_text": "Hello!", "id": "t-1"}))
+
+
+@pytest.fixture
+def client():
+    client = ItzuliClient(base_url="https://itzuli.test/", max_retries=2, breaker=CircuitBreaker(3, 60))
+    client.session = Mock()
+    return client
+
+
+@pytest.fixture(autouse=True)
+def no_backoff():
+    with patch("itzuli_nlp.core.itzuli_client.random.uniform", return_value=0):
+        yield
+
+
+class TestItzuliClient:
+    def test_translate_posts_to_itzuli(self, client):
+        client.session.request.return_value = response()
+
+        result = client.translate("key", "Kaixo!", "eu", "en")
+
+        assert result == {"translated_text": "Hello!", "id": "t-1"}
+        method, url = client.session.request.call_args.args
+        kwargs = client.session.request.call_args.kwargs
+        assert (method, url) == ("POST", "https://itzuli.test/translation/get")
+        assert kwargs["headers"] == {"Authorization": "Bearer key"}
+        assert kwargs["timeout"][0] == client.connect_timeout
+
+    def test_retries_server_errors_and_timeouts(self, client):
+        client.session.request.side_effect = [response(503), requests.exceptions.ReadTimeout(), response()]
+
+        assert client.translate("key", "Kaixo!", "eu", "en")["id"] == "t-1"
+        assert client.stats()["retries"] == 2
+        assert client.stats()["failures"] == 0
+
+    def test_gives_up_after_max_retries(self, client):
+        client.session.request.return_value = response(502)
+
+        with pytest.raises(ItzuliError, match="after 3 attempts"):
+            client.translate("key", "Kaixo!", "eu", "en")
+        assert client.session.request.call_count == 3
+
+    def test_invalid_key_is_not_retried(self, client):
+        client.session.request.return_value = response(401)
+
+        with pytest.raises(ItzuliRejectedError, match="Invalid API key"):
+            client.get_quota("bad-key")
+        assert client.session.request.call_count == 1
+        assert client.breaker.state == "closed"
+
+    def test_feedback_is_not_resent_after_a_read_timeout(self, client):
+        client.session.request.side_effect = requests.exceptions.ReadTimeout()
+
+        with pytest.raises(ItzuliError):
+            client.send_feedback("key", "t-1", "Kaixo", 5)
+        assert client.session.request.call_count == 1
+
+    def test_stops_retrying_at_the_deadline(self, client):
+        client.deadline = 0.0
+        client.session.request.return_value = response(500)
+
+        with pytest.raises(ItzuliError, match="deadline"):
+            client.translate("key", "Kaixo!", "eu", "en")
+        assert client.session.request.call_count == 1
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures_and_fails_fast(self, client):
+        client.max_retries = 0
+        client.session.request.return_value = response(500)
+        for _ in range(3):
+            with pytest.raises(ItzuliError):
+                client.translate("key", "Kaixo!", "eu", "en")
+
+        with pytest.raises(ItzuliUnavailableError) as excinfo:
+            client.translate("key", "Kaixo!", "eu", "en")
+
+        assert client.session.request.call_count == 3
+        assert 0 < excinfo.value.retry_after <= 60
+        assert client.stats()["breaker"] == {
+            "state": "open",
+            "consecutive_failures": 3,
+            "times_opened": 1,
+            "rejected": 1,
+        }
+
+    def test_half_open_trial_closes_on_success(self):
+        breaker = CircuitBreaker(threshold=1, reset_seconds=0)
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state == "half_open"
+        breaker.before_call()
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_half_open_allows_a_single_trial(self):
+        breaker = CircuitBreaker(threshold=1, reset_seconds=0)
+        breaker.record_failure()
+
+        breaker.before_call()
+        with pytest.raises(ItzuliUnavailableError):
+            breaker.before_call()
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker(threshold=1, reset_seconds=0)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.times_opened == 2
@@ -0,0 +1,46 @@
+from unittest.mock import patch
+
+from itzuli_nlp.core.memory import current_rss_bytes, parse_smaps_rollup, process_memory
+
+SMAPS_ROLLUP = """55d0c0a00000-7ffd1c9f2000 ---p 00000000 00:00 0                          [rollup]
+Rss:              812340 kB
+Pss:              402112 kB
+Shared_Clean:     600000 kB
+Shared_Dirty:       4000 kB
+Private_Clean:      8340 kB
+Private_Dirty:    200000 kB
+Referenced:       812340 kB
+Anonymous:        204000 kB
+"""
+
+
+class TestParseSmapsRollup:
+    def test_parses_rss_pss_and_sharing(self):
+        usage = parse_smaps_rollup(SMAPS_ROLLUP)
+
+        assert usage["rss_bytes"] == 812340 * 1024
+        assert usage["pss_bytes"] == 402112 * 1024
+        assert usage["shared_bytes"] == 604000 * 1024
+        assert usage["private_bytes"] == 208340 * 1024
+
+    def test_missing_fields_default_to_zero(self):
+        usage = parse_smaps_rollup("Rss: 10 kB\n")
+
+        assert usage == {"rss_bytes": 10240, "pss_bytes": 0, "shared_bytes": 0, "private_bytes": 0}
+
+
+class TestProcessMemory:
+    def test_falls_back_to_peak_rss_without_proc(self):
+        with patch("builtins.open", side_effect=OSError):
+            usage = process_memory()
+
+        assert usage["rss_bytes"] > 0
+
+
+class TestCurrentRssBytes:
+    def test_reports_positive_size(self):
+        assert current_rss_bytes() > 0
+
+    def test_falls_back_without_proc(self):
+        with patch("builtins.open", side_effect=OSError):
+            assert current_rss_bytes() > 0
@@ -1,6 +1,10 @@
 from unittest.mock import Mock
 
-from itzuli_nlp.core.nlp import create_pipeline, process_raw_analysis
+from itzuli_nlp.core.nlp import (
+    create_pipeline,
+    process_raw_analysis,
+    process_raw_analysis_batch,
+)
 from itzuli_nlp.core.types import AnalysisRow
 
 
@@ -88,6 +92,29 @@ class TestProcessRawAnalysis:
         assert result[1].word == "mundua"
 
 
+class TestProcessRawAnalysisBatch:
+    def test_returns_rows_per_input_text(self):
+        def make_doc(text):
+            word = Mock(text=text, lemma=text.lower(), upos="NOUN", feats=None)
+            return Mock(sentences=[Mock(words=[word])])
+
+        mock_pipeline = Mock()
+        mock_pipeline.side_effect = lambda docs: [make_doc(doc.text) for doc in docs]
+
+        result = process_raw_analysis_batch(mock_pipeline, ["Kaixo", "Mundua"])
+
+        assert len(result) == 2
+        assert result[0][0].word == "Kaixo"
+        assert result[1][0].lemma == "mundua"
+        mock_pipeline.assert_called_once()
+
+    def test_empty_input_skips_pipeline(self):
+        mock_pipeline = Mock()
+
+        assert process_raw_analysis_batch(mock_pipeline, []) == []
+        mock_pipeline.assert_not_called()
+
+
 class TestCreatePipeline:
     def test_creates_basque_pipeline(self):
         # This is more of an integration test - we can't easily mock Stanza
@@ -0,0 +1,31 @@
+"""Tests for cache key text normalization."""
+
+from itzuli_nlp.core.normalize import (
+    NORMALIZATION_VERSION,
+    normalization_tag,
+    normalize_text,
+)
+
+
+class TestNormalizeText:
+    def test_collapses_and_trims_whitespace(self):
+        assert normalize_text(" Kaixo,  zer\tmoduz? \n") == "Kaixo, zer moduz?"
+
+    def test_composes_unicode(self):
+        assert normalize_text("España") == "España"
+
+    def test_keeps_punctuation_by_default(self):
+        assert normalize_text("Kaixo!", fold_punctuation=False) == "Kaixo!"
+
+    def test_folds_trailing_punctuation(self):
+        assert normalize_text("Kaixo, zer moduz ?!", fold_punctuation=True) == "Kaixo, zer moduz"
+        assert normalize_text("¿Qué tal?", fold_punctuation=True) == "¿Qué tal"
+
+    def test_folding_leaves_punctuation_only_text_empty(self):
+        assert normalize_text("...", fold_punctuation=True) == ""
+
+
+class TestNormalizationTag:
+    def test_records_version_and_folding(self):
+        assert normalization_tag(False) == f"n{NORMALIZATION_VERSION}"
+        assert normalization_tag(True) == f"n{NORMALIZATION_VERSION}p"
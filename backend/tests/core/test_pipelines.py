@@ -0,0 +1,153 @@
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from itzuli_nlp.core.pipelines import PipelineRegistry, _model_bytes
+
+
+def recording_factory(created):
+    """Factory that records which languages it was asked to load."""
+
+    def create(language):
+        created.append(language)
+        return Mock(name=f"pipeline-{language}")
+
+    return create
+
+
+class TestPipelineRegistry:
+    def test_loads_once_and_reuses(self):
+        created = []
+        registry = PipelineRegistry(recording_factory(created))
+
+        first = registry.get("eu")
+        second = registry.get("eu")
+
+        assert first is second
+        assert created == ["eu"]
+        assert registry.stats()["languages"]["eu"]["hits"] == 1
+
+    def test_concurrent_requests_share_one_load(self):
+        created = []
+
+        def slow_factory(language):
+            time.sleep(0.05)
+            created.append(language)
+            return Mock()
+
+        registry = PipelineRegistry(slow_factory)
+        threads = [threading.Thread(target=registry.get, args=("eu",)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert created == ["eu"]
+
+    @patch("itzuli_nlp.core.pipelines._model_bytes")
+    def test_evicts_least_recently_used_over_budget(self, mock_model_bytes):
+        mock_model_bytes.return_value = 100
+        created = []
+        registry = PipelineRegistry(recording_factory(created), budget_bytes=250)
+
+        registry.get("eu")
+        registry.get("en")
+        registry.get("eu")  # en is now the coldest
+        registry.get("es")
+
+        assert registry.loaded() == ["eu", "es"]
+        stats = registry.stats()
+        assert stats["evictions"] == 1
+        assert stats["resident_bytes"] == 200
+
+        registry.get("en")
+        assert created == ["eu", "en", "es", "en"]
+
+    @patch("itzuli_nlp.core.pipelines._model_bytes")
+    def test_keeps_new_pipeline_even_if_over_budget(self, mock_model_bytes):
+        mock_model_bytes.return_value = 500
+        registry = PipelineRegistry(recording_factory([]), budget_bytes=250)
+
+        registry.get("eu")
+        registry.get("en")
+
+        assert registry.loaded() == ["en"]
+
+    @patch("itzuli_nlp.core.pipelines._model_bytes")
+    def test_zero_budget_never_evicts(self, mock_model_bytes):
+        mock_model_bytes.return_value = 10**9
+        registry = PipelineRegistry(recording_factory([]), budget_bytes=0)
+
+        for language in ("eu", "en", "es", "fr"):
+            registry.get(language)
+
+        assert registry.loaded() == ["eu", "en", "es", "fr"]
+
+    @patch("itzuli_nlp.core.pipelines.current_rss_bytes")
+    def test_falls_back_to_rss_growth_for_size(self, mock_rss):
+        mock_rss.side_effect = [1000, 1700]
+        registry = PipelineRegistry(lambda language: Mock(processors={}))
+
+        registry.get("eu")
+
+        assert registry.stats()["languages"]["eu"]["resident_bytes"] == 700
+
+    def test_reports_load_state(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking_factory(language):
+            started.set()
+            release.wait(timeout=5)
+            return Mock()
+
+        registry = PipelineRegistry(blocking_factory)
+        assert registry.state("eu") == "unloaded"
+
+        loader = threading.Thread(target=registry.get, args=("eu",))
+        loader.start()
+        started.wait(timeout=5)
+        assert registry.state("eu") == "loading"
+
+        release.set()
+        loader.join()
+        assert registry.state("eu") == "loaded"
+
+    def test_failed_load_is_not_cached(self):
+        def broken(language):
+            raise RuntimeError("no model")
+
+        registry = PipelineRegistry(broken)
+
+        with pytest.raises(RuntimeError):
+            registry.get("eu")
+        assert registry.state("eu") == "unloaded"
+
+    def test_evict_and_clear(self):
+        registry = PipelineRegistry(recording_factory([]))
+        registry.get("eu")
+        registry.get("en")
+
+        assert registry.evict("eu") is True
+        assert registry.evict("eu") is False
+        assert registry.loaded() == ["en"]
+
+        registry.clear()
+        assert registry.loaded() == []
+
+
+class TestModelBytes:
+    def test_sums_processor_model_tensors(self):
+        torch = pytest.importorskip("torch")
+        shared = torch.nn.Linear(4, 2)
+        pipeline = Mock(
+            processors={
+                "pos": Mock(_trainer=Mock(model=shared)),
+                "lemma": Mock(_trainer=Mock(model=shared)),
+                "tokenize": Mock(_trainer=None),
+            }
+        )
+
+        assert _model_bytes(pipeline) == (4 * 2 + 2) * 4
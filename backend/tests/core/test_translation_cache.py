@@ -0,0 +1,98 @@
+"""Tests for the Itzuli translation cache."""
+
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from itzuli_nlp.core.translation_cache import TranslationCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TranslationCache(str(tmp_path / "translations.db"))
+
+
+def itzuli(translated_text="Hello!", translation_id="trans-123"):
+    return Mock(return_value={"translated_text": translated_text, "id": translation_id})
+
+
+class TestTranslationCache:
+    def test_database_created_on_first_use(self, tmp_path):
+        cache = TranslationCache(str(tmp_path / "nested" / "translations.db"))
+        assert not (tmp_path / "nested").exists()
+
+        assert cache.get("Kaixo!", "eu", "en") is None
+        assert (tmp_path / "nested" / "translations.db").exists()
+
+    def test_fetches_once_and_keeps_translation_id(self, cache):
+        translate = itzuli()
+
+        first = cache.get_or_translate("Kaixo!", "eu", "en", translate)
+        second = cache.get_or_translate("Kaixo!", "eu", "en", translate)
+
+        assert first == second == {"translated_text": "Hello!", "id": "trans-123"}
+        translate.assert_called_once()
+        assert cache.stats()["hits"] == 1
+
+    def test_keyed_by_normalized_text_and_language_pair(self, cache):
+        cache.set("Kaixo!", "eu", "en", {"translated_text": "Hello!", "id": "1"})
+
+        assert cache.get("  Kaixo! ", "eu", "en") is not None
+        assert cache.get("Kaixo", "eu", "en") is None
+        assert cache.get("Kaixo!", "eu", "es") is None
+
+    def test_empty_translations_are_not_stored(self, cache):
+        translate = itzuli(translated_text="")
+
+        cache.get_or_translate("Kaixo!", "eu", "en", translate)
+        cache.get_or_translate("Kaixo!", "eu", "en", translate)
+
+        assert translate.call_count == 2
+
+    def test_errors_are_not_cached(self, cache):
+        translate = Mock(side_effect=RuntimeError("Itzuli down"))
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_translate("Kaixo!", "eu", "en", translate)
+        assert cache.stats()["entries"] == 0
+
+    def test_disabled_cache_always_translates(self, tmp_path):
+        cache = TranslationCache(str(tmp_path / "translations.db"), enabled=False)
+        translate = itzuli()
+
+        cache.get_or_translate("Kaixo!", "eu", "en", translate)
+        cache.get_or_translate("Kaixo!", "eu", "en", translate)
+
+        assert translate.call_count == 2
+
+
+class TestTranslationCacheEviction:
+    def test_expired_entries_are_misses_and_evicted(self, tmp_path):
+        cache = TranslationCache(str(tmp_path / "translations.db"), ttl_seconds=60)
+        cache.set("Kaixo!", "eu", "en", {"translated_text": "Hello!", "id": "1"})
+
+        with patch("itzuli_nlp.core.translation_cache.time.time", return_value=time.time() + 120):
+            assert cache.get("Kaixo!", "eu", "en") is None
+            assert cache.evict() == 1
+
+    def test_keeps_most_recently_used_entries(self, tmp_path):
+        cache = TranslationCache(str(tmp_path / "translations.db"), max_entries=2)
+        for text in ("a", "b", "c"):
+            cache.set(text, "eu", "en", {"translated_text": text.upper(), "id": text})
+            time.sleep(0.01)
+        cache.get("a", "eu", "en")
+
+        assert cache.evict() == 1
+        assert cache.get("b", "eu", "en") is None
+        assert cache.get("a", "eu", "en") is not None
+        assert cache.stats()["evicted"] == 1
+
+    def test_evicts_periodically_on_write(self, tmp_path):
+        cache = TranslationCache(str(tmp_path / "translations.db"), max_entries=1)
+
+        with patch("itzuli_nlp.core.translation_cache._EVICT_EVERY", 2):
+            cache.set("a", "eu", "en", {"translated_text": "A"})
+            cache.set("b", "eu", "en", {"translated_text": "B"})
+
+        assert cache.stats()["entries"] == 1
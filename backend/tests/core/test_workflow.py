@@ -1,5 +1,6 @@
 from unittest.mock import Mock, patch
 
+from itzuli_nlp.core.pipelines import pipeline_registry
 from itzuli_nlp.core.types import AnalysisRow, TranslationResult
 from itzuli_nlp.core.workflow import (
     get_cached_stanza_pipeline,
@@ -41,11 +42,9 @@ class TestTranslationResult:
 class TestProcessTranslationWithAnalysis:
     @patch("itzuli_nlp.core.workflow.get_cached_stanza_pipeline")
     @patch("itzuli_nlp.core.workflow.process_raw_analysis")
-    @patch("itzuli_nlp.core.workflow.Itzuli")
-    def test_processes_eu_to_en_translation(self, mock_itzuli_class, mock_process_raw_analysis, mock_get_pipeline):
-        mock_itzuli = Mock()
-        mock_itzuli_class.return_value = mock_itzuli
-        mock_itzuli.getTranslation.return_value = {"translated_text": "Hello!", "id": "trans-123"}
+    @patch("itzuli_nlp.core.workflow.itzuli_client")
+    def test_processes_eu_to_en_translation(self, mock_itzuli, mock_process_raw_analysis, mock_get_pipeline):
+        mock_itzuli.translate.return_value = {"translated_text": "Hello!", "id": "trans-123"}
 
         mock_process_raw_analysis.return_value = [AnalysisRow("Kaixo", "kaixo", "INTJ", "Animacy=Inan")]
 
@@ -61,16 +60,14 @@ class TestProcessTranslationWithAnalysis:
         assert len(result.analysis_rows) == 1
         assert result.analysis_rows[0].word == "Kaixo"
 
-        mock_itzuli.getTranslation.assert_called_once_with("Kaixo!", "eu", "en")
+        mock_itzuli.translate.assert_called_once_with("test-key", "Kaixo!", "eu", "en")
         mock_process_raw_analysis.assert_called_once_with(mock_get_pipeline.return_value, "Kaixo!")
 
     @patch("itzuli_nlp.core.workflow.get_cached_stanza_pipeline")
     @patch("itzuli_nlp.core.workflow.process_raw_analysis")
-    @patch("itzuli_nlp.core.workflow.Itzuli")
-    def test_processes_en_to_eu_translation(self, mock_itzuli_class, mock_process_raw_analysis, mock_get_pipeline):
-        mock_itzuli = Mock()
-        mock_itzuli_class.return_value = mock_itzuli
-        mock_itzuli.getTranslation.return_value = {"translated_text": "Kaixo!", "id": "trans-456"}
+    @patch("itzuli_nlp.core.workflow.itzuli_client")
+    def test_processes_en_to_eu_translation(self, mock_itzuli, mock_process_raw_analysis, mock_get_pipeline):
+        mock_itzuli.translate.return_value = {"translated_text": "Kaixo!", "id": "trans-456"}
 
         mock_process_raw_analysis.return_value = [AnalysisRow("Kaixo", "kaixo", "INTJ", "Animacy=Inan")]
 
@@ -89,11 +86,9 @@ class TestProcessTranslationWithAnalysis:
 
     @patch("itzuli_nlp.core.workflow.get_cached_stanza_pipeline")
     @patch("itzuli_nlp.core.workflow.process_raw_analysis")
-    @patch("itzuli_nlp.core.workflow.Itzuli")
-    def test_handles_empty_translation_id(self, mock_itzuli_class, mock_process_raw_analysis, mock_get_pipeline):
-        mock_itzuli = Mock()
-        mock_itzuli_class.return_value = mock_itzuli
-        mock_itzuli.getTranslation.return_value = {
+    @patch("itzuli_nlp.core.workflow.itzuli_client")
+    def test_handles_empty_translation_id(self, mock_itzuli, mock_process_raw_analysis, mock_get_pipeline):
+        mock_itzuli.translate.return_value = {
             "translated_text": "Hello!"
             # No "id" field
         }
@@ -106,14 +101,44 @@ class TestProcessTranslationWithAnalysis:
 
         assert result.translation_id == ""
 
+    @patch("itzuli_nlp.core.workflow.get_cached_stanza_pipeline")
+    @patch("itzuli_nlp.core.workflow.process_raw_analysis")
+    @patch("itzuli_nlp.core.workflow.itzuli_client")
+    def test_repeated_text_is_translated_once(self, mock_itzuli, mock_process_raw_analysis, mock_get_pipeline):
+        mock_itzuli.translate.return_value = {"translated_text": "Hello!", "id": "trans-123"}
+        mock_process_raw_analysis.return_value = []
+
+        process_translation_with_analysis(api_key="test-key", text="Kaixo!", source_language="eu", target_language="en")
+        result = process_translation_with_analysis(
+            api_key="test-key", text="Kaixo! ", source_language="eu", target_language="en"
+        )
+
+        assert result.translated_text == "Hello!"
+        assert result.translation_id == "trans-123"
+        mock_itzuli.translate.assert_called_once_with("test-key", "Kaixo!", "eu", "en")
+
+    @patch("itzuli_nlp.core.workflow.get_cached_stanza_pipeline")
+    @patch("itzuli_nlp.core.workflow.process_raw_analysis")
+    @patch("itzuli_nlp.core.workflow.itzuli_client")
+    def test_repeated_text_is_analyzed_once(self, mock_itzuli, mock_process_raw_analysis, mock_get_pipeline):
+        mock_itzuli.translate.return_value = {"translated_text": "Hello!", "id": "trans-123"}
+        mock_process_raw_analysis.return_value = [AnalysisRow("Kaixo", "kaixo", "INTJ", "")]
+
+        process_translation_with_analysis(api_key="test-key", text="Kaixo!", source_language="eu", target_language="en")
+        result = process_translation_with_analysis(
+            api_key="test-key", text="Kaixo!", source_language="eu", target_language="en"
+        )
+
+        assert result.analysis_rows == [AnalysisRow("Kaixo", "kaixo", "INTJ", "")]
+        mock_process_raw_analysis.assert_called_once()
+
 
 class TestGetCachedStanzaPipeline:
     def test_caches_pipeline(self):
         # Clear any existing cached pipeline
-        if hasattr(get_cached_stanza_pipeline, "_pipeline"):
-            delattr(get_cached_stanza_pipeline, "_pipeline")
+        pipeline_registry.clear()
 
-        with patch("itzuli_nlp.core.workflow.create_pipeline") as mock_create:
+        with patch("itzuli_nlp.core.pipelines.create_pipeline") as mock_create:
             mock_pipeline = Mock()
             mock_create.return_value = mock_pipeline
 
@@ -121,9 +146,12 @@ class TestGetCachedStanzaPipeline:
             pipeline1 = get_cached_stanza_pipeline()
             assert pipeline1 == mock_pipeline
             assert mock_create.call_count == 1
+            mock_create.assert_called_once_with("eu")
 
             # Second call should return cached pipeline
             pipeline2 = get_cached_stanza_pipeline()
             assert pipeline2 == mock_pipeline
             assert pipeline1 is pipeline2
             assert mock_create.call_count == 1  # Should not be called again
+
+        pipeline_registry.clear()
@@ -0,0 +1,80 @@
+import threading
+from unittest.mock import Mock, patch
+
+from itzuli_nlp.core.batching import StanzaBatcher
+from itzuli_nlp.tools.dual_analysis import analyze_both_texts
+
+
+def echo_pipeline(calls):
+    """A pipeline whose documents contain one word per input text, echoing the text."""
+
+    def run(docs):
+        calls.extend(doc.text for doc in docs)
+        return [
+            Mock(sentences=[Mock(words=[Mock(text=doc.text, lemma=doc.text.lower(), upos="X", feats=None)])])
+            for doc in docs
+        ]
+
+    return run
+
+
+class TestAnalyzeBothTexts:
+    def test_source_is_analyzed_while_translating(self):
+        calls = []
+        source_analyzed = threading.Event()
+
+        def pipeline_for(language):
+            run = echo_pipeline(calls)
+
+            def tracked(docs):
+                results = run(docs)
+                source_analyzed.set()
+                return results
+
+            return tracked
+
+        def translate(api_key, text, source_language, target_language):
+            # Only returns once the source has been tagged, which requires the two to overlap
+            assert source_analyzed.wait(timeout=5)
+            return "Hello"
+
+        with (
+            patch("itzuli_nlp.tools.dual_analysis.batcher", StanzaBatcher(pipeline_for, window_ms=0)),
+            patch("itzuli_nlp.tools.dual_analysis.translate_text", side_effect=translate),
+        ):
+            translated_text, source_analysis, target_analysis = analyze_both_texts("key", "Kaixo", "eu", "en")
+
+        assert translated_text == "Hello"
+        assert [row.word for row in source_analysis] == ["Kaixo"]
+        assert [row.word for row in target_analysis] == ["Hello"]
+        assert calls == ["Kaixo", "Hello"]
+
+    def test_reports_stage_timings(self):
+        timings = {}
+
+        with (
+            patch(
+                "itzuli_nlp.tools.dual_analysis.batcher",
+                StanzaBatcher(lambda language: echo_pipeline([]), window_ms=0),
+            ),
+            patch("itzuli_nlp.tools.dual_analysis.translate_text", return_value="Hello"),
+        ):
+            analyze_both_texts("key", "Kaixo", "eu", "en", timings=timings)
+
+        assert set(timings) == {"translation_ms", "source_analysis_ms", "target_analysis_ms"}
+        assert all(value >= 0 for value in timings.values())
+
+    def test_timings_do_not_depend_on_done_callbacks(self):
+        timings = {}
+        # Futures whose result() returns before any done callback has run
+        batcher = Mock()
+        batcher.submit.return_value = Mock(result=Mock(return_value=[]), add_done_callback=Mock())
+
+        with (
+            patch("itzuli_nlp.tools.dual_analysis.batcher", batcher),
+            patch("itzuli_nlp.tools.dual_analysis.translate_text", return_value="Hello"),
+        ):
+            analyze_both_texts("key", "Kaixo", "eu", "en", timings=timings)
+
+        assert timings["source_analysis_ms"] >= 0
+        assert timings["target_analysis_ms"] >= 0
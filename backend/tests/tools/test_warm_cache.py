@@ -0,0 +1,135 @@
+"""Tests for the cache-warming CLI."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from itzuli_nlp.alignment_server.cache import AlignmentCache
+from itzuli_nlp.alignment_server.types import (
+    Alignment,
+    AlignmentData,
+    AlignmentLayers,
+    SentencePair,
+    TokenizedSentence,
+)
+from itzuli_nlp.core.types import AnalysisRow
+from itzuli_nlp.tools.warm_cache import CorpusItem, read_corpus, warm_cache
+
+
+def aligned(source_text, source_lang, target_lang, sentence_id, layers=None):
+    layers = layers or AlignmentLayers(lexical=[Alignment(source=["s0"], target=["t0"], label="x")])
+    return AlignmentData(
+        sentences=[
+            SentencePair(
+                id=sentence_id,
+                source=TokenizedSentence(lang=source_lang, text=source_text, tokens=[]),
+                target=TokenizedSentence(lang=target_lang, text="translated", tokens=[]),
+                layers=layers,
+            )
+        ]
+    )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AlignmentCache(db_path=str(tmp_path / "alignments.db"), legacy_dir=str(tmp_path / "legacy"))
+
+
+@pytest.fixture
+def pipeline():
+    with (
+        patch(
+            "itzuli_nlp.tools.warm_cache.analyze_both_texts",
+            return_value=("translated", [AnalysisRow("a", "a", "X", "")], [AnalysisRow("b", "b", "X", "")]),
+        ) as mock_analyze,
+        patch(
+            "itzuli_nlp.tools.warm_cache.create_enriched_alignment_data_async",
+            side_effect=lambda **kwargs: aligned(
+                kwargs["source_text"], kwargs["source_lang"], kwargs["target_lang"], kwargs["sentence_id"]
+            ),
+        ) as mock_enrich,
+    ):
+        yield {"analyze": mock_analyze, "enrich": mock_enrich}
+
+
+def corpus(*texts):
+    return [CorpusItem(text, "eu", "en", f"id-{index}") for index, text in enumerate(texts)]
+
+
+class TestReadCorpus:
+    def test_reads_jsonl(self, tmp_path):
+        path = tmp_path / "corpus.jsonl"
+        path.write_text(
+            json.dumps({"text": "Kaixo", "source": "eu", "target": "en", "id": "a"})
+            + "\n\n"
+            + json.dumps({"text": "Agur", "source": "eu", "target": "es"})
+            + "\n"
+        )
+
+        items = read_corpus(path)
+
+        assert items == [CorpusItem("Kaixo", "eu", "en", "a"), CorpusItem("Agur", "eu", "es", "eu-es-0002")]
+
+    def test_reads_csv(self, tmp_path):
+        path = tmp_path / "corpus.csv"
+        path.write_text('text,source,target,id\n"Kaixo, zer moduz?",eu,en,a\n')
+
+        assert read_corpus(path) == [CorpusItem("Kaixo, zer moduz?", "eu", "en", "a")]
+
+    def test_rejects_incomplete_rows(self, tmp_path):
+        path = tmp_path / "corpus.jsonl"
+        path.write_text(json.dumps({"text": "Kaixo", "source": "eu"}))
+
+        with pytest.raises(ValueError, match="missing target"):
+            read_corpus(path)
+
+    def test_rejects_unsupported_languages(self, tmp_path):
+        path = tmp_path / "corpus.jsonl"
+        path.write_text(json.dumps({"text": "Hallo", "source": "de", "target": "eu"}))
+
+        with pytest.raises(ValueError, match="unsupported source language"):
+            read_corpus(path)
+
+
+class TestWarmCache:
+    def test_generates_and_caches_missing_sentences(self, tmp_path, cache, pipeline):
+        cache.set("Kaixo", "eu", "en", aligned("Kaixo", "eu", "en", "cached"))
+
+        report = warm_cache(
+            corpus("Kaixo", "Agur", "Egun on", "Agur"), cache, "itzuli", "claude", tmp_path / "checkpoint"
+        )
+
+        assert (report.total, report.cached, report.generated) == (4, 1, 2)
+        assert pipeline["analyze"].call_count == 2
+        assert cache.get("Egun on", "eu", "en") is not None
+        assert len((tmp_path / "checkpoint").read_text().split()) == 2
+
+    def test_shares_one_claude_client(self, tmp_path, cache, pipeline):
+        warm_cache(corpus("Agur", "Egun on", "Kaixo"), cache, "itzuli", "claude", tmp_path / "checkpoint")
+
+        clients = {id(call.kwargs["claude_client"]) for call in pipeline["enrich"].call_args_list}
+        assert pipeline["enrich"].await_count == 3
+        assert len(clients) == 1
+
+    def test_resumes_from_checkpoint(self, tmp_path, cache, pipeline):
+        checkpoint = tmp_path / "checkpoint"
+        checkpoint.write_text(cache.key_for("Agur", "eu", "en") + "\n")
+
+        report = warm_cache(corpus("Agur", "Egun on"), cache, "itzuli", "claude", checkpoint)
+
+        assert (report.checkpointed, report.generated) == (1, 1)
+        pipeline["analyze"].assert_called_once()
+
+    def test_reports_failures_without_checkpointing_them(self, tmp_path, cache, pipeline):
+        pipeline["enrich"].side_effect = lambda **kwargs: aligned(
+            kwargs["source_text"], "eu", "en", kwargs["sentence_id"], layers=AlignmentLayers()
+        )
+        pipeline["analyze"].side_effect = [RuntimeError("Itzuli down"), pipeline["analyze"].return_value]
+
+        report = warm_cache(corpus("Agur", "Egun on"), cache, "itzuli", "claude", tmp_path / "checkpoint")
+
+        assert report.generated == 0
+        assert sorted(report.failures.values()) == ["Claude returned no alignments", "Itzuli down"]
+        assert not (tmp_path / "checkpoint").exists()
+        assert cache.stats()["entries"] == 0